@@ -0,0 +1,11 @@
+import subprocess
+import sys
+
+args = sys.argv[1:]
+
+sys.exit(subprocess.run([
+	'python',
+	'-m',
+	'benchmarks',
+	*args
+], cwd='src').returncode)
@@ -1,7 +1,10 @@
 import subprocess
 import sys
 
+args = sys.argv[1:]
+
 subprocess.run([
     'python',
-    'main.py'
+    'main.py',
+    *args
 ], cwd='src')
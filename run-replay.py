@@ -0,0 +1,10 @@
+import subprocess
+import sys
+
+args = sys.argv[1:]
+
+sys.exit(subprocess.run([
+	'python',
+	'replay.py',
+	*args
+], cwd='src').returncode)
@@ -10,12 +10,17 @@ from dataclasses import replace
 from os import path
 import argparse
 
+from checkpoint import Checkpointer
+from cli import resolve_path
 from difficulty_levels import default_difficulty, difficulty_levels_map
 from engine.game_manager import GameManager
 from engine.window_config import WindowConfig
+from profiler import FrameProfiler
+from replay import ReplayRecorder
 from scenes.stage import Stage
 from game_info import TITLE
 from window_size import WINDOW_SIZE
+from workload_trace import WorkloadTrace
 
 def _int_range(vmin, vmax):
     def ranged_int(arg):
@@ -45,7 +50,10 @@ class RangedInt:
 def parse_arguments():
     """Parse command line arguments
 
-    returns the script filename and the difficulty configuration"""
+    returns the script filename, the difficulty configuration,
+    whether to run headless, the random seed, the replay file to record,
+    the workload trace file to play, the checkpoint file with the time
+    between checkpoints, and the profile file to write"""
 
     parser = argparse.ArgumentParser(
                 prog="auto",
@@ -85,8 +93,42 @@ def parse_arguments():
         type=RangedInt('io_probability', 1, 50),
         help="probability of process blocking for IO (1-50) %%")
 
+    parser.add_argument('--seed', type=int,
+        help="seed of the random number generators, to replay the same game (random by default)")
+
+    parser.add_argument('--headless', action='store_true',
+        help="run without a window, as fast as possible, and print the result at game over")
+
+    parser.add_argument('--record', metavar='REPLAY_FILE',
+        help="record the game to a replay file, that can be played back with run-replay.py")
+
+    parser.add_argument('--workload', metavar='TRACE_FILE',
+        help="play the workload of a trace file instead of random processes and events")
+
+    parser.add_argument('--checkpoint', metavar='CHECKPOINT_FILE',
+        help="with --headless, save the game to a checkpoint file periodically, and resume"
+            " it from this file if it exists")
+
+    parser.add_argument('--checkpoint-interval', type=float, default=60, metavar='SECONDS',
+        help="time between checkpoints, in seconds (default: 60)")
+
+    parser.add_argument('--profile', nargs='?', const='profile.pstats', metavar='PSTATS_FILE',
+        help="profile the game, print a report on exit and write the profile to a file"
+            " (default: profile.pstats)")
+
     args = parser.parse_args()
 
+    if args.record is not None and args.workload is not None:
+        # Replays only record the seed of the game, not its workload.
+        parser.error('--record cannot be used with --workload')
+    if args.checkpoint is not None:
+        if not args.headless:
+            # Games shown in a window run on wall-clock time, which cannot be resumed.
+            parser.error('--checkpoint requires --headless')
+        if args.record is not None:
+            # Replays are not part of checkpoints, and would miss the start of the game.
+            parser.error('--record cannot be used with --checkpoint')
+
     # get base difficulty level
     difficulty = default_difficulty
     if args.difficulty is not None:
@@ -100,25 +142,36 @@ def parse_arguments():
             # key is in config but is not configurable
             continue
         if val is not None:
-            replace(
+            if field_name.endswith('_probability'):
+                # probabilities are given in percent
+                val /= 100
+            difficulty = replace(
                 difficulty,
                 config = replace(difficulty.config, **{field_name: val}),
                 # on change, difficulty is now Custom
                 name = 'Custom'
             )
 
-    return args.filename, difficulty
+    return (
+        args.filename, difficulty, args.headless, args.seed, args.record, args.workload,
+        args.checkpoint, args.checkpoint_interval, args.profile
+    )
 
 
 def compile_auto_script(source_file):
-    if not path.isabs(source_file):
-        source_file = '../' + source_file
+    source_file = resolve_path(source_file)
     with open(source_file, encoding="utf_8") as in_file:
         source = in_file.read()
     return compile(source, source_file, 'exec')
 
-source_filename, difficulty_level = parse_arguments()
+(
+    source_filename, difficulty_level, headless, seed, record_filename, workload_filename,
+    checkpoint_filename, checkpoint_interval, profile_filename
+) = parse_arguments()
 compiled_script = compile_auto_script(source_filename)
+workload_trace = None
+if workload_filename is not None:
+    workload_trace = WorkloadTrace.load(resolve_path(workload_filename))
 
 async def main():
     game_manager = GameManager()
@@ -126,12 +179,40 @@ async def main():
 
     stage_name = 'Difficulty: ' + difficulty_level.name.upper()
     stage_scene = Stage(
-        stage_name, difficulty_level.config, script=compiled_script, standalone=True
+        stage_name, difficulty_level.config, script=compiled_script, standalone=True, seed=seed,
+        workload_trace=workload_trace
     )
 
+    recorder = None
+    if record_filename is not None:
+        recorder = ReplayRecorder()
+        stage_scene.recorder = recorder
+
+    if checkpoint_filename is not None:
+        stage_scene.checkpointer = Checkpointer(
+            resolve_path(checkpoint_filename), interval_s=checkpoint_interval)
+
     game_manager.add_scene(stage_scene)
     game_manager.startup_scene = stage_scene
 
-    await game_manager.play(ignore_events=True)
+    if profile_filename is not None:
+        game_manager.profiler = FrameProfiler()
+    try:
+        await game_manager.play(ignore_events=True, headless=headless)
+    finally:
+        if profile_filename is not None:
+            game_manager.profiler.save(resolve_path(profile_filename))
+            game_manager.profiler.print_report()
+
+    if recorder is not None:
+        recorder.save(
+            resolve_path(record_filename),
+            stage_scene.score_manager.score,
+            stage_scene.uptime_manager.uptime_ms)
+
+    if headless:
+        print(f'Uptime: {stage_scene.uptime_manager.uptime_text}')
+        print(f'Score: {stage_scene.score_manager.score}')
+        print(f'Seed: {stage_scene.seed}')
 
 asyncio.run(main())
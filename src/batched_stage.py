@@ -0,0 +1,761 @@
+"""
+Batched simulation of many independent games at once.
+
+`BatchedStage` implements the rules of `Process`, `ProcessManager`, `PageManager`,
+`IoQueue`, `ScoreManager` and `UptimeManager` on NumPy arrays, with one row per game
+(or environment), so that a single call to `step` advances thousands of games.
+There are no game objects, views or animations: only the logical state is simulated.
+
+Time advances by a fixed step at each call to `step`, and timed events (process event
+checks, I/O checks, swaps, process creation, score and uptime updates) happen at the
+first step at or after their deadline, like timers in a `Stage` running on a
+`FixedStepClock`. Random numbers are drawn from one NumPy generator per kind of event,
+all derived from a single seed.
+
+Processes are stored in a table with a fixed number of rows per environment. Rows
+are reused once a process has left the game, so actions address processes by row,
+and the `pid` array gives the pid of the process in each row.
+
+Actions are integers, one per environment and per step:
+- `ACTION_NONE`: do nothing.
+- `ACTION_IO_QUEUE`: process the I/O events, like clicking on the I/O queue.
+- `process_action(row)`: move the process in the row to or from a CPU.
+- `page_action(row, idx)`: swap page `idx` of the process in the row.
+"""
+
+import numpy as np
+
+from constants import (
+    DEAD_STARVATION_LEVEL, IO_EVENT_PROBABILITY_DENOMINATOR, LAST_ALIVE_STARVATION_LEVEL,
+    MAX_IO_WAITING_TIME, MAX_PAGES_PER_PROCESS, NEW_PAGE_PROBABILITY_DENOMINATOR, ONE_SECOND,
+    PRIORITY_TIME_BETWEEN_STARVATION_LEVELS, SCORE_UPDATE_INTERVAL,
+    STARTUP_PROCESS_CREATION_INTERVAL, TIME_BETWEEN_STARVATION_LEVELS,
+    TIME_FOR_PROCESS_HAPPINESS
+)
+from game_objects.page_manager import PageManager
+from game_objects.process_manager import ProcessManager
+from stage_config import StageConfig
+
+ACTION_NONE = 0
+ACTION_IO_QUEUE = 1
+_FIRST_PROCESS_ACTION = 2
+
+_NO_DEADLINE = np.iinfo(np.int64).max
+
+_RANDOM_STREAMS = (
+    'process_arrival',
+    'priority',
+    'io_blocking',
+    'page_creation',
+    'io_events',
+    'graceful_termination',
+)
+
+
+def _rank_within_groups(groups):
+    """For a sorted array of group ids, returns the rank of each element within its group."""
+    if len(groups) == 0:
+        return np.zeros(0, dtype=np.int64)
+    starts = np.r_[True, groups[1:] != groups[:-1]]
+    start_indices = np.maximum.accumulate(np.where(starts, np.arange(len(groups)), 0))
+    return np.arange(len(groups)) - start_indices
+
+
+class BatchedStage:
+    # pylint: disable=too-many-instance-attributes,too-many-public-methods,too-many-statements
+
+    def __init__(self, num_envs: int, config: StageConfig = StageConfig(),
+                 *, seed: int = None, step_ms: int = 100):
+        """
+        Args:
+            num_envs: Number of games simulated together.
+            config: The configuration shared by all games.
+            seed: The seed of the random number generators. A random seed is chosen if
+                not provided.
+            step_ms: Game time simulated by each call to `step`, in milliseconds.
+        """
+        self._num_envs = num_envs
+        self._config = config
+        self._step_ms = step_ms
+
+        seed_sequence = np.random.SeedSequence(seed)
+        self._seed = seed_sequence.entropy
+        self._random = dict(zip(
+            _RANDOM_STREAMS,
+            (np.random.default_rng(child) for child in seed_sequence.spawn(len(_RANDOM_STREAMS)))
+        ))
+
+        self._num_rows = config.max_processes + config.num_cpus
+        self._num_slots = PageManager.get_total_rows(config) * PageManager.get_num_cols()
+        self._num_ram_slots = config.num_ram_rows * PageManager.get_num_cols()
+        self._io_queue_capacity = self._num_rows + ProcessManager.MAX_TERMINATED_BY_USER
+
+        self._io_probability_numerator = int(config.io_probability * 100)
+        self._graceful_termination_probability_numerator = int(
+            config.graceful_termination_probability * 100)
+        self._priority_process_probability_numerator = int(
+            config.priority_process_probability * 100)
+        self._new_process_probability_numerator = int(config.new_process_probability * 100)
+        if self._new_process_probability_numerator > 0:
+            self._max_wait_between_new_processes = int(
+                100 / self._new_process_probability_numerator * ONE_SECOND)
+        else:
+            self._max_wait_between_new_processes = _NO_DEADLINE
+
+        n, rows = num_envs, self._num_rows
+        num_pages = rows * MAX_PAGES_PER_PROCESS
+        self._envs = np.arange(n)
+
+        self._time = np.zeros(n, dtype=np.int64)
+        self._game_over = np.zeros(n, dtype=bool)
+        self._score = np.zeros(n, dtype=np.float64)
+        self._uptime = np.zeros(n, dtype=np.int64)
+
+        # Process table
+        self._exists = np.zeros((n, rows), dtype=bool)
+        self._pid = np.zeros((n, rows), dtype=np.int64)
+        self._has_ended = np.zeros((n, rows), dtype=bool)
+        self._is_priority = np.zeros((n, rows), dtype=bool)
+        self._starvation_level = np.zeros((n, rows), dtype=np.int8)
+        self._cpu = np.full((n, rows), -1, dtype=np.int16)
+        self._is_waiting_for_io = np.zeros((n, rows), dtype=bool)
+        self._is_waiting_for_page = np.zeros((n, rows), dtype=bool)
+        self._is_on_io_cooldown = np.zeros((n, rows), dtype=bool)
+        self._last_state_change_time = np.zeros((n, rows), dtype=np.int64)
+        self._last_starvation_level_change_time = np.zeros((n, rows), dtype=np.int64)
+        self._next_event_check_time = np.zeros((n, rows), dtype=np.int64)
+        self._page_count = np.zeros((n, rows), dtype=np.int8)
+
+        self._cpu_process = np.full((n, config.num_cpus), -1, dtype=np.int32)
+
+        # Process manager
+        self._next_pid = np.ones(n, dtype=np.int64)
+        self._last_new_process_check = np.zeros(n, dtype=np.int64)
+        self._last_process_creation_time = np.zeros(n, dtype=np.int64)
+        self._next_process_creation_time = np.zeros(n, dtype=np.int64)
+        self._gracefully_terminated_process_count = np.zeros(n, dtype=np.int64)
+        self._user_terminated_process_count = np.zeros(n, dtype=np.int64)
+
+        # Pages, identified by `row * MAX_PAGES_PER_PROCESS + idx`, and page slots
+        self._page_slot = np.full((n, num_pages), -1, dtype=np.int32)
+        self._slot_page = np.full((n, self._num_slots), -1, dtype=np.int32)
+        self._page_swap_queue_order = np.full((n, num_pages), -1, dtype=np.int64)
+        self._next_swap_queue_order = np.zeros(n, dtype=np.int64)
+        self._swapping_page = np.full(n, -1, dtype=np.int32)
+        self._swapping_to = np.full(n, -1, dtype=np.int32)
+        self._swap_end_time = np.full(n, _NO_DEADLINE, dtype=np.int64)
+
+        # I/O queue, as a ring buffer of waiting processes
+        self._io_waiter_row = np.zeros((n, self._io_queue_capacity), dtype=np.int32)
+        self._io_waiter_pid = np.zeros((n, self._io_queue_capacity), dtype=np.int64)
+        self._io_waiter_since = np.zeros((n, self._io_queue_capacity), dtype=np.int64)
+        self._io_queue_head = np.zeros(n, dtype=np.int64)
+        self._io_queue_length = np.zeros(n, dtype=np.int64)
+        self._io_event_count = np.zeros(n, dtype=np.int64)
+        self._io_last_update_time = np.zeros(n, dtype=np.int64)
+
+        # Score and uptime managers
+        self._next_score_update_time = np.zeros(n, dtype=np.int64)
+        self._scored_gracefully_terminated_process_count = np.zeros(n, dtype=np.int64)
+        self._scored_user_terminated_process_count = np.zeros(n, dtype=np.int64)
+        self._next_uptime_update_time = np.zeros(n, dtype=np.int64)
+
+        self.reset()
+
+    @property
+    def num_envs(self):
+        return self._num_envs
+
+    @property
+    def config(self):
+        return self._config
+
+    @property
+    def seed(self):
+        return self._seed
+
+    @property
+    def num_rows(self):
+        """Number of rows of the process table of each environment."""
+        return self._num_rows
+
+    @property
+    def num_actions(self):
+        return _FIRST_PROCESS_ACTION + self._num_rows * (1 + MAX_PAGES_PER_PROCESS)
+
+    def process_action(self, row):
+        return _FIRST_PROCESS_ACTION + row
+
+    def page_action(self, row, idx):
+        return _FIRST_PROCESS_ACTION + self._num_rows + row * MAX_PAGES_PER_PROCESS + idx
+
+    @property
+    def current_time(self):
+        return self._time
+
+    @property
+    def game_over(self):
+        return self._game_over
+
+    @property
+    def score(self):
+        return self._score.astype(np.int64)
+
+    @property
+    def uptime_ms(self):
+        return self._uptime
+
+    @property
+    def process_exists(self):
+        return self._exists
+
+    @property
+    def pid(self):
+        return self._pid
+
+    @property
+    def starvation_level(self):
+        return self._starvation_level
+
+    @property
+    def has_ended(self):
+        return self._has_ended
+
+    @property
+    def cpu(self):
+        """Index of the CPU used by the process in each row, or -1."""
+        return self._cpu
+
+    @property
+    def is_blocked(self):
+        return self._is_waiting_for_io | self._is_waiting_for_page
+
+    @property
+    def page_count(self):
+        return self._page_count
+
+    @property
+    def page_slot(self):
+        """Slot of each page, of shape (num_envs, num_rows, MAX_PAGES_PER_PROCESS), or -1.
+
+        Slots are numbered row by row, RAM slots first.
+        """
+        return self._page_slot.reshape(self._num_envs, self._num_rows, MAX_PAGES_PER_PROCESS)
+
+    @property
+    def page_on_disk(self):
+        return self.page_slot >= self._num_ram_slots
+
+    @property
+    def page_swap_requested(self):
+        swap_requested = self._page_swap_queue_order >= 0
+        swap_requested[self._envs, self._swapping_page] |= self._swapping_page >= 0
+        return swap_requested.reshape(
+            self._num_envs, self._num_rows, MAX_PAGES_PER_PROCESS)
+
+    @property
+    def io_event_count(self):
+        return self._io_event_count
+
+    @property
+    def gracefully_terminated_process_count(self):
+        return self._gracefully_terminated_process_count
+
+    @property
+    def user_terminated_process_count(self):
+        return self._user_terminated_process_count
+
+    def reset(self, env_mask=None):
+        """Starts new games in the given environments, or in all of them."""
+        envs = self._envs if env_mask is None else np.flatnonzero(env_mask)
+
+        for array in (
+            self._time, self._score, self._uptime,
+            self._next_swap_queue_order, self._io_queue_head, self._io_queue_length,
+            self._io_event_count, self._io_last_update_time,
+            self._gracefully_terminated_process_count, self._user_terminated_process_count,
+            self._scored_gracefully_terminated_process_count,
+            self._scored_user_terminated_process_count,
+            self._last_new_process_check, self._last_process_creation_time,
+        ):
+            array[envs] = 0
+        self._game_over[envs] = False
+        self._next_pid[envs] = 1
+
+        self._exists[envs] = False
+        self._cpu[envs] = -1
+        self._cpu_process[envs] = -1
+        self._page_count[envs] = 0
+        self._page_slot[envs] = -1
+        self._slot_page[envs] = -1
+        self._page_swap_queue_order[envs] = -1
+        self._swapping_page[envs] = -1
+        self._swapping_to[envs] = -1
+        self._swap_end_time[envs] = _NO_DEADLINE
+
+        self._next_process_creation_time[envs] = self._process_creation_interval(envs)
+        self._next_score_update_time[envs] = SCORE_UPDATE_INTERVAL
+        self._next_uptime_update_time[envs] = ONE_SECOND
+
+    def step(self, actions):
+        """Applies one action per environment, then advances all games by `step_ms`.
+
+        Games that are over are left unchanged until they are reset.
+
+        Returns:
+            tuple: The score gained during the step, and whether each game is over.
+        """
+        actions = np.asarray(actions)
+        running = ~self._game_over
+        score_before = self._score.copy()
+
+        self._time[running] += self._step_ms
+        self._apply_actions(actions, running)
+
+        self._update_pages_availability(running)
+        self._run_process_creation(running)
+        self._run_process_event_checks(running)
+        self._run_io_queue_check(running)
+        self._complete_swaps(running)
+        self._run_score_update(running)
+        self._run_uptime_update(running)
+        self._update_pages_availability(running)
+        self._start_swaps(running)
+
+        self._game_over |= (
+            self._user_terminated_process_count == ProcessManager.MAX_TERMINATED_BY_USER)
+        return self._score - score_before, self._game_over.copy()
+
+    def _time_of(self, envs):
+        return self._time[envs]
+
+    # Actions
+
+    def _apply_actions(self, actions, running):
+        io_envs = np.flatnonzero(running & (actions == ACTION_IO_QUEUE))
+        self._process_io_events(io_envs)
+
+        process_actions = actions - _FIRST_PROCESS_ACTION
+        is_process_action = running & (process_actions >= 0) & (process_actions < self._num_rows)
+        envs = np.flatnonzero(is_process_action)
+        rows = process_actions[envs]
+        valid = (
+            self._exists[envs, rows]
+            & (self._starvation_level[envs, rows] < DEAD_STARVATION_LEVEL)
+        )
+        envs, rows = envs[valid], rows[valid]
+        has_cpu = self._cpu[envs, rows] >= 0
+        self._yield_cpu(envs[has_cpu], rows[has_cpu])
+        self._use_cpu(envs[~has_cpu], rows[~has_cpu])
+
+        page_actions = process_actions - self._num_rows
+        is_page_action = (
+            running & (page_actions >= 0)
+            & (page_actions < self._num_rows * MAX_PAGES_PER_PROCESS)
+        )
+        envs = np.flatnonzero(is_page_action)
+        self._request_swaps(envs, page_actions[envs])
+
+    def _use_cpu(self, envs, rows):
+        free_cpus = self._cpu_process[envs] == -1
+        has_free_cpu = free_cpus.any(axis=1)
+        envs, rows = envs[has_free_cpu], rows[has_free_cpu]
+        cpus = free_cpus[has_free_cpu].argmax(axis=1)
+
+        self._cpu_process[envs, cpus] = rows
+        self._cpu[envs, rows] = cpus
+        self._last_state_change_time[envs, rows] = self._time_of(envs)
+
+        needs_pages = self._page_count[envs, rows] == 0
+        envs, rows = envs[needs_pages], rows[needs_pages]
+        # Between 1 and 4 pages, with a higher probability for higher numbers
+        num_pages = np.round(np.sqrt(
+            self._random['page_creation'].integers(1, 21, len(envs)))).astype(np.int8)
+        for idx in range(MAX_PAGES_PER_PROCESS):
+            creates_page = num_pages > idx
+            self._create_pages(envs[creates_page], rows[creates_page])
+
+    def _yield_cpu(self, envs, rows):
+        self._cpu_process[envs, self._cpu[envs, rows]] = -1
+        self._cpu[envs, rows] = -1
+        self._is_on_io_cooldown[envs, rows] &= self._is_waiting_for_io[envs, rows]
+        self._last_state_change_time[envs, rows] = self._time_of(envs)
+
+        has_ended = self._has_ended[envs, rows]
+        self._remove_processes(envs[has_ended], rows[has_ended])
+
+    def _request_swaps(self, envs, pages):
+        rows = pages // MAX_PAGES_PER_PROCESS
+        can_swap = (
+            self._exists[envs, rows]
+            & (pages % MAX_PAGES_PER_PROCESS < self._page_count[envs, rows])
+            & (self._page_slot[envs, pages] >= 0)
+            & (self._page_swap_queue_order[envs, pages] < 0)
+            & (self._swapping_page[envs] != pages)
+        )
+        envs, pages = envs[can_swap], pages[can_swap]
+        self._page_swap_queue_order[envs, pages] = self._next_swap_queue_order[envs]
+        self._next_swap_queue_order[envs] += 1
+
+    # Processes
+
+    def _set_blocking_condition(self, envs, rows, *, waiting_for_io=None, waiting_for_page=None):
+        was_blocked = (
+            self._is_waiting_for_io[envs, rows] | self._is_waiting_for_page[envs, rows])
+        if waiting_for_io is not None:
+            self._is_waiting_for_io[envs, rows] = waiting_for_io
+        if waiting_for_page is not None:
+            self._is_waiting_for_page[envs, rows] = waiting_for_page
+        is_blocked = self._is_waiting_for_io[envs, rows] | self._is_waiting_for_page[envs, rows]
+        changed = was_blocked != is_blocked
+        self._last_state_change_time[envs[changed], rows[changed]] = self._time_of(envs[changed])
+
+    def _update_pages_availability(self, running):
+        pages = self._page_slot.reshape(self._num_envs, self._num_rows, MAX_PAGES_PER_PROCESS)
+        unavailable = (
+            (pages >= self._num_ram_slots) | self.page_swap_requested
+        ).any(axis=2)
+        envs, rows = np.nonzero(
+            running[:, None] & self._exists & ~self._has_ended & (self._cpu >= 0)
+            | self._is_waiting_for_page
+        )
+        waiting_for_page = (self._cpu[envs, rows] >= 0) & unavailable[envs, rows]
+        self._set_blocking_condition(envs, rows, waiting_for_page=waiting_for_page)
+
+    def _process_creation_interval(self, envs):
+        return np.where(
+            self._next_pid[envs] <= self._config.num_processes_at_startup,
+            STARTUP_PROCESS_CREATION_INTERVAL,
+            ONE_SECOND,
+        )
+
+    def _run_process_creation(self, running):
+        envs = np.flatnonzero(running & (self._time >= self._next_process_creation_time))
+        current_time = self._time_of(envs)
+
+        at_startup = self._next_pid[envs] <= self._config.num_processes_at_startup
+        startup_envs = envs[at_startup]
+        self._last_process_creation_time[startup_envs] = current_time[at_startup]
+
+        later_envs = envs[~at_startup]
+        draws = self._random['process_arrival'].integers(1, 101, len(later_envs))
+        creates = (
+            (draws <= self._new_process_probability_numerator)
+            | (current_time[~at_startup] - self._last_process_creation_time[later_envs]
+               >= self._max_wait_between_new_processes)
+        )
+        self._last_process_creation_time[later_envs[creates]] = current_time[~at_startup][creates]
+
+        self._last_new_process_check[envs] = current_time
+        self._create_processes(np.concatenate([startup_envs, later_envs[creates]]))
+        self._next_process_creation_time[envs] = (
+            self._last_new_process_check[envs] + self._process_creation_interval(envs))
+
+    def _create_processes(self, envs):
+        alive_count = (self._exists[envs] & ~self._has_ended[envs]).sum(axis=1)
+        free_rows = ~self._exists[envs]
+        can_create = (alive_count < self._config.max_processes) & free_rows.any(axis=1)
+        envs = envs[can_create]
+        rows = free_rows[can_create].argmax(axis=1)
+        current_time = self._time_of(envs)
+
+        self._exists[envs, rows] = True
+        self._pid[envs, rows] = self._next_pid[envs]
+        self._next_pid[envs] += 1
+        self._has_ended[envs, rows] = False
+        self._is_priority[envs, rows] = (
+            self._random['priority'].integers(1, 101, len(envs))
+            <= self._priority_process_probability_numerator
+        )
+        self._starvation_level[envs, rows] = 1
+        self._cpu[envs, rows] = -1
+        self._is_waiting_for_io[envs, rows] = False
+        self._is_waiting_for_page[envs, rows] = False
+        self._is_on_io_cooldown[envs, rows] = False
+        self._last_state_change_time[envs, rows] = current_time
+        self._last_starvation_level_change_time[envs, rows] = current_time
+        self._next_event_check_time[envs, rows] = current_time + ONE_SECOND
+        self._page_count[envs, rows] = 0
+
+    def _remove_processes(self, envs, rows):
+        self._delete_pages_of(envs, rows)
+        self._exists[envs, rows] = False
+        self._cpu[envs, rows] = -1
+
+    def _run_process_event_checks(self, running):
+        envs, rows = np.nonzero(
+            running[:, None] & self._exists & ~self._has_ended
+            & (self._next_event_check_time <= self._time[:, None])
+        )
+        current_time = self._time_of(envs)
+        self._update_starvation_levels(envs, rows, current_time)
+        self._handle_io_probability(envs, rows)
+        self._handle_new_page_probability(envs, rows)
+        self._handle_graceful_termination_probability(envs, rows, current_time)
+
+        still_running = self._exists[envs, rows] & ~self._has_ended[envs, rows]
+        self._next_event_check_time[envs[still_running], rows[still_running]] = (
+            current_time[still_running] + ONE_SECOND)
+
+    def _is_running(self, envs, rows):
+        return (
+            self._exists[envs, rows] & (self._cpu[envs, rows] >= 0)
+            & ~self._is_waiting_for_io[envs, rows] & ~self._is_waiting_for_page[envs, rows]
+        )
+
+    def _update_starvation_levels(self, envs, rows, current_time):
+        running = self._is_running(envs, rows)
+        happy = running & (
+            current_time - self._last_state_change_time[envs, rows]
+            >= TIME_FOR_PROCESS_HAPPINESS
+        )
+        self._starvation_level[envs[happy], rows[happy]] = 0
+        self._last_starvation_level_change_time[envs[happy], rows[happy]] = current_time[happy]
+
+        time_between_starvation_levels = np.where(
+            self._is_priority[envs, rows],
+            PRIORITY_TIME_BETWEEN_STARVATION_LEVELS,
+            TIME_BETWEEN_STARVATION_LEVELS,
+        )
+        starving = ~running & (
+            current_time - self._last_starvation_level_change_time[envs, rows]
+            >= time_between_starvation_levels
+        )
+        self._last_starvation_level_change_time[envs[starving], rows[starving]] = (
+            current_time[starving])
+        at_last_level = self._starvation_level[envs, rows] >= LAST_ALIVE_STARVATION_LEVEL
+        more_starving = starving & ~at_last_level
+        self._starvation_level[envs[more_starving], rows[more_starving]] += 1
+
+        dying = starving & at_last_level
+        self._terminate_by_user(envs[dying], rows[dying])
+
+    def _terminate_by_user(self, envs, rows):
+        # Only a limited number of processes can be terminated, after which the game is over.
+        can_terminate = (
+            self._user_terminated_process_count[envs] + _rank_within_groups(envs)
+            < ProcessManager.MAX_TERMINATED_BY_USER
+        )
+        envs, rows = envs[can_terminate], rows[can_terminate]
+        np.add.at(self._user_terminated_process_count, envs, 1)
+
+        cpus = self._cpu[envs, rows]
+        has_cpu = cpus >= 0
+        self._cpu_process[envs[has_cpu], cpus[has_cpu]] = -1
+        self._has_ended[envs, rows] = True
+        self._set_blocking_condition(envs, rows, waiting_for_io=False, waiting_for_page=False)
+        self._starvation_level[envs, rows] = DEAD_STARVATION_LEVEL
+        self._remove_processes(envs, rows)
+
+    def _handle_io_probability(self, envs, rows):
+        draws = self._random['io_blocking'].integers(1, 101, len(envs))
+        blocks = (
+            self._is_running(envs, rows)
+            & (self._starvation_level[envs, rows] != LAST_ALIVE_STARVATION_LEVEL)
+            & ~self._is_on_io_cooldown[envs, rows]
+            & (draws <= self._io_probability_numerator)
+        )
+        envs, rows = envs[blocks], rows[blocks]
+        self._set_blocking_condition(envs, rows, waiting_for_io=True)
+        self._is_on_io_cooldown[envs, rows] = True
+        self._wait_for_io_events(envs, rows)
+
+    def _handle_new_page_probability(self, envs, rows):
+        draws = self._random['page_creation'].integers(
+            1, NEW_PAGE_PROBABILITY_DENOMINATOR + 1, len(envs))
+        creates_page = (
+            self._is_running(envs, rows)
+            & (self._page_count[envs, rows] < MAX_PAGES_PER_PROCESS)
+            & (draws == 1)
+        )
+        self._create_pages(envs[creates_page], rows[creates_page])
+
+    def _handle_graceful_termination_probability(self, envs, rows, current_time):
+        draws = self._random['graceful_termination'].integers(1, 101, len(envs))
+        terminates = (
+            self._is_running(envs, rows)
+            & (current_time - self._last_state_change_time[envs, rows] >= ONE_SECOND)
+            & (draws <= self._graceful_termination_probability_numerator)
+        )
+        envs, rows = envs[terminates], rows[terminates]
+        np.add.at(self._gracefully_terminated_process_count, envs, 1)
+        self._has_ended[envs, rows] = True
+        self._set_blocking_condition(envs, rows, waiting_for_io=False, waiting_for_page=False)
+        self._starvation_level[envs, rows] = 0
+
+    # Pages
+
+    def _create_pages(self, envs, rows):
+        """Adds a page to each process, in the first free RAM slot, or else on disk."""
+        order = np.argsort(envs, kind='stable')
+        envs, rows = envs[order], rows[order]
+        pages = rows * MAX_PAGES_PER_PROCESS + self._page_count[envs, rows]
+        np.add.at(self._page_count, (envs, rows), 1)
+
+        # Pages created in the same environment take free slots one after the other.
+        while len(envs) > 0:
+            first = np.r_[True, envs[1:] != envs[:-1]]
+            first_envs, first_pages = envs[first], pages[first]
+            free_slots = self._slot_page[first_envs] == -1
+            has_free_slot = free_slots.any(axis=1)
+            first_envs, first_pages = first_envs[has_free_slot], first_pages[has_free_slot]
+            free_slots = free_slots[has_free_slot]
+            # Boolean argmax returns the first free slot, RAM slots coming first.
+            slots = free_slots.argmax(axis=1)
+            self._slot_page[first_envs, slots] = first_pages
+            self._page_slot[first_envs, first_pages] = slots
+            envs, pages = envs[~first], pages[~first]
+
+    def _delete_pages_of(self, envs, rows):
+        for idx in range(MAX_PAGES_PER_PROCESS):
+            pages = rows * MAX_PAGES_PER_PROCESS + idx
+            has_page = self._page_slot[envs, pages] >= 0
+            page_envs, pages = envs[has_page], pages[has_page]
+            self._slot_page[page_envs, self._page_slot[page_envs, pages]] = -1
+            self._page_slot[page_envs, pages] = -1
+            self._page_swap_queue_order[page_envs, pages] = -1
+
+            swapping = self._swapping_page[page_envs] == pages
+            swapping_envs = page_envs[swapping]
+            self._slot_page[swapping_envs, self._swapping_to[swapping_envs]] = -1
+            self._swapping_page[swapping_envs] = -1
+            self._swapping_to[swapping_envs] = -1
+            self._swap_end_time[swapping_envs] = _NO_DEADLINE
+        self._page_count[envs, rows] = 0
+
+    def _start_swaps(self, running):
+        envs = np.flatnonzero(running & (self._swapping_page < 0))
+        queue_order = self._page_swap_queue_order[envs]
+        is_queued = queue_order >= 0
+        on_disk = self._page_slot[envs] >= self._num_ram_slots
+        free_slots = self._slot_page[envs] == -1
+        free_ram_slots = free_slots[:, :self._num_ram_slots]
+        free_disk_slots = free_slots[:, self._num_ram_slots:]
+
+        # Swapping in first, then swapping out, each in the order they were requested
+        swaps_in = free_ram_slots.any(axis=1) & (is_queued & on_disk).any(axis=1)
+        swaps_out = (
+            ~swaps_in & free_disk_slots.any(axis=1) & (is_queued & ~on_disk).any(axis=1))
+        queued_pages = np.where(
+            is_queued & (on_disk == swaps_in[:, None]), queue_order, _NO_DEADLINE)
+        pages = queued_pages.argmin(axis=1)
+        slots = np.where(
+            swaps_in,
+            free_ram_slots.argmax(axis=1),
+            self._num_ram_slots + free_disk_slots.argmax(axis=1),
+        )
+
+        starts = swaps_in | swaps_out
+        envs, pages, slots = envs[starts], pages[starts], slots[starts]
+        self._page_swap_queue_order[envs, pages] = -1
+        self._swapping_page[envs] = pages
+        self._swapping_to[envs] = slots
+        self._slot_page[envs, slots] = pages
+        self._swap_end_time[envs] = self._time_of(envs) + self._config.swap_delay_ms
+
+    def _complete_swaps(self, running):
+        envs = np.flatnonzero(running & (self._time >= self._swap_end_time))
+        pages = self._swapping_page[envs]
+        self._slot_page[envs, self._page_slot[envs, pages]] = -1
+        self._page_slot[envs, pages] = self._swapping_to[envs]
+        self._swapping_page[envs] = -1
+        self._swapping_to[envs] = -1
+        self._swap_end_time[envs] = _NO_DEADLINE
+
+    # I/O queue
+
+    def _wait_for_io_events(self, envs, rows):
+        positions = (
+            self._io_queue_head[envs] + self._io_queue_length[envs] + _rank_within_groups(envs)
+        ) % self._io_queue_capacity
+        self._io_waiter_row[envs, positions] = rows
+        self._io_waiter_pid[envs, positions] = self._pid[envs, rows]
+        self._io_waiter_since[envs, positions] = self._time_of(envs)
+        np.add.at(self._io_queue_length, envs, 1)
+
+    def _process_io_events(self, envs):
+        counts = self._io_event_count[envs]
+        max_count = counts.max(initial=0)
+        offsets = np.arange(max_count)
+        delivered = offsets[None, :] < counts[:, None]
+        positions = (self._io_queue_head[envs][:, None] + offsets) % self._io_queue_capacity
+        waiter_envs = np.broadcast_to(envs[:, None], positions.shape)[delivered]
+        positions = positions[delivered]
+        rows = self._io_waiter_row[waiter_envs, positions]
+        # Processes that have left the game since they started waiting are ignored.
+        is_waiter = (
+            self._exists[waiter_envs, rows] & ~self._has_ended[waiter_envs, rows]
+            & (self._pid[waiter_envs, rows] == self._io_waiter_pid[waiter_envs, positions])
+        )
+        self._set_blocking_condition(
+            waiter_envs[is_waiter], rows[is_waiter], waiting_for_io=False)
+
+        self._io_queue_head[envs] = (self._io_queue_head[envs] + counts) % self._io_queue_capacity
+        self._io_queue_length[envs] -= counts
+        self._io_event_count[envs] = 0
+
+    def _run_io_queue_check(self, running):
+        has_waiter = self._io_event_count < self._io_queue_length
+        next_waiter_position = (
+            (self._io_queue_head + self._io_event_count) % self._io_queue_capacity)
+        max_waiting_time_reached = has_waiter & (
+            self._time >= self._io_waiter_since[self._envs, next_waiter_position]
+                + MAX_IO_WAITING_TIME
+        )
+        self._io_event_count[running & max_waiting_time_reached] += 1
+        self._io_last_update_time[running & max_waiting_time_reached] = (
+            self._time[running & max_waiting_time_reached])
+
+        checks = (
+            running & ~max_waiting_time_reached
+            & (self._time >= self._io_last_update_time + ONE_SECOND)
+        )
+        self._io_last_update_time[checks] = self._time[checks]
+        envs = np.flatnonzero(checks & has_waiter)
+        releases = self._random['io_events'].integers(
+            1, IO_EVENT_PROBABILITY_DENOMINATOR + 1, len(envs)) == 1
+        envs = envs[releases]
+        self._io_event_count[envs] = self._random['io_events'].integers(
+            self._io_event_count[envs] + 1, self._io_queue_length[envs] + 1)
+
+    # Score and uptime
+
+    def _run_score_update(self, running):
+        envs = np.flatnonzero(running & (self._time >= self._next_score_update_time))
+        alive = self._exists[envs] & ~self._has_ended[envs]
+        happy = self._starvation_level[envs] == 0
+        active = alive & (self._cpu[envs] >= 0)
+        blocked = self._is_waiting_for_io[envs] | self._is_waiting_for_page[envs]
+
+        points_per_second = (
+            (alive & happy).sum(axis=1) * 100
+            + active.sum(axis=1) * 50
+            - (active & happy).sum(axis=1) * 50
+            - (self._exists[envs] & (self._cpu[envs] >= 0) & blocked).sum(axis=1) * 50
+            - self._io_event_count[envs] * 20
+        )
+        score = np.maximum(
+            self._score[envs] + points_per_second / (ONE_SECOND / SCORE_UPDATE_INTERVAL), 0)
+
+        user_terminated = (
+            self._user_terminated_process_count[envs]
+            != self._scored_user_terminated_process_count[envs]
+        )
+        score[user_terminated] = np.maximum(score[user_terminated] - 1000, 0)
+        gracefully_terminated = (
+            self._gracefully_terminated_process_count[envs]
+            != self._scored_gracefully_terminated_process_count[envs]
+        )
+        score[gracefully_terminated] += 1000
+
+        self._score[envs] = score
+        self._scored_user_terminated_process_count[envs] = (
+            self._user_terminated_process_count[envs])
+        self._scored_gracefully_terminated_process_count[envs] = (
+            self._gracefully_terminated_process_count[envs])
+        self._next_score_update_time[envs] = self._time[envs] + SCORE_UPDATE_INTERVAL
+
+    def _run_uptime_update(self, running):
+        envs = np.flatnonzero(running & (self._time >= self._next_uptime_update_time))
+        self._uptime[envs] += ONE_SECOND
+        self._next_uptime_update_time[envs] = self._time[envs] + ONE_SECOND
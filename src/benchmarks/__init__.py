@@ -0,0 +1,6 @@
+"""
+Performance benchmarks of the game.
+
+Run `python -m benchmarks` from the `src` directory to measure the time taken by the
+frames of the stage at each difficulty level, and to compare it with a baseline.
+"""
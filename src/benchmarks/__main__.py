@@ -0,0 +1,169 @@
+"""
+Entry point to benchmark the frames of the stage at each difficulty level.
+
+Results are printed and written as JSON. Given the results of a previous run as a baseline,
+timings that got slower by more than a threshold are reported as regressions, and the exit
+status is 1. Timings depend on the machine, so a baseline is only meaningful on the machine
+it was measured on.
+
+With `--scaling`, a parameter of the stage is swept over increasing sizes instead, and the
+cost of the updates of the process and page managers and of rendering is printed for each
+size, along with how fast each cost grows with the size.
+"""
+
+import argparse
+import os
+import sys
+
+import pygame
+
+from benchmarks.stage_benchmark import (
+    MEASURES, BenchmarkFormatError, benchmark_stage, find_regressions, results_from_json,
+    results_to_json
+)
+from benchmarks.scaling_benchmark import (
+    DEFAULT_SIZES, SCALING_PARAMETERS, benchmark_size, scaling_exponent
+)
+from benchmarks.scaling_benchmark import MEASURES as SCALING_MEASURES
+from cli import print_table, resolve_path
+from constants import ONE_SECOND
+from difficulty_levels import difficulty_levels_map
+from window_size import WINDOW_SIZE
+
+
+def _init_screen():
+    # The dummy video driver renders without a window, unless a driver is chosen explicitly.
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.display.init()
+    return pygame.display.set_mode(WINDOW_SIZE)
+
+
+def print_results(results, out_file=sys.stdout):
+    header = ['Difficulty', 'Frames', 'Games']
+    for measure in MEASURES:
+        header += [f'{measure.capitalize()} mean (ms)', f'{measure.capitalize()} p99 (ms)']
+    rows = [header]
+    for name, result in results.items():
+        row = [name, str(result.frames), str(result.games)]
+        for measure in MEASURES:
+            stats = getattr(result, measure)
+            row += [f'{stats.mean_ms:.3f}', f'{stats.p99_ms:.3f}']
+        rows.append(row)
+    print_table(rows, out_file)
+
+
+def print_scaling(parameter, points, out_file=sys.stdout):
+    header = [parameter.capitalize().replace('_', ' '), 'Frames']
+    for measure in SCALING_MEASURES:
+        header += [f'{measure} mean (ms)', f'{measure} p99 (ms)']
+    rows = [header]
+    for point in points:
+        row = [str(point.size), str(point.frames)]
+        for measure in SCALING_MEASURES:
+            stats = getattr(point, measure)
+            row += [f'{stats.mean_ms:.3f}', f'{stats.p99_ms:.3f}']
+        rows.append(row)
+    print_table(rows, out_file)
+
+    if len(points) < 2:
+        return
+    print('\nGrowth of the mean cost with the size (0: constant, 1: linear, 2: quadratic):',
+          file=out_file)
+    sizes = [point.size for point in points]
+    for measure in SCALING_MEASURES:
+        exponent = scaling_exponent(
+            sizes, [getattr(point, measure).mean_ms for point in points])
+        print(f'  {measure}: size^{exponent:.2f}', file=out_file)
+
+
+def _run_scaling(args):
+    base_config = difficulty_levels_map[(args.difficulties or ['normal'])[0]].config
+    screen = _init_screen()
+    points = []
+    for size in args.sizes or DEFAULT_SIZES[args.scaling]:
+        print(f'Benchmarking {args.scaling}={size}...', file=sys.stderr)
+        points.append(benchmark_size(
+            args.scaling, size, base_config, screen,
+            seed=args.seed, duration_ms=int(args.minutes * 60 * ONE_SECOND)))
+    print_scaling(args.scaling, points)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                prog="benchmarks",
+                description="Measure the time taken by the frames of the stage at each"
+                    " difficulty level, and compare it with a baseline")
+    parser.add_argument('--difficulties', nargs='+',
+        choices=difficulty_levels_map.keys(), metavar='DIFFICULTY',
+        help="difficulty levels to benchmark, among"
+            f" {', '.join(difficulty_levels_map)} (default: all, or normal with --scaling)")
+    parser.add_argument('--seed', type=int, default=0,
+        help="seed of the games (default: 0)")
+    parser.add_argument('--minutes', type=float, default=2,
+        help="simulated minutes played at each difficulty level (default: 2)")
+    parser.add_argument('--output', default='benchmark-results.json', metavar='RESULTS_FILE',
+        help="JSON file to write the results to (default: benchmark-results.json)")
+    parser.add_argument('--baseline', metavar='BASELINE_FILE',
+        help="JSON file with the results of a previous run, to compare with")
+    parser.add_argument('--threshold', type=float, default=0.1,
+        help="relative slowdown from the baseline reported as a regression (default: 0.1)")
+    parser.add_argument('--scaling', choices=SCALING_PARAMETERS.keys(),
+        help="sweep the size of a parameter instead, from the configuration of a single"
+            " difficulty level")
+    parser.add_argument('--sizes', nargs='+', type=int,
+        help="with --scaling, sizes of the parameter (default: from below to beyond the"
+            " limits of the game)")
+    args = parser.parse_args()
+
+    if args.scaling is not None:
+        if args.baseline is not None:
+            parser.error('--baseline cannot be used with --scaling')
+        if args.difficulties is not None and len(args.difficulties) != 1:
+            parser.error('--scaling takes a single difficulty level')
+        _run_scaling(args)
+        return 0
+    difficulties = args.difficulties or list(difficulty_levels_map)
+
+    baseline = None
+    if args.baseline is not None:
+        try:
+            with open(resolve_path(args.baseline), encoding='utf_8') as in_file:
+                baseline = results_from_json(in_file.read())
+        except (OSError, BenchmarkFormatError) as exc:
+            parser.error(f'cannot read the baseline: {exc}')
+
+    screen = _init_screen()
+    duration_ms = int(args.minutes * 60 * ONE_SECOND)
+    results = {}
+    for name in difficulties:
+        print(f'Benchmarking {name}...', file=sys.stderr)
+        results[name] = benchmark_stage(
+            difficulty_levels_map[name].config, screen, seed=args.seed, duration_ms=duration_ms)
+
+    with open(resolve_path(args.output), 'w', encoding='utf_8') as out_file:
+        out_file.write(results_to_json(results, seed=args.seed, duration_ms=duration_ms))
+    print_results(results)
+
+    if baseline is None:
+        return 0
+    regressions = find_regressions(baseline, results, threshold=args.threshold)
+    if not regressions:
+        print('\nNo regression')
+        return 0
+    print('\nRegressions:')
+    rows = [('Difficulty', 'Measure', 'Statistic', 'Baseline (ms)', 'Current (ms)', 'Change')]
+    for regression in regressions:
+        rows.append((
+            regression.name,
+            regression.measure,
+            regression.statistic.removesuffix('_ms'),
+            f'{regression.baseline_ms:.3f}',
+            f'{regression.current_ms:.3f}',
+            f'{regression.ratio - 1:+.0%}',
+        ))
+    print_table(rows)
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
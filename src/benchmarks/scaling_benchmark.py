@@ -0,0 +1,140 @@
+"""
+Benchmark of how the cost of a frame grows with the size of the stage.
+
+One parameter of the stage is swept over increasing sizes, the others keeping the
+configuration of a difficulty level: the number of processes, the number of CPUs, or the
+number of page slots. At each size, the stage is played like in `stage_benchmark`, and the
+wall time of `ProcessManager.update`, `PageManager.update` and of rendering is measured
+at each frame.
+
+The growth of each cost is summarized by the exponent of a power law fitted to the mean
+costs: about 0 for a constant cost, 1 for a cost that is linear in the size, and 2 for a
+quadratic one. Sizes can go beyond the limits of the game, to see how raising them would
+affect frames.
+"""
+
+from dataclasses import dataclass, replace
+import math
+import time
+
+from benchmarks.stage_benchmark import BENCHMARK_SCRIPT, TimingStats
+from constants import ONE_SECOND
+from engine.clock import FixedStepClock
+from engine.game_manager import GameManager
+from game_objects.page_manager import PageManager
+from scenes.stage import Stage
+
+MEASURES = ('process_manager_update', 'page_manager_update', 'render')
+
+
+def _with_processes(config, size):
+    return replace(config, num_processes_at_startup=size, max_processes=size)
+
+
+def _with_cpus(config, size):
+    return replace(config, num_cpus=size)
+
+
+def _with_page_slots(config, size):
+    # Half the page slots are in RAM, as a whole number of rows.
+    total_rows = max(2, round(size / PageManager.get_num_cols()))
+    return replace(config, num_ram_rows=total_rows // 2, num_page_rows=total_rows)
+
+
+SCALING_PARAMETERS = {
+    'processes': _with_processes,
+    'cpus': _with_cpus,
+    'page_slots': _with_page_slots,
+}
+
+DEFAULT_SIZES = {
+    'processes': (7, 14, 28, 42, 84, 168),
+    'cpus': (1, 2, 4, 8, 16, 32),
+    'page_slots': (64, 128, 176, 352, 704),
+}
+
+
+def _time_calls(obj, method_name, durations_ms):
+    """Replaces a method of an object, to append the wall time of each call to a list."""
+    method = getattr(obj, method_name)
+
+    def timed_method(*args, **kwargs):
+        start_time = time.perf_counter_ns()
+        result = method(*args, **kwargs)
+        durations_ms.append((time.perf_counter_ns() - start_time) / 1e6)
+        return result
+
+    setattr(obj, method_name, timed_method)
+
+
+@dataclass(frozen=True)
+class ScalingPoint:
+    size: int
+    frames: int
+    process_manager_update: TimingStats
+    page_manager_update: TimingStats
+    render: TimingStats
+
+
+def benchmark_size(parameter, size, base_config, screen, *, seed: int, duration_ms: int,
+                   script=BENCHMARK_SCRIPT):
+    """Plays the stage with one parameter set to the given size, and times each frame.
+
+    Args:
+        parameter: The swept parameter, among `SCALING_PARAMETERS`.
+        base_config: The `StageConfig` of the other parameters.
+        screen: The display surface the stage is rendered to.
+
+    Returns:
+        ScalingPoint: The timing statistics at this size.
+    """
+    config = SCALING_PARAMETERS[parameter](base_config, size)
+    durations_ms = {measure: [] for measure in MEASURES}
+
+    stage = Stage(config=config, script=script, standalone=True, seed=seed)
+    stage.screen = screen
+    stage.clock = FixedStepClock(ONE_SECOND / GameManager.fps)
+
+    def setup():
+        stage.setup()
+        _time_calls(stage.process_manager, 'update', durations_ms['process_manager_update'])
+        _time_calls(stage.page_manager, 'update', durations_ms['page_manager_update'])
+
+    setup()
+    _time_calls(stage, 'render', durations_ms['render'])
+    frames = 0
+    # pylint confuses the properties overridden by `Stage` with methods.
+    # pylint: disable=comparison-with-callable,using-constant-test
+    while stage.current_time < duration_ms:
+        if stage.is_finished:
+            setup()
+        stage.clock.tick()
+        stage.update(stage.current_time, [])
+        stage.render()
+        frames += 1
+
+    return ScalingPoint(
+        size=size,
+        frames=frames,
+        **{
+            measure: TimingStats.from_durations(durations)
+            for measure, durations in durations_ms.items()
+        },
+    )
+
+
+def scaling_exponent(sizes, costs):
+    """Returns the exponent `k` of the power law `cost = a * size ** k` closest to the costs.
+
+    The power law is fitted by least squares on the logarithms of sizes and costs.
+    """
+    log_sizes = [math.log(size) for size in sizes]
+    log_costs = [math.log(cost) for cost in costs]
+    mean_log_size = sum(log_sizes) / len(log_sizes)
+    mean_log_cost = sum(log_costs) / len(log_costs)
+    covariance = sum(
+        (log_size - mean_log_size) * (log_cost - mean_log_cost)
+        for log_size, log_cost in zip(log_sizes, log_costs)
+    )
+    variance = sum((log_size - mean_log_size) ** 2 for log_size in log_sizes)
+    return covariance / variance
@@ -0,0 +1,184 @@
+"""
+Benchmark of the frames of the stage, at each difficulty level.
+
+The stage is played with a fixed seed and a built-in automation script, frame by frame,
+like in a window: every frame is updated and rendered, on a `FixedStepClock` so that the
+simulated game does not depend on how long frames take. Games that end before the
+simulated duration are started again. The wall time of `Stage.update`, of `Scene.render`
+and of the whole frame is measured at each frame, and summarized by its mean and 99th
+percentile, since frames drop on the slowest frames rather than on average ones.
+
+Rendering draws to the display surface, so the display needs to be initialized, e.g. with
+the dummy video driver of SDL when there is no screen.
+"""
+
+from dataclasses import asdict, dataclass
+import json
+import statistics
+import time
+
+from constants import ONE_SECOND
+from engine.clock import FixedStepClock
+from engine.game_manager import GameManager
+from scenes.stage import Stage
+
+_VERSION = 1
+
+MEASURES = ('update', 'render', 'frame')
+
+# Plays well enough for games to last, so that frames have many processes and pages.
+BENCHMARK_SCRIPT = '''
+running = set()
+
+def run_os(events):
+    actions = []
+    for event in events:
+        if event.etype in ('PROC_NEW', 'PROC_STARV') and len(running) < num_cpus:
+            if event.pid not in running:
+                running.add(event.pid)
+                actions.append({'type': 'process', 'pid': event.pid})
+        elif event.etype in ('PROC_TERM', 'PROC_KILL'):
+            running.discard(event.pid)
+        elif event.etype == 'PROC_WAIT_IO' and event.waiting_for_io:
+            running.discard(event.pid)
+            actions.append({'type': 'process', 'pid': event.pid})
+        elif event.etype == 'IO_QUEUE' and event.io_count > 0:
+            actions.append({'type': 'io_queue'})
+        elif event.etype == 'PAGE_NEW' and event.swap:
+            actions.append({'type': 'page', 'pid': event.pid, 'idx': event.idx})
+    return actions
+'''
+
+
+class BenchmarkFormatError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class TimingStats:
+    mean_ms: float
+    p99_ms: float
+
+    @classmethod
+    def from_durations(cls, durations_ms):
+        if len(durations_ms) < 2:
+            return cls(durations_ms[0], durations_ms[0])
+        return cls(
+            statistics.fmean(durations_ms),
+            statistics.quantiles(durations_ms, n=100, method='inclusive')[98],
+        )
+
+
+@dataclass(frozen=True)
+class StageBenchmark:
+    frames: int
+    games: int
+    update: TimingStats
+    render: TimingStats
+    frame: TimingStats
+
+
+def benchmark_stage(config, screen, *, seed: int, duration_ms: int, script=BENCHMARK_SCRIPT):
+    """Plays the stage frame by frame for a simulated duration, and times each frame.
+
+    Args:
+        config: The `StageConfig` of the stage.
+        screen: The display surface the stage is rendered to.
+
+    Returns:
+        StageBenchmark: The number of frames and games played, and the timing statistics.
+    """
+    stage = Stage(config=config, script=script, standalone=True, seed=seed)
+    stage.screen = screen
+    stage.clock = FixedStepClock(ONE_SECOND / GameManager.fps)
+    stage.setup()
+
+    durations_ms = {measure: [] for measure in MEASURES}
+    games = 1
+    # pylint confuses the properties overridden by `Stage` with methods.
+    # pylint: disable=comparison-with-callable,using-constant-test
+    while stage.current_time < duration_ms:
+        if stage.is_finished:
+            games += 1
+            stage.setup()
+        stage.clock.tick()
+        start_time = time.perf_counter_ns()
+        stage.update(stage.current_time, [])
+        update_end_time = time.perf_counter_ns()
+        stage.render()
+        end_time = time.perf_counter_ns()
+        durations_ms['update'].append((update_end_time - start_time) / 1e6)
+        durations_ms['render'].append((end_time - update_end_time) / 1e6)
+        durations_ms['frame'].append((end_time - start_time) / 1e6)
+
+    return StageBenchmark(
+        frames=len(durations_ms['frame']),
+        games=games,
+        **{
+            measure: TimingStats.from_durations(durations)
+            for measure, durations in durations_ms.items()
+        },
+    )
+
+
+def results_to_json(results, *, seed: int, duration_ms: int):
+    """Returns benchmark results, by difficulty level, as a JSON document."""
+    return json.dumps({
+        'version': _VERSION,
+        'seed': seed,
+        'duration_ms': duration_ms,
+        'results': {name: asdict(result) for name, result in results.items()},
+    }, indent=2)
+
+
+def results_from_json(text):
+    """Parses a JSON document written by `results_to_json`, and returns the results."""
+    try:
+        document = json.loads(text)
+        if document['version'] != _VERSION:
+            raise BenchmarkFormatError(f'unsupported version: {document["version"]}')
+        return {
+            name: StageBenchmark(
+                frames=result['frames'],
+                games=result['games'],
+                **{measure: TimingStats(**result[measure]) for measure in MEASURES},
+            )
+            for name, result in document['results'].items()
+        }
+    except (ValueError, KeyError, TypeError) as exc:
+        raise BenchmarkFormatError(f'invalid benchmark results: {exc}') from exc
+
+
+@dataclass(frozen=True)
+class Regression:
+    name: str
+    measure: str
+    statistic: str
+    baseline_ms: float
+    current_ms: float
+
+    @property
+    def ratio(self):
+        return self.current_ms / self.baseline_ms
+
+
+def find_regressions(baseline, results, *, threshold=0.1):
+    """Compares results with a baseline, and returns the timings that got slower.
+
+    A timing regresses when it exceeds the baseline by more than `threshold`, relative to
+    the baseline. Difficulty levels missing from the baseline are not compared.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for measure in MEASURES:
+            baseline_stats = getattr(baseline[name], measure)
+            stats = getattr(result, measure)
+            for statistic in ('mean_ms', 'p99_ms'):
+                baseline_ms = getattr(baseline_stats, statistic)
+                current_ms = getattr(stats, statistic)
+                if current_ms > baseline_ms * (1 + threshold):
+                    regressions.append(
+                        Regression(name, measure, statistic, baseline_ms, current_ms))
+    return regressions
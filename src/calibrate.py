@@ -0,0 +1,229 @@
+"""
+Entry point to calibrate a difficulty level against a reference automation script.
+
+Given a target median uptime, the calibration searches for the configuration at which the
+reference script survives for that long. The parameters to tune are given as ranges
+`name=easiest:hardest`, e.g. `io_probability=0.01:0.3` or `num_cpus=8:2`, and are all moved
+together from their easiest to their hardest values, by bisection on a single difficulty
+factor between 0 and 1. This assumes that the uptime gets shorter as the difficulty factor
+grows.
+
+At each step, the configuration is played headless with every seed in parallel, in a pool
+of worker processes. Games are stopped at three times the target uptime, which does not
+change the median as long as most games end before.
+
+The result is printed as a `DifficultyLevel`, ready to be added to `difficulty_levels.py`.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from functools import partial
+from os import path
+import argparse
+import statistics
+import sys
+
+from cli import format_uptime, parse_uptime, resolve_path
+from difficulty_levels import DifficultyLevel, difficulty_levels_map
+from stage_config import CONFIG_FIELD_TYPES, StageConfig
+from tournament import parse_seed_range, run_headless_game
+
+# Fields always listed in the presets of `difficulty_levels.py`, even with default values.
+_PRESET_FIELDS = (
+    'num_cpus',
+    'num_processes_at_startup',
+    'num_ram_rows',
+    'swap_delay_ms',
+    'new_process_probability',
+    'priority_process_probability',
+    'io_probability',
+)
+
+_MAX_UPTIME_FACTOR = 3
+
+
+@dataclass(frozen=True)
+class TunedParameter:
+    name: str
+    easiest: float
+    hardest: float
+
+    @classmethod
+    def parse(cls, arg):
+        """Parses `name=easiest:hardest`."""
+        name, equals, spec = arg.partition('=')
+        if not equals or name not in CONFIG_FIELD_TYPES:
+            raise ValueError(f'not a StageConfig field: {name}')
+        bounds = spec.split(':')
+        if len(bounds) != 2:
+            raise ValueError(f'invalid range: {spec}')
+        field_type = CONFIG_FIELD_TYPES[name]
+        return cls(name, field_type(bounds[0]), field_type(bounds[1]))
+
+    def value_at(self, difficulty: float):
+        """Returns the value of the parameter at a difficulty factor between 0 and 1."""
+        value = self.easiest + difficulty * (self.hardest - self.easiest)
+        if CONFIG_FIELD_TYPES[self.name] is int:
+            return round(value)
+        if self.name.endswith('_probability'):
+            # Probabilities are only used in whole percents.
+            return round(value, 2)
+        return value
+
+
+def config_at(base_config: StageConfig, parameters, difficulty: float):
+    return replace(
+        base_config,
+        **{parameter.name: parameter.value_at(difficulty) for parameter in parameters}
+    )
+
+
+@dataclass(frozen=True)
+class CalibrationStep:
+    difficulty: float
+    config: StageConfig
+    median_uptime_ms: float
+
+
+def calibrate(evaluate, base_config: StageConfig, parameters, target_uptime_ms: int, *,
+              tolerance=0.05, max_steps=12, on_step=None):
+    """Searches for the configuration whose median uptime is closest to the target.
+
+    Args:
+        evaluate: Function returning the median uptime of a configuration.
+        tolerance: Relative difference to the target uptime at which the search stops.
+        max_steps: Maximum number of configurations evaluated.
+        on_step: Called with each `CalibrationStep`.
+
+    Returns:
+        CalibrationStep: The evaluated configuration closest to the target.
+    """
+    steps = []
+
+    def evaluate_at(difficulty):
+        config = config_at(base_config, parameters, difficulty)
+        step = CalibrationStep(difficulty, config, evaluate(config))
+        steps.append(step)
+        if on_step is not None:
+            on_step(step)
+        return step
+
+    def is_close_enough(step):
+        return abs(step.median_uptime_ms - target_uptime_ms) <= tolerance * target_uptime_ms
+
+    def closest_step():
+        return min(steps, key=lambda step: abs(step.median_uptime_ms - target_uptime_ms))
+
+    easiest = evaluate_at(0)
+    hardest = evaluate_at(1)
+    if (
+        easiest.median_uptime_ms <= target_uptime_ms
+        or hardest.median_uptime_ms >= target_uptime_ms
+    ):
+        # The target is out of reach within the ranges of the parameters.
+        return closest_step()
+
+    while len(steps) < max_steps and not is_close_enough(closest_step()):
+        difficulty = (easiest.difficulty + hardest.difficulty) / 2
+        if config_at(base_config, parameters, difficulty) in (easiest.config, hardest.config):
+            # Parameters cannot be tuned more finely.
+            break
+        step = evaluate_at(difficulty)
+        if step.median_uptime_ms > target_uptime_ms:
+            easiest = step
+        else:
+            hardest = step
+    return closest_step()
+
+
+def median_uptime(script_path, seeds, executor, max_uptime_ms, config):
+    """Plays a configuration with every seed, and returns the median uptime in ms."""
+    results = list(executor.map(
+        partial(run_headless_game, script_path, config, max_uptime_ms=max_uptime_ms), seeds))
+    for result in results:
+        if result.error:
+            raise RuntimeError(f'The script failed: {result.error}')
+    return statistics.median(result.uptime_ms for result in results)
+
+
+def format_difficulty_level(difficulty_level: DifficultyLevel):
+    """Returns the Python code of a difficulty level, in the style of `difficulty_levels.py`."""
+    default_config = StageConfig()
+    config = difficulty_level.config
+    lines = [
+        f'_{difficulty_level.name.lower()}_difficulty = DifficultyLevel(',
+        f'    {difficulty_level.name!r},',
+        '    StageConfig(',
+    ]
+    for name in CONFIG_FIELD_TYPES:
+        value = getattr(config, name)
+        if name in _PRESET_FIELDS or value != getattr(default_config, name):
+            lines.append(f'        {name}={value!r},')
+    lines += ['    )', ')']
+    return '\n'.join(lines)
+
+
+def _tuned_parameter(arg):
+    try:
+        return TunedParameter.parse(arg)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                prog="calibrate",
+                description="Find the difficulty at which a reference automated script"
+                    " survives for a target median uptime")
+    parser.add_argument('script', help="filename of the reference automated script")
+    parser.add_argument('target_uptime', type=parse_uptime,
+        help="target median uptime, in seconds or as M:SS or H:MM:SS")
+    parser.add_argument('parameters', nargs='+', type=_tuned_parameter,
+        metavar='name=easiest:hardest', help="StageConfig field to tune, with its range")
+    parser.add_argument('--name', default='Custom', help="name of the difficulty level")
+    parser.add_argument('--difficulty', default='normal', choices=difficulty_levels_map.keys(),
+        help="difficulty level the other fields are taken from (default: normal)")
+    parser.add_argument('--seeds', type=parse_seed_range, default=range(21),
+        metavar='[START:]STOP',
+        help="seeds of the games played for each configuration, from START (0 by default)"
+            " to STOP excluded (default: 21)")
+    parser.add_argument('--tolerance', type=float, default=0.05,
+        help="relative difference to the target at which to stop (default: 0.05)")
+    parser.add_argument('--max-steps', type=int, default=12,
+        help="maximum number of configurations to try (default: 12)")
+    parser.add_argument('--jobs', type=int,
+        help="number of games played in parallel (default: number of CPUs)")
+    args = parser.parse_args()
+
+    script_path = path.abspath(resolve_path(args.script))
+    if not path.isfile(script_path):
+        parser.error(f'script not found: {script_path}')
+
+    def print_step(step):
+        print(f'Difficulty {step.difficulty:.4f}: median uptime'
+              f' {format_uptime(step.median_uptime_ms)}', file=sys.stderr)
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        evaluate = partial(median_uptime, script_path, args.seeds, executor,
+                           _MAX_UPTIME_FACTOR * args.target_uptime)
+        try:
+            step = calibrate(
+                evaluate, difficulty_levels_map[args.difficulty].config, args.parameters,
+                args.target_uptime, tolerance=args.tolerance, max_steps=args.max_steps,
+                on_step=print_step)
+        except RuntimeError as exc:
+            print(exc, file=sys.stderr)
+            return 1
+
+    if abs(step.median_uptime_ms - args.target_uptime) > args.tolerance * args.target_uptime:
+        print('The target uptime could not be reached within tolerance, with these ranges'
+              ' and steps. The closest difficulty level is printed.', file=sys.stderr)
+    print(f'# Median uptime of {path.basename(script_path)}:'
+          f' {format_uptime(step.median_uptime_ms)}'
+          f' (target: {format_uptime(args.target_uptime)})')
+    print(format_difficulty_level(DifficultyLevel(args.name, step.config)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
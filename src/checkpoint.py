@@ -0,0 +1,128 @@
+"""
+Checkpoints of long headless games, to resume them after the process is killed.
+
+A checkpoint contains the logical state of the stage, as captured by `Stage.snapshot`:
+processes, pages, I/O queue, score, uptime, timers, random number generators and the
+clock, along with the variables of the automation script: its global variables, and the
+attributes of its classes. A game resumed from a checkpoint plays on exactly like it would
+have without the interruption.
+
+The stage resuming a checkpoint needs the same automation script. The configuration and
+seed do not matter, as they are part of the checkpoint. Checkpoints are pickled, so they
+must only be loaded from trusted files, and only by the version of the game that saved them.
+"""
+
+from os import path
+import os
+import pickle
+import time
+
+from engine.snapshot import Snapshot
+
+_MAGIC = b'YTOSCHECKPOINT'
+_VERSION = 2
+
+
+class CheckpointFormatError(Exception):
+    pass
+
+
+def _external_objects(stage):
+    # Objects that are not part of the logical state, and are the same after resuming.
+    return (
+        stage.scene_manager,
+        getattr(stage, 'screen', None),
+        stage.script,
+        stage.script_callback,
+    )
+
+
+def save_checkpoint(stage, out_file):
+    """Writes the state of the stage and of its automation script to a binary file."""
+    out_file.write(_MAGIC)
+    pickle.dump(_VERSION, out_file)
+    stage.snapshot().save(out_file, _external_objects(stage))
+    # The functions and classes of the script cannot be pickled by reference, as they are
+    # not defined in a module, so the objects of the script refer to those of the new run.
+    definitions = stage.script_definitions
+    try:
+        Snapshot(stage.script_state, stage, shared=definitions).save(out_file, definitions)
+    except (pickle.PicklingError, TypeError, AttributeError) as exc:
+        raise CheckpointFormatError(f'cannot save the state of the script: {exc}') from exc
+
+
+def load_checkpoint(stage, in_file):
+    """Restores the state of the stage and of its automation script from a binary file.
+
+    The stage needs to be set up, so that its automation script is loaded.
+    """
+    if in_file.read(len(_MAGIC)) != _MAGIC:
+        raise CheckpointFormatError('not a checkpoint file')
+    try:
+        version = pickle.load(in_file)
+        if version != _VERSION:
+            raise CheckpointFormatError(f'unsupported checkpoint version: {version}')
+        snapshot = Snapshot.read(in_file, _external_objects(stage))
+        script_snapshot = Snapshot.read(in_file, stage.script_definitions)
+    except (pickle.UnpicklingError, EOFError, IndexError) as exc:
+        raise CheckpointFormatError(f'corrupted checkpoint: {exc}') from exc
+    stage.restore(snapshot)
+    stage.script_state = script_snapshot.load(stage)
+
+
+class Checkpointer:
+    def __init__(self, file_path: str, *, interval_s: float = 60):
+        """Saves the game played on a stage periodically, and resumes it on startup.
+
+        Args:
+            file_path: The checkpoint file. If it exists when the first game starts, the
+                game is resumed from it instead.
+            interval_s: Wall-clock time between checkpoints, in seconds.
+        """
+        self._file_path = file_path
+        self._interval_s = interval_s
+        self._has_started = False
+        self._resumed = False
+        self._last_save_time = None
+        self._saved_game_over = False
+
+    @property
+    def file_path(self):
+        return self._file_path
+
+    @property
+    def resumed(self):
+        """Whether the first game was resumed from the checkpoint file."""
+        return self._resumed
+
+    def start(self, stage):
+        """Called by the stage when a game starts."""
+        if not self._has_started and path.exists(self._file_path):
+            with open(self._file_path, 'rb') as in_file:
+                load_checkpoint(stage, in_file)
+            self._resumed = True
+        self._has_started = True
+        self._saved_game_over = False
+        self._last_save_time = time.monotonic()
+
+    def record_tick(self, stage):
+        """Called by the stage after each update. Saves a checkpoint when it is time, and
+        once at game over, so that resuming a finished game gives its result."""
+        if stage.game_over:
+            if not self._saved_game_over:
+                self.save(stage)
+                self._saved_game_over = True
+        elif time.monotonic() - self._last_save_time >= self._interval_s:
+            self.save(stage)
+
+    def save(self, stage):
+        """Saves a checkpoint of the stage now.
+
+        The checkpoint is written to a temporary file first, so that the previous checkpoint
+        is kept if the process is killed while writing.
+        """
+        temp_file_path = self._file_path + '.tmp'
+        with open(temp_file_path, 'wb') as out_file:
+            save_checkpoint(stage, out_file)
+        os.replace(temp_file_path, self._file_path)
+        self._last_save_time = time.monotonic()
@@ -0,0 +1,42 @@
+"""
+Helpers shared by the command-line entry points of the game.
+"""
+
+from datetime import timedelta
+from os import path
+import sys
+
+from constants import ONE_SECOND
+
+
+def resolve_path(file_path):
+    """Resolves a path given on the command line, relative to the root of the repository.
+
+    Entry points are run from the `src` directory, by the scripts at the root of the
+    repository, so relative paths are relative to its parent directory.
+    """
+    if not path.isabs(file_path):
+        return path.join('..', file_path)
+    return file_path
+
+
+def parse_uptime(arg):
+    """Parses an uptime or a duration in seconds, or as `M:SS` or `H:MM:SS`, into
+    milliseconds."""
+    seconds = 0
+    for part in arg.split(':'):
+        seconds = seconds * 60 + float(part)
+    return int(seconds * ONE_SECOND)
+
+
+def format_uptime(uptime_ms):
+    """Formats an uptime or a duration in milliseconds as `H:MM:SS`."""
+    return str(timedelta(seconds=int(uptime_ms // ONE_SECOND)))
+
+
+def print_table(rows, out_file=sys.stdout):
+    """Prints rows of strings as a table, the first row being the header."""
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print('  '.join(value.ljust(width) for value, width in zip(row, widths)).rstrip(),
+              file=out_file)
@@ -14,5 +14,18 @@ MIN_PROCESSES_AT_STARTUP = 1
 MAX_PROCESSES_AT_STARTUP = 42
 MIN_RAM_ROWS = 1
 MAX_RAM_ROWS = 11
+NUM_PAGE_ROWS = 11
 
 MAX_PAGES_PER_PROCESS = 4
+
+MAX_IO_WAITING_TIME = 5000
+
+TIME_FOR_PROCESS_HAPPINESS = 5000
+TIME_BETWEEN_STARVATION_LEVELS = 10000
+PRIORITY_TIME_BETWEEN_STARVATION_LEVELS = 6000
+
+STARTUP_PROCESS_CREATION_INTERVAL = 50
+SCORE_UPDATE_INTERVAL = 100
+
+NEW_PAGE_PROBABILITY_DENOMINATOR = 20
+IO_EVENT_PROBABILITY_DENOMINATOR = 3
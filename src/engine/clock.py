@@ -0,0 +1,69 @@
+"""
+Clocks provide the current time of a scene, in milliseconds.
+
+The time is sampled once per tick, so that every game object sees the same
+time during a frame, no matter how many times it is read.
+"""
+
+from abc import ABC, abstractmethod
+
+import pygame
+
+
+class Clock(ABC):
+    def __init__(self):
+        self._current_time = 0
+
+    @property
+    def current_time(self):
+        return self._current_time
+
+    @abstractmethod
+    def tick(self):
+        """Samples or advances the time for the next frame."""
+
+
+class RealTimeClock(Clock):
+    """Clock that follows wall-clock time since pygame was initialized."""
+
+    def tick(self):
+        self._current_time = pygame.time.get_ticks()
+
+
+class FixedStepClock(Clock):
+    """Clock that only advances when told to, by a fixed step at each tick.
+
+    Frame timing is fully repeatable, and independent of how fast frames are computed.
+    """
+
+    def __init__(self, step_ms: float, start_time: int = 0):
+        super().__init__()
+        self._step_ms = step_ms
+        # Time is computed from a number of steps since a base time rather than by
+        # accumulating steps, to avoid drifting because of floating-point rounding.
+        self._base_time = start_time
+        self._step_count = 0
+        self._current_time = start_time
+
+    @property
+    def step_ms(self):
+        return self._step_ms
+
+    @property
+    def _elapsed(self):
+        return self._base_time + self._step_count * self._step_ms
+
+    def tick(self):
+        self._step_count += 1
+        self._current_time = int(self._elapsed)
+
+    def advance(self, duration_ms: float):
+        self._base_time = self._elapsed + duration_ms
+        self._step_count = 0
+        self._current_time = int(self._base_time)
+
+    def advance_to(self, time_ms: int):
+        if time_ms > self._elapsed:
+            self._base_time = time_ms
+            self._step_count = 0
+            self._current_time = int(time_ms)
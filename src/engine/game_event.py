@@ -9,5 +9,9 @@ class GameEvent():
     def type(self):
         return self._type
 
+    @property
+    def properties(self):
+        return self._properties
+
     def get_property(self, name):
         return self._properties[name]
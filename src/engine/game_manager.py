@@ -3,8 +3,10 @@ from typing import Union
 
 import pygame
 
+from engine.clock import FixedStepClock
 from engine.game_event import GameEvent
 from engine.game_event_type import GameEventType
+from engine.game_object import cost_accounting
 from engine.scene import Scene
 from engine.scene_manager import SceneManager
 from engine.window_config import WindowConfig
@@ -38,6 +40,7 @@ class GameManager():
         self._screen = None
         self._scene_manager = SceneManager()
         self._startup_scene = None
+        self._profiler = None
 
         self._mouse_down = False
         self._shift_down = False
@@ -46,6 +49,15 @@ class GameManager():
     def current_scene(self):
         return self._current_scene
 
+    @property
+    def profiler(self):
+        """Profiler started before the startup scene, and stopped when the main loop ends."""
+        return self._profiler
+
+    @profiler.setter
+    def profiler(self, value):
+        self._profiler = value
+
     def _init_pygame(self):
         pygame.init()
         pygame.font.init()
@@ -117,6 +129,7 @@ class GameManager():
 
             scene = self._scene_manager.current_scene
 
+            scene.clock.tick()
             scene.update(self._scene_manager.current_scene.current_time, events)
             if scene != self._scene_manager.current_scene:
                 scene = self._scene_manager.current_scene
@@ -125,15 +138,52 @@ class GameManager():
                 )
 
             scene.render()
+            cost_accounting.end_frame()
 
             clock.tick(self.fps)
 
             await asyncio.sleep(0)
 
-    async def play(self, ignore_events=False):
-        self._init_pygame()
-        self._init_screen()
+    def _main_loop_headless(self, max_time_ms=None):
+        """Steps the current scene as fast as possible, without a window or user input.
+
+        Scenes use a `FixedStepClock`, so simulated time advances independently of
+        wall-clock time, as in `Scene.step_headless`. The loop ends when the scene reports
+        that it is finished, or when its time reaches `max_time_ms`.
+        """
+        while not self._scene_manager.current_scene.is_finished:
+            scene = self._scene_manager.current_scene
+            if max_time_ms is not None and scene.current_time >= max_time_ms:
+                return
+            scene.step_headless()
+            cost_accounting.end_frame()
+
+    async def play(self, ignore_events=False, headless=False, max_time_ms=None):
+        """Runs the game, from the startup scene.
+
+        Args:
+            ignore_events: Whether to ignore user input.
+            headless: Whether to run without a window, as fast as possible.
+            max_time_ms: In headless mode, time of the current scene at which to stop,
+                even if it is not finished.
+        """
         if self.startup_scene is None:
             raise ValueError('Property `startup_scene` needs to be set.')
-        self._scene_manager.start_scene(self.startup_scene)
-        await self._main_loop(ignore_events)
+        if headless:
+            for scene in self._scene_manager.scenes:
+                scene.clock = FixedStepClock(1000 / self.fps)
+                scene.headless = True
+        else:
+            self._init_pygame()
+            self._init_screen()
+        if self._profiler is not None:
+            self._profiler.start()
+        try:
+            self._scene_manager.start_scene(self.startup_scene)
+            if headless:
+                self._main_loop_headless(max_time_ms)
+            else:
+                await self._main_loop(ignore_events)
+        finally:
+            if self._profiler is not None:
+                self._profiler.stop()
@@ -1,4 +1,20 @@
+"""
+Game objects, and the opt-in accounting of the time they take by type.
+
+Scenes are trees of many small game objects, so function-level profiles spread the cost of
+a frame over generic methods. When `cost_accounting` is enabled, the time spent in the
+`update` and `render` methods of game objects is attributed to their concrete class, along
+with the number of instances of each class that are updated or rendered at each frame.
+
+Time is exclusive: the time spent in the children of a game object, or in any other game
+object it calls, is attributed to them rather than to their parent. Frames end when
+`cost_accounting.end_frame` is called, which `GameManager` does after each frame.
+"""
+
 from abc import ABC
+from dataclasses import dataclass
+import functools
+import time
 
 from engine.drawable import Drawable
 
@@ -34,3 +50,134 @@ class GameObject(ABC):
             self._view.draw(surface)
             for child in self._children:
                 child.render(surface)
+
+
+_ACCOUNTED_METHODS = ('update', 'render')
+
+
+@dataclass
+class TypeCost:
+    update_calls: int = 0
+    update_ns: int = 0
+    render_calls: int = 0
+    render_ns: int = 0
+    # Number of instances updated or rendered during the last frame, and at most in a frame.
+    instances: int = 0
+    max_instances: int = 0
+
+    @property
+    def total_ns(self):
+        return self.update_ns + self.render_ns
+
+
+class CostAccounting:
+    """Attributes the time spent in `update` and `render` to the class of each game object.
+
+    Accounting wraps the methods of the subclasses of `GameObject` that exist when it is
+    enabled, and restores them when it is disabled.
+    """
+
+    def __init__(self):
+        self._enabled = False
+        self._original_methods = []
+        self._costs = {}
+        self._frame_count = 0
+        self._frame_instances = {}
+        # Game objects whose methods are running, each with the kind of method and the
+        # time spent so far in the game objects it called.
+        self._stack = []
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @property
+    def costs(self):
+        """`TypeCost` by class of game object."""
+        return self._costs
+
+    @property
+    def frame_count(self):
+        return self._frame_count
+
+    def enable(self):
+        if self._enabled:
+            return
+        for cls in _game_object_classes():
+            for kind in _ACCOUNTED_METHODS:
+                if kind in cls.__dict__:
+                    method = cls.__dict__[kind]
+                    self._original_methods.append((cls, kind, method))
+                    setattr(cls, kind, self._accounted(method, kind))
+        self._enabled = True
+
+    def disable(self):
+        for cls, kind, method in reversed(self._original_methods):
+            setattr(cls, kind, method)
+        self._original_methods.clear()
+        self._stack.clear()
+        self._enabled = False
+
+    def reset(self):
+        self._costs = {}
+        self._frame_count = 0
+        self._frame_instances = {}
+
+    def end_frame(self):
+        if not self._enabled:
+            return
+        self._frame_count += 1
+        for cls, cost in self._costs.items():
+            cost.instances = len(self._frame_instances.get(cls, ()))
+            cost.max_instances = max(cost.max_instances, cost.instances)
+        self._frame_instances = {}
+
+    def _accounted(self, method, kind):
+        @functools.wraps(method)
+        def accounted_method(game_object, *args, **kwargs):
+            stack = self._stack
+            if stack and stack[-1][0] is game_object and stack[-1][1] == kind:
+                # Method of a base class, called from the one of the concrete class.
+                return method(game_object, *args, **kwargs)
+            entry = [game_object, kind, 0]
+            stack.append(entry)
+            start_time = time.perf_counter_ns()
+            try:
+                return method(game_object, *args, **kwargs)
+            finally:
+                duration_ns = time.perf_counter_ns() - start_time
+                stack.pop()
+                if stack:
+                    stack[-1][2] += duration_ns
+                self._add(game_object, kind, duration_ns - entry[2])
+        return accounted_method
+
+    def _add(self, game_object, kind, duration_ns):
+        cls = type(game_object)
+        cost = self._costs.get(cls)
+        if cost is None:
+            cost = self._costs[cls] = TypeCost()
+        if kind == 'update':
+            cost.update_calls += 1
+            cost.update_ns += duration_ns
+        else:
+            cost.render_calls += 1
+            cost.render_ns += duration_ns
+        instances = self._frame_instances.get(cls)
+        if instances is None:
+            instances = self._frame_instances[cls] = set()
+        instances.add(id(game_object))
+
+
+def _game_object_classes():
+    classes = []
+    pending = [GameObject]
+    while pending:
+        cls = pending.pop()
+        if cls not in classes:
+            classes.append(cls)
+            pending.extend(cls.__subclasses__())
+    return classes
+
+
+cost_accounting = CostAccounting()
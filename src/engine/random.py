@@ -1,15 +1,46 @@
 """
-Wraps the `random` module to allow injection of a mock while testing.
+Random number generators of the game.
+
+`Random` wraps `random.Random`, so that tests can replace its `get_number` method with a
+mock. There is no module-level generator: every source of randomness in a game gets its
+own `Random` instance, or stream, from a `RandomStreams` object. All streams are derived
+from a single seed, so a game can be reproduced from its seed. Since streams are
+independent, drawing more numbers from one stream (e.g. because of the player's actions)
+does not change the numbers drawn from the others.
 """
 
 import random
 
 # pylint: disable=too-few-public-methods
 class Random():
+    def __init__(self, seed=None):
+        self._random = random.Random(seed)
+
     def get_number(self, min_value, max_value):
-        return random.randint(min_value, max_value)
+        return self._random.randint(min_value, max_value)
+
+
+class RandomStreams():
+    def __init__(self, seed: int = None):
+        """
+        Args:
+            seed: The seed from which all streams are derived. A random seed is chosen
+                if not provided.
+        """
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        self._seed = seed
+        self._streams = {}
+
+    @property
+    def seed(self):
+        return self._seed
 
-_random = Random()
+    def get_stream(self, name: str) -> Random:
+        """Returns the stream with the given name, creating it on first use.
 
-def randint(min_value, max_value):
-    return _random.get_number(min_value, max_value)
+        The numbers drawn from a stream only depend on the seed and on the name of the stream.
+        """
+        if name not in self._streams:
+            self._streams[name] = Random(f'{self._seed}:{name}')
+        return self._streams[name]
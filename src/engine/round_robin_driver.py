@@ -0,0 +1,83 @@
+"""
+Driver to play many independent scenes headless in the same process.
+
+Scenes are stepped round-robin, one headless iteration of each at a time, so that they all
+progress together. Each scene has its own clock, timers and state, while modules loaded
+once per process, such as fonts and images, are shared by all of them. This costs much less
+memory and startup time than a process per scene, when many games are played at once.
+"""
+
+from engine.clock import FixedStepClock
+from engine.game_manager import GameManager
+
+
+class RoundRobinDriver:
+    def __init__(self, scenes, *, frame_ms: float = 1000 / GameManager.fps,
+                 max_time_ms: int = None, stop_condition=None):
+        """Sets up each scene to be played headless, on its own `FixedStepClock`.
+
+        Args:
+            frame_ms: Duration of a frame of the scenes.
+            max_time_ms: If provided, scenes are stopped once their time reaches it,
+                even if they are not finished.
+            stop_condition: If provided, scenes for which it returns True are stopped,
+                even if they are not finished, e.g. games whose result is already clear.
+        """
+        self._scenes = list(scenes)
+        self._max_time_ms = max_time_ms
+        self._stop_condition = stop_condition
+        self._errors = [None] * len(self._scenes)
+        for scene in self._scenes:
+            scene.clock = FixedStepClock(frame_ms)
+            scene.headless = True
+            scene.setup()
+        self._active_indices = [
+            index for index, scene in enumerate(self._scenes) if not self._is_done(scene)
+        ]
+
+    @property
+    def scenes(self):
+        return self._scenes
+
+    @property
+    def errors(self):
+        """For each scene, the exception that stopped it, or None."""
+        return self._errors
+
+    @property
+    def num_active_scenes(self):
+        return len(self._active_indices)
+
+    @property
+    def is_finished(self):
+        return not self._active_indices
+
+    def _is_done(self, scene):
+        return scene.is_finished or (
+            self._max_time_ms is not None and scene.current_time >= self._max_time_ms
+        ) or (
+            self._stop_condition is not None and self._stop_condition(scene)
+        )
+
+    def step(self):
+        """Steps each scene that is still playing once.
+
+        A scene that raises an exception is stopped, and the exception is kept in `errors`,
+        so that it does not stop the other scenes.
+        """
+        active_indices = []
+        for index in self._active_indices:
+            scene = self._scenes[index]
+            try:
+                scene.step_headless()
+            except Exception as exc: # pylint: disable=broad-exception-caught
+                self._errors[index] = exc
+                continue
+            if not self._is_done(scene):
+                active_indices.append(index)
+        self._active_indices = active_indices
+
+    def run(self):
+        """Steps the scenes until all of them are finished."""
+        while self._active_indices:
+            self.step()
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 import pygame
 
+from engine.clock import Clock, RealTimeClock
+from engine.timer_scheduler import TimerScheduler
 from ui.color import Color
 
 
@@ -13,14 +15,52 @@ class Scene(ABC):
         self._scene_id = scene_id
         self._is_started = False
         self._scene_objects = []
+        self._clock = RealTimeClock()
+        self._timer_scheduler = TimerScheduler()
+        self._headless = False
 
     @property
     def scene_id(self):
         return self._scene_id
 
+    @property
+    def clock(self):
+        return self._clock
+
+    @clock.setter
+    def clock(self, value: Clock):
+        self._clock = value
+
     @property
     def current_time(self):
-        return pygame.time.get_ticks()
+        return self._clock.current_time
+
+    @property
+    def timer_scheduler(self):
+        return self._timer_scheduler
+
+    @property
+    def headless(self):
+        """Whether the scene is neither rendered nor receiving user input.
+
+        Game objects may then skip work that only matters for display or input.
+        """
+        return self._headless
+
+    @headless.setter
+    def headless(self, value: bool):
+        self._headless = value
+
+    @property
+    def next_deadline(self):
+        """Time at which the scene next needs to be updated in a headless run, or None if
+        it needs to be updated at every frame."""
+        return None
+
+    @property
+    def is_finished(self):
+        """Whether the scene has nothing left to simulate. Used to end headless runs."""
+        return False
 
     @abstractmethod
     def setup(self):
@@ -30,6 +70,28 @@ class Scene(ABC):
     def update(self, current_time, events):
         pass
 
+    def step_headless(self, end_time=None):
+        """Advances the scene by one iteration of a headless run, without user input.
+
+        The scene needs a `FixedStepClock`. When the scene reports that nothing will happen
+        before its next deadline, the clock jumps straight to it. Otherwise, it advances by
+        one frame duration.
+
+        Args:
+            end_time: If provided, the clock does not go past this time.
+        """
+        current_time = self.current_time
+        next_deadline = self.next_deadline
+        if next_deadline is not None and next_deadline > current_time + self.clock.step_ms:
+            if end_time is not None:
+                next_deadline = min(next_deadline, end_time)
+            self.clock.advance(next_deadline - current_time)
+        elif end_time is not None and current_time + self.clock.step_ms > end_time:
+            self.clock.advance(end_time - current_time)
+        else:
+            self.clock.tick()
+        self.update(self.current_time, [])
+
     def render(self):
         self.screen.fill(self.background_color)
 
@@ -14,6 +14,10 @@ class SceneManager():
     def current_scene(self):
         return self._current_scene
 
+    @property
+    def scenes(self):
+        return list(self._scenes.values())
+
     @property
     def screen(self):
         return self._screen
@@ -42,5 +46,6 @@ class SceneManager():
         if scene_id not in self._scenes:
             raise ValueError('Scene needs to be added with `add_scene` prior to starting it.')
 
+        self._scenes[scene_id].clock.tick()
         self._scenes[scene_id].setup()
         self._current_scene = self._scenes[scene_id]
@@ -0,0 +1,155 @@
+"""
+Snapshots of the state of a scene, to restore it later or to fork it.
+
+The state is pickled, which is much faster than rebuilding it, or than copying it with
+`copy.deepcopy`. Resources that are not part of the logical state are shared between the
+snapshot and the original instead of being copied: pygame surfaces and fonts, functions,
+code objects, and any object explicitly marked as shared.
+
+Snapshots can also be saved to a file, to be read in another process. Shared surfaces are
+then saved by value, and the other shared objects have to be given again when reading the
+file, as external objects.
+"""
+
+import io
+import pickle
+from types import CodeType, FunctionType
+
+import pygame
+
+_SHARED_TYPES = (pygame.Surface, pygame.font.Font, FunctionType, CodeType)
+
+_ROOT_ID = 'root'
+
+
+class SnapshotFormatError(Exception):
+    pass
+
+
+def _shared_object(shared_id):
+    """Placeholder for references to shared objects in pickled states.
+
+    Unpicklers of snapshots substitute their own lookup function, so it is only called when
+    the state of a snapshot is unpickled by something else, which cannot resolve it.
+    """
+    raise SnapshotFormatError(
+        f'reference to shared object {shared_id!r} outside of a snapshot: states of '
+        'snapshots can only be loaded with `Snapshot.load`')
+
+
+class _SharingPickler(pickle.Pickler):
+    def __init__(self, file, root, shared):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._root = root
+        self._shared_ids = {id(obj) for obj in shared if obj is not None}
+        self.shared_objects = []
+        self._shared_indices = {}
+
+    def reducer_override(self, obj):
+        # Unlike `persistent_id`, only called for objects that are not of a basic type.
+        if obj is _shared_object:
+            return NotImplemented
+        if obj is self._root:
+            return _shared_object, (_ROOT_ID,)
+        if isinstance(obj, _SHARED_TYPES) or id(obj) in self._shared_ids:
+            index = self._shared_indices.get(id(obj))
+            if index is None:
+                index = len(self.shared_objects)
+                self._shared_indices[id(obj)] = index
+                self.shared_objects.append(obj)
+            return _shared_object, (index,)
+        return NotImplemented
+
+
+class _SharingUnpickler(pickle.Unpickler):
+    def __init__(self, file, root, shared_objects):
+        super().__init__(file)
+        self._root = root
+        self._shared_objects = shared_objects
+
+    def _get_shared_object(self, shared_id):
+        if shared_id == _ROOT_ID:
+            return self._root
+        return self._shared_objects[shared_id]
+
+    def find_class(self, module, name):
+        if module == __name__ and name == _shared_object.__name__:
+            return self._get_shared_object
+        return super().find_class(module, name)
+
+
+def _surface_from_bytes(data, size):
+    return pygame.image.frombytes(data, size, 'RGBA')
+
+
+class _FilePickler(pickle.Pickler):
+    def __init__(self, file, external):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._external_indices = {
+            id(obj): index for index, obj in enumerate(external) if obj is not None
+        }
+
+    def persistent_id(self, obj):
+        # Checked before `reducer_override`, so that external surfaces are not copied.
+        return self._external_indices.get(id(obj))
+
+    def reducer_override(self, obj):
+        if isinstance(obj, pygame.Surface):
+            return _surface_from_bytes, (pygame.image.tobytes(obj, 'RGBA'), obj.get_size())
+        return NotImplemented
+
+
+class _FileUnpickler(pickle.Unpickler):
+    def __init__(self, file, external):
+        super().__init__(file)
+        self._external = external
+
+    def persistent_load(self, pid):
+        return self._external[pid]
+
+
+class Snapshot:
+    def __init__(self, state, root, shared=()):
+        """Captures a copy of `state`.
+
+        Args:
+            state: The state to capture, typically the attributes of `root`.
+            root: The object owning the state. References to it are not copied, and
+                point to the object the snapshot is loaded into.
+            shared: Objects that are referenced rather than copied.
+        """
+        buffer = io.BytesIO()
+        pickler = _SharingPickler(buffer, root, shared)
+        pickler.dump(state)
+        self._data = buffer.getvalue()
+        self._shared_objects = pickler.shared_objects
+
+    @property
+    def size(self):
+        """Size in bytes of the copied state."""
+        return len(self._data)
+
+    def load(self, root):
+        """Returns a new copy of the captured state, owned by `root`.
+
+        A snapshot can be loaded any number of times, each time into a new copy.
+        """
+        unpickler = _SharingUnpickler(io.BytesIO(self._data), root, self._shared_objects)
+        return unpickler.load()
+
+    def save(self, out_file, external=()):
+        """Writes the snapshot to a binary file.
+
+        Args:
+            external: Shared objects that are not written, such as the automation script.
+                They are replaced by the objects at the same position in the `external`
+                argument of `read`.
+        """
+        _FilePickler(out_file, external).dump((self._data, self._shared_objects))
+
+    @classmethod
+    def read(cls, in_file, external=()):
+        """Reads a snapshot written by `save`."""
+        snapshot = cls.__new__(cls)
+        snapshot._data, snapshot._shared_objects = _FileUnpickler(in_file, external).load()
+        return snapshot
@@ -0,0 +1,81 @@
+"""
+Central scheduler for timed callbacks.
+
+Game objects register the time at which they next need to act, instead of checking
+at every frame whether enough time has elapsed. A scene runs the timers that are due
+at each tick, which means objects that have nothing to do are not touched at all.
+
+A game object can also run its own timer from its `update` method with `run_if_due`.
+Whichever comes first fires the timer; the other one is then a no-op.
+"""
+
+import heapq
+from typing import Callable
+
+
+class Timer:
+    def __init__(self, deadline: int, callback: Callable[[int], None]):
+        self._deadline = deadline
+        self._callback = callback
+        self._pending = True
+
+    @property
+    def deadline(self):
+        return self._deadline
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def cancel(self):
+        self._pending = False
+
+    def run_if_due(self, current_time):
+        if self._pending and current_time >= self._deadline:
+            self._pending = False
+            self._callback(current_time)
+
+
+class TimerScheduler:
+    def __init__(self):
+        self._heap = []
+        self._sequence = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def schedule(self, deadline: int, callback: Callable[[int], None]):
+        """Registers a callback to be called with the current time once `deadline` is reached.
+
+        Returns:
+            Timer: A handle that can be used to cancel the timer or to run it early.
+        """
+        timer = Timer(deadline, callback)
+        # The sequence number keeps timers with the same deadline in registration order.
+        heapq.heappush(self._heap, (deadline, self._sequence, timer))
+        self._sequence += 1
+        return timer
+
+    @property
+    def next_deadline(self):
+        """Deadline of the earliest pending timer, or None if there is none."""
+        while self._heap and not self._heap[0][2].pending:
+            heapq.heappop(self._heap)
+        if self._heap:
+            return self._heap[0][0]
+        return None
+
+    def run_due(self, current_time):
+        """Runs all pending timers whose deadline is reached, earliest first.
+
+        Timers scheduled by the callbacks themselves are not run before the next call,
+        even if they are already due, so a timer fires at most once per tick.
+        """
+        due_timers = []
+        while self._heap and self._heap[0][0] <= current_time:
+            due_timers.append(heapq.heappop(self._heap)[2])
+        for timer in due_timers:
+            timer.run_if_due(current_time)
+
+    def clear(self):
+        self._heap.clear()
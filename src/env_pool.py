@@ -0,0 +1,308 @@
+"""
+Pool of `YoureTheOsEnv` environments stepped in parallel by worker processes.
+
+Each worker process hosts a contiguous range of environments, and loads pygame, fonts and
+assets only once, when it starts. All workers step in lockstep: `step` hands the actions of
+all environments to the workers at once, and returns once all of them have stepped.
+
+Observations, rewards, actions and other per-step data go through a single
+`multiprocessing.shared_memory` block holding one NumPy array per kind of data, rather
+than being pickled through pipes. Workers are woken up and waited for with barriers. The
+main process waits for the workers with a timeout, so that a worker that died or hangs
+raises an `EnvPoolError` instead of blocking the pool forever.
+
+Actions are encoded as integer triples `(kind, pid, idx)` in shared memory, with at most
+`max_actions_per_step` actions per environment and per step. `step` accepts either
+lists of action dicts, encoded with `encode_action`, or already encoded arrays.
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+import threading
+
+import numpy as np
+
+from os_env import YoureTheOsEnv
+from stage_config import StageConfig
+
+ACTION_NONE = 0
+ACTION_PROCESS = 1
+ACTION_PAGE = 2
+ACTION_IO_QUEUE = 3
+
+_COMMAND_STEP = 0
+_COMMAND_RESET = 1
+_COMMAND_CLOSE = 2
+
+_INFO_KEYS = ('seed', 'time_ms', 'score', 'uptime_ms')
+
+_ALIGNMENT = 8
+
+
+class EnvPoolError(RuntimeError):
+    pass
+
+
+def encode_action(action: dict):
+    """Returns the `(kind, pid, idx)` triple of an action dict."""
+    if action['type'] == 'process':
+        return ACTION_PROCESS, action['pid'], 0
+    if action['type'] == 'page':
+        return ACTION_PAGE, action['pid'], action['idx']
+    if action['type'] == 'io_queue':
+        return ACTION_IO_QUEUE, 0, 0
+    raise ValueError(f'Unknown action type: {action["type"]}.')
+
+
+def _decode_actions(encoded_actions):
+    actions = []
+    for kind, pid, idx in encoded_actions.tolist():
+        if kind == ACTION_PROCESS:
+            actions.append({'type': 'process', 'pid': pid})
+        elif kind == ACTION_PAGE:
+            actions.append({'type': 'page', 'pid': pid, 'idx': idx})
+        elif kind == ACTION_IO_QUEUE:
+            actions.append({'type': 'io_queue'})
+    return actions
+
+
+class _SharedArrays:
+    """NumPy arrays laid out one after the other in a single shared memory block."""
+
+    def __init__(self, layout, name=None):
+        """
+        Args:
+            layout: List of `(name, shape, dtype)` tuples describing the arrays.
+            name: Name of an existing shared memory block to attach to. A new block is
+                created if not provided.
+        """
+        offsets = []
+        size = 0
+        for _, shape, dtype in layout:
+            offsets.append(size)
+            array_size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            size += -(-array_size // _ALIGNMENT) * _ALIGNMENT
+
+        if name is None:
+            self._memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+        self._arrays = {
+            array_name: np.ndarray(shape, dtype, buffer=self._memory.buf, offset=offset)
+            for (array_name, shape, dtype), offset in zip(layout, offsets)
+        }
+
+    @property
+    def name(self):
+        return self._memory.name
+
+    def __getitem__(self, array_name):
+        return self._arrays[array_name]
+
+    def close(self):
+        # Arrays must not outlive the buffer they point to.
+        self._arrays = {}
+        self._memory.close()
+
+    def unlink(self):
+        self._memory.unlink()
+
+
+def _run_command(shared, command, envs):
+    for i, env in envs.items():
+        if command == _COMMAND_RESET and shared['reset_mask'][i]:
+            seed = int(shared['seeds'][i]) if shared['has_seed'][i] else None
+            observation, info = env.reset(seed)
+            shared['rewards'][i] = 0
+            shared['terminated'][i] = False
+        elif command == _COMMAND_STEP and not shared['terminated'][i]:
+            observation, reward, terminated, _, info = env.step(
+                _decode_actions(shared['actions'][i]))
+            shared['rewards'][i] = reward
+            shared['terminated'][i] = terminated
+        else:
+            continue
+        shared['observations'][i] = observation
+        for key in _INFO_KEYS:
+            shared[key][i] = info[key]
+
+
+def _run_worker(shared_name, layout, env_range, config, step_ms, barriers, timeout_s):
+    # pylint: disable=too-many-arguments
+    shared = _SharedArrays(layout, shared_name)
+    start_barrier, done_barrier = barriers
+    envs = {i: YoureTheOsEnv(config, step_ms=step_ms) for i in range(*env_range)}
+    try:
+        while True:
+            # The pool can stay idle for any time between commands, so there is no timeout.
+            # The barrier is broken if the main process times out, which wakes workers up.
+            start_barrier.wait()
+            command = shared['command'][0]
+            if command == _COMMAND_CLOSE:
+                break
+            _run_command(shared, command, envs)
+            done_barrier.wait(timeout_s)
+    except BaseException:
+        # Wakes up the main process and the other workers, instead of leaving them waiting.
+        start_barrier.abort()
+        done_barrier.abort()
+        raise
+    finally:
+        shared.close()
+
+
+class EnvPool:
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, num_envs: int, config: StageConfig = StageConfig(), *,
+                 num_workers: int = None, step_ms: int = 100, max_actions_per_step: int = 16,
+                 timeout_s: float = 60):
+        """Starts the worker processes.
+
+        Args:
+            num_envs: Number of environments.
+            config: The configuration of the games.
+            num_workers: Number of worker processes. Defaults to the number of CPUs, and is
+                never more than the number of environments.
+            step_ms: Virtual time that each call to `step` advances the games by.
+            max_actions_per_step: Maximum number of actions per environment and per step.
+            timeout_s: Maximum wall-clock time to wait for the workers to start and finish
+                a command, in seconds, after which the pool is broken. None to wait forever.
+        """
+        if num_workers is None:
+            num_workers = multiprocessing.cpu_count()
+        num_workers = max(1, min(num_workers, num_envs))
+
+        self._num_envs = num_envs
+        self._max_actions_per_step = max_actions_per_step
+        self._timeout_s = timeout_s
+        observation_size = YoureTheOsEnv(config).observation_size
+        self._layout = [
+            ('command', (1,), np.int64),
+            ('reset_mask', (num_envs,), np.bool_),
+            ('has_seed', (num_envs,), np.bool_),
+            ('seeds', (num_envs,), np.int64),
+            ('actions', (num_envs, max_actions_per_step, 3), np.int64),
+            ('observations', (num_envs, observation_size), np.int32),
+            ('rewards', (num_envs,), np.int64),
+            ('terminated', (num_envs,), np.bool_),
+            ('seed', (num_envs,), np.int64),
+            ('time_ms', (num_envs,), np.int64),
+            ('score', (num_envs,), np.int64),
+            ('uptime_ms', (num_envs,), np.int64),
+        ]
+        self._shared = _SharedArrays(self._layout)
+        self._shared['terminated'][:] = True
+
+        context = multiprocessing.get_context()
+        self._barriers = (context.Barrier(num_workers + 1), context.Barrier(num_workers + 1))
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        self._workers = [
+            context.Process(
+                target=_run_worker,
+                args=(self._shared.name, self._layout, (start, stop), config, step_ms,
+                      self._barriers, timeout_s),
+                daemon=True,
+            )
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+        for worker in self._workers:
+            worker.start()
+        self._closed = False
+
+    @property
+    def num_envs(self):
+        return self._num_envs
+
+    @property
+    def num_workers(self):
+        return len(self._workers)
+
+    def reset(self, seed: int = None, env_mask=None):
+        """Starts new games in the given environments, or in all of them.
+
+        Args:
+            seed: If provided, environment `i` gets the seed `seed + i`.
+            env_mask: Boolean array selecting the environments to reset.
+
+        Returns:
+            tuple: The observations of all environments, and a dict of arrays of
+                information about their games.
+        """
+        self._shared['reset_mask'][:] = True if env_mask is None else env_mask
+        self._shared['has_seed'][:] = seed is not None
+        if seed is not None:
+            self._shared['seeds'][:] = seed + np.arange(self._num_envs)
+        self._run(_COMMAND_RESET)
+        return self._shared['observations'].copy(), self._get_infos()
+
+    def step(self, actions):
+        """Applies actions in all environments, then advances their games by `step_ms`.
+
+        Games that are over are left unchanged until they are reset.
+
+        Args:
+            actions: For each environment, a list of action dicts, or an array of encoded
+                actions of shape `(num_envs, max_actions_per_step, 3)`.
+
+        Returns:
+            tuple: Arrays of observations, rewards, whether games are over, whether they
+                were cut short (never), and a dict of arrays of information about the games.
+        """
+        encoded_actions = self._shared['actions']
+        if isinstance(actions, np.ndarray):
+            encoded_actions[:] = actions
+        else:
+            encoded_actions[:] = ACTION_NONE
+            for i, env_actions in enumerate(actions):
+                if len(env_actions) > self._max_actions_per_step:
+                    raise ValueError(
+                        f'At most {self._max_actions_per_step} actions per step are allowed.')
+                for j, action in enumerate(env_actions):
+                    encoded_actions[i, j] = encode_action(action)
+        self._run(_COMMAND_STEP)
+        return (
+            self._shared['observations'].copy(),
+            self._shared['rewards'].copy(),
+            self._shared['terminated'].copy(),
+            np.zeros(self._num_envs, dtype=np.bool_),
+            self._get_infos(),
+        )
+
+    def close(self):
+        """Stops the worker processes and releases the shared memory."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._run(_COMMAND_CLOSE, wait=False)
+        except EnvPoolError:
+            pass
+        for worker in self._workers:
+            worker.join(self._timeout_s)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        self._shared.close()
+        self._shared.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get_infos(self):
+        return {key: self._shared[key].copy() for key in _INFO_KEYS}
+
+    def _run(self, command, wait=True):
+        if self._closed and command != _COMMAND_CLOSE:
+            raise EnvPoolError('The pool is closed.')
+        self._shared['command'][0] = command
+        start_barrier, done_barrier = self._barriers
+        try:
+            start_barrier.wait(self._timeout_s)
+            if wait:
+                done_barrier.wait(self._timeout_s)
+        except threading.BrokenBarrierError as exc:
+            raise EnvPoolError('A worker process failed or timed out.') from exc
@@ -0,0 +1,287 @@
+"""
+Entry point to derive the workload of a recorded game, and write it as a workload trace.
+
+The workload is derived from the events of the game monitor, as passed to automation
+scripts, along with the time at which each of them was emitted. They are either obtained
+by playing a replay file back, or read from an event log: a JSON Lines file with one event
+per line, such as `{"time": 1016, "etype": "PROC_NEW", "pid": 3}`, where times are in
+milliseconds since the start of the game.
+
+The events give the arrival time of each process, and when it blocked for I/O, allocated new
+pages or terminated gracefully. Running times are counted the way the stage counts them, at
+event checks every second since the arrival of the process. Events only give the time of
+some of these checks, so running times are exact for games played at a fixed frame rate,
+and within a second otherwise. I/O completion times are derived from the I/O event count,
+in the order processes waited for I/O. Process types are not part of the events: processes
+whose starvation level rises faster than for regular processes are priority processes.
+"""
+
+import argparse
+import json
+import sys
+
+from cli import resolve_path
+from constants import MAX_IO_WAITING_TIME, ONE_SECOND, TIME_BETWEEN_STARVATION_LEVELS
+from game_monitor import event_from_dict
+from replay import Replay, ReplayFormatError, play_replay
+from workload_trace import ProcessTrace, WorkloadTrace
+
+
+class EventLogFormatError(Exception):
+    pass
+
+
+def read_event_log(in_file):
+    """Reads an event log.
+
+    Returns:
+        list: `(time, event)` pairs, where events are like those passed to automation
+            scripts.
+    """
+    timed_events = []
+    for line_number, line in enumerate(in_file, 1):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise EventLogFormatError(f'Line {line_number}: not JSON.') from exc
+        if (
+            not isinstance(value, dict)
+            or not isinstance(value.get('time'), int)
+            or not isinstance(value.get('etype'), str)
+        ):
+            raise EventLogFormatError(f'Line {line_number}: not an event.')
+        time = value.pop('time')
+        try:
+            event = event_from_dict(value)
+        except (ValueError, TypeError) as exc:
+            raise EventLogFormatError(f'Line {line_number}: {exc}') from exc
+        timed_events.append((time, event))
+    return timed_events
+
+
+def write_event_log(timed_events, out_file):
+    for time, event in timed_events:
+        out_file.write(json.dumps({'time': time, **event.as_dict()}) + '\n')
+
+
+def events_from_replay(replay: Replay):
+    """Plays a replay back, and returns the `(time, event)` pairs of the game, with times
+    since the start of the game."""
+    timed_events = []
+
+    def on_script_events(time, events):
+        timed_events.extend((time - replay.start_time, event) for event in events)
+
+    play_replay(replay, on_script_events=on_script_events)
+    return timed_events
+
+
+class _ProcessWorkload: # pylint: disable=too-many-instance-attributes
+    """Follows the state of a process through its events, to derive its workload."""
+
+    def __init__(self, arrival_time):
+        self.arrival_time = arrival_time
+        self.is_priority = False
+        self.initial_page_count = None
+        self.io_blocks = []
+        self.page_growth_times = []
+        self.graceful_termination_time = None
+
+        self._has_cpu = False
+        self._is_waiting_for_io = False
+        self._is_waiting_for_page = False
+        self._has_ended = False
+        self._is_creating_initial_pages = False
+
+        self._running_time = 0
+        self._last_check_time = None
+        self._next_check_time = arrival_time + ONE_SECOND
+        self._last_starvation_level_change_time = arrival_time
+
+    @property
+    def _is_running(self):
+        return self._has_cpu and not self._is_waiting_for_io and not self._is_waiting_for_page
+
+    def _count_check(self, check_time):
+        if self._is_running:
+            self._running_time += ONE_SECOND
+        self._last_check_time = check_time
+        self._next_check_time = check_time + ONE_SECOND
+
+    def _advance_to(self, time):
+        """Counts the checks that happened before `time`, and that left no event."""
+        while not self._has_ended and self._next_check_time < time:
+            self._count_check(self._next_check_time)
+
+    def _check_at(self, time):
+        """Counts the check at `time`, where the process emitted an event.
+
+        Checks may happen later than expected in games that are not played at a fixed
+        frame rate, so the expected check less than a second before is this one.
+        """
+        if self._last_check_time == time:
+            return
+        while self._next_check_time + ONE_SECOND <= time:
+            self._count_check(self._next_check_time)
+        self._count_check(time)
+
+    def handle_event(self, time, event):
+        """Updates the state of the process with one of its events.
+
+        Returns:
+            int: The index of the I/O block started by the event, if any.
+        """
+        etype = event.etype
+        if self._is_creating_initial_pages and etype != 'PAGE_NEW':
+            self._is_creating_initial_pages = False
+
+        if etype == 'PAGE_NEW' and self._is_creating_initial_pages:
+            self.initial_page_count += 1
+        elif etype in ('PAGE_NEW', 'PROC_STARV', 'PROC_KILL', 'PROC_TERM') or (
+            etype == 'PROC_WAIT_IO' and event.waiting_for_io
+        ):
+            self._check_at(time)
+            return self._handle_check_event(time, event)
+        else:
+            self._advance_to(time)
+            if etype == 'PROC_CPU':
+                self._has_cpu = event.cpu
+                if event.cpu and self.initial_page_count is None:
+                    self.initial_page_count = 0
+                    self._is_creating_initial_pages = True
+            elif etype == 'PROC_WAIT_IO':
+                self._is_waiting_for_io = False
+            elif etype == 'PROC_WAIT_PAGE':
+                self._is_waiting_for_page = event.waiting_for_page
+            elif etype == 'PROC_END':
+                self._has_ended = True
+        return None
+
+    def _handle_check_event(self, time, event):
+        etype = event.etype
+        if etype == 'PAGE_NEW':
+            self.page_growth_times.append(self._running_time)
+        elif etype == 'PROC_WAIT_IO':
+            self._is_waiting_for_io = True
+            self.io_blocks.append([self._running_time, MAX_IO_WAITING_TIME])
+            return len(self.io_blocks) - 1
+        elif etype == 'PROC_TERM':
+            self.graceful_termination_time = self._running_time
+            self._has_ended = True
+        else:
+            if etype == 'PROC_KILL' or event.starvation_level > 0:
+                if (
+                    time - self._last_starvation_level_change_time
+                        < TIME_BETWEEN_STARVATION_LEVELS
+                ):
+                    # Only priority processes starve faster than regular processes.
+                    self.is_priority = True
+            self._last_starvation_level_change_time = time
+            if etype == 'PROC_KILL':
+                self._has_ended = True
+        return None
+
+    def to_process_trace(self):
+        return ProcessTrace(
+            arrival_time=self.arrival_time,
+            is_priority=self.is_priority,
+            # Processes that never ran never got their pages.
+            initial_page_count=self.initial_page_count or 1,
+            io_blocks=tuple(tuple(io_block) for io_block in self.io_blocks),
+            page_growth_times=tuple(self.page_growth_times),
+            graceful_termination_time=self.graceful_termination_time,
+        )
+
+
+def derive_workload(timed_events):
+    """Derives the workload of a game from its events.
+
+    Args:
+        timed_events: `(time, event)` pairs in the order they were emitted, with times
+            since the start of the game.
+
+    Returns:
+        WorkloadTrace: The workload of the game.
+    """
+    processes = {}
+    # Processes waiting for I/O, in order, with the index of their I/O block,
+    # the time they started waiting and the time their I/O event became available.
+    io_waiters = []
+
+    def complete_io_block(waiter, completion_time):
+        process, io_block_index, waiting_since, _ = waiter
+        waiter[3] = completion_time
+        process.io_blocks[io_block_index][1] = min(
+            completion_time - waiting_since, MAX_IO_WAITING_TIME)
+
+    for time, event in timed_events:
+        if event.etype == 'IO_QUEUE':
+            for waiter in io_waiters[:event.io_count]:
+                if waiter[3] is None:
+                    complete_io_block(waiter, time)
+            continue
+        if event.etype == 'PROC_NEW':
+            processes[event.pid] = _ProcessWorkload(time)
+            continue
+        process = processes.get(event.pid)
+        if process is None:
+            continue
+        io_block_index = process.handle_event(time, event)
+        if io_block_index is not None:
+            io_waiters.append([process, io_block_index, time, None])
+        elif event.etype == 'PROC_WAIT_IO':
+            # Events are processed in order, including those of processes that ended
+            # while waiting, and of processes that waited for too long without the
+            # I/O event count being updated.
+            while io_waiters:
+                waiter = io_waiters.pop(0)
+                if waiter[3] is None:
+                    complete_io_block(waiter, min(time, waiter[2] + MAX_IO_WAITING_TIME))
+                if waiter[0] is process:
+                    break
+
+    return WorkloadTrace(tuple(
+        processes[pid].to_process_trace() for pid in sorted(processes)
+    ))
+
+
+def _load_events(file_path):
+    try:
+        return events_from_replay(Replay.load(file_path))
+    except ReplayFormatError:
+        pass
+    with open(file_path, encoding='utf_8') as in_file:
+        return read_event_log(in_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                prog="extract-workload",
+                description="Derive the workload of a recorded game, as a workload trace"
+                    " that can be played with --workload")
+    parser.add_argument('game', help="replay file or event log of the game")
+    parser.add_argument('trace', help="workload trace file to write")
+    parser.add_argument('--event-log', metavar='EVENT_LOG_FILE',
+        help="also write the events of the game to an event log")
+    args = parser.parse_args()
+
+    try:
+        timed_events = _load_events(resolve_path(args.game))
+    except (OSError, UnicodeDecodeError, EventLogFormatError) as exc:
+        print(f'Cannot load game: {exc}', file=sys.stderr)
+        return 2
+
+    if args.event_log is not None:
+        with open(resolve_path(args.event_log), 'w', encoding='utf_8') as out_file:
+            write_event_log(timed_events, out_file)
+
+    workload_trace = derive_workload(timed_events)
+    workload_trace.save(resolve_path(args.trace))
+    print(f'{len(workload_trace.processes)} processes')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
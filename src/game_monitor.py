@@ -2,10 +2,20 @@
 
 The game monitor is used to gather events from game objects
 and dispatch them to the automation script.
+Each stage has its own game monitor, so that several stages
+can be driven by scripts in the same process.
+
+The monitor of a stage is only enabled while the stage has an automation
+script to send events to.
+
+Events are records with a fixed layout, one class per type of event:
+the type is a class attribute, `etype`, and the fields are slots,
+so that the many events of a game are cheap to create. Scripts read
+them as attributes, e.g. `event.etype` and `event.pid`.
 """
 
 from enum import Enum
-from types import SimpleNamespace
+import sys
 
 EventType = Enum('_et', [
     'IO_QUEUE',
@@ -25,94 +35,265 @@ EventType = Enum('_et', [
     'PROC_END'
 ])
 
+# pylint: disable=too-few-public-methods
+
+class MonitorEvent:
+    __slots__ = ()
+    etype = None
+
+    def as_dict(self):
+        """Returns the type and fields of the event, e.g. to write it as JSON."""
+        return {'etype': self.etype, **{name: getattr(self, name) for name in self.__slots__}}
+
+    def __eq__(self, other):
+        if not isinstance(other, MonitorEvent):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={value!r}' for name, value in self.as_dict().items())
+        return f'{type(self).__name__}({fields})'
+
+
+class IoQueueEvent(MonitorEvent):
+    __slots__ = ('io_count',)
+    etype = EventType.IO_QUEUE.name
+
+    def __init__(self, io_count):
+        self.io_count = io_count
+
+
+class PageNewEvent(MonitorEvent):
+    __slots__ = ('pid', 'idx', 'swap', 'use')
+    etype = EventType.PAGE_NEW.name
+
+    def __init__(self, pid, idx, swap, use):
+        self.pid = pid
+        self.idx = idx
+        self.swap = swap
+        self.use = use
+
+
+class PageUseEvent(MonitorEvent):
+    __slots__ = ('pid', 'idx', 'use')
+    etype = EventType.PAGE_USE.name
+
+    def __init__(self, pid, idx, use):
+        self.pid = pid
+        self.idx = idx
+        self.use = use
+
+
+class PageSwapEvent(MonitorEvent):
+    __slots__ = ('pid', 'idx', 'swap')
+    etype = EventType.PAGE_SWAP.name
+
+    def __init__(self, pid, idx, swap):
+        self.pid = pid
+        self.idx = idx
+        self.swap = swap
+
+
+class PageFreeEvent(MonitorEvent):
+    __slots__ = ('pid', 'idx')
+    etype = EventType.PAGE_FREE.name
+
+    def __init__(self, pid, idx):
+        self.pid = pid
+        self.idx = idx
+
+
+class ProcessNewEvent(MonitorEvent):
+    __slots__ = ('pid',)
+    etype = EventType.PROC_NEW.name
+
+    def __init__(self, pid):
+        self.pid = pid
+
+
+class ProcessCpuEvent(MonitorEvent):
+    __slots__ = ('pid', 'cpu')
+    etype = EventType.PROC_CPU.name
+
+    def __init__(self, pid, cpu):
+        self.pid = pid
+        self.cpu = cpu
+
+
+class ProcessStarvationEvent(MonitorEvent):
+    __slots__ = ('pid', 'starvation_level')
+    etype = EventType.PROC_STARV.name
+
+    def __init__(self, pid, starvation_level):
+        self.pid = pid
+        self.starvation_level = starvation_level
+
+
+class ProcessWaitIoEvent(MonitorEvent):
+    __slots__ = ('pid', 'waiting_for_io')
+    etype = EventType.PROC_WAIT_IO.name
+
+    def __init__(self, pid, waiting_for_io):
+        self.pid = pid
+        self.waiting_for_io = waiting_for_io
+
+
+class ProcessWaitPageEvent(MonitorEvent):
+    __slots__ = ('pid', 'waiting_for_page')
+    etype = EventType.PROC_WAIT_PAGE.name
+
+    def __init__(self, pid, waiting_for_page):
+        self.pid = pid
+        self.waiting_for_page = waiting_for_page
+
+
+class ProcessTerminatedEvent(MonitorEvent):
+    __slots__ = ('pid',)
+    etype = EventType.PROC_TERM.name
+
+    def __init__(self, pid):
+        self.pid = pid
+
+
+class ProcessKilledEvent(MonitorEvent):
+    __slots__ = ('pid',)
+    etype = EventType.PROC_KILL.name
+
+    def __init__(self, pid):
+        self.pid = pid
+
+
+class ProcessEndEvent(MonitorEvent):
+    __slots__ = ('pid',)
+    etype = EventType.PROC_END.name
+
+    def __init__(self, pid):
+        self.pid = pid
+
+
+# Far more events than a frame emits, so that events are only dropped when nobody clears
+# them.
+DEFAULT_MAX_EVENTS = 10000
+
+_EVENT_CLASSES = {cls.etype: cls for cls in MonitorEvent.__subclasses__()}
+
+
+def event_from_dict(value):
+    """Returns the event of a dict like those returned by `MonitorEvent.as_dict`.
+
+    Raises:
+        ValueError: If the type of event is unknown.
+        TypeError: If the fields do not match the type of event.
+    """
+    fields = dict(value)
+    etype = fields.pop('etype', None)
+    try:
+        cls = _EVENT_CLASSES[etype]
+    except KeyError as exc:
+        raise ValueError(f'unknown event type: {etype}') from exc
+    return cls(**fields)
+
+
+class GameMonitor:
+    """Gathers the events of the game objects of a stage, until they are cleared.
+
+    A disabled monitor ignores events, without even creating them, for stages whose
+    events nobody reads. An enabled monitor keeps at most `max_events` events: further
+    events are dropped, and counted, until the events are cleared. The events that are kept
+    are the oldest ones, so that scripts get an unbroken sequence of events, and a warning
+    is printed the first time events are dropped.
+    """
+
+    def __init__(self, *, enabled=True, max_events=DEFAULT_MAX_EVENTS):
+        self._enabled = enabled
+        self._max_events = max_events
+        self._events = []
+        self._dropped_event_count = 0
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        self._enabled = value
+        if not value:
+            self._events.clear()
+
+    @property
+    def max_events(self):
+        return self._max_events
+
+    @property
+    def dropped_event_count(self):
+        """Number of events dropped because the monitor was full."""
+        return self._dropped_event_count
+
+    def _add_event(self, event):
+        if len(self._events) < self._max_events:
+            self._events.append(event)
+        else:
+            self._dropped_event_count += 1
+            if self._dropped_event_count == 1:
+                print(f'The game monitor is full, dropping events after {self._max_events}'
+                      ' events until they are cleared.', file=sys.stderr)
+
+    def notify_io_event_count(self, count):
+        if self._enabled:
+            self._add_event(IoQueueEvent(count))
+
+    def notify_page_swap(self, pid, idx, swap):
+        if self._enabled:
+            self._add_event(PageSwapEvent(pid, idx, swap))
+
+    def notify_page_new(self, pid, idx, swap, use):
+        if self._enabled:
+            self._add_event(PageNewEvent(pid, idx, swap, use))
+
+    def notify_page_use(self, pid, idx, use):
+        if self._enabled:
+            self._add_event(PageUseEvent(pid, idx, use))
+
+    def notify_page_free(self, pid, idx):
+        if self._enabled:
+            self._add_event(PageFreeEvent(pid, idx))
+
+    def notify_process_wait_page(self, pid, value):
+        if self._enabled:
+            self._add_event(ProcessWaitPageEvent(pid, value))
+
+    def notify_process_wait_io(self, pid, value):
+        if self._enabled:
+            self._add_event(ProcessWaitIoEvent(pid, value))
+
+    def notify_process_terminated(self, pid):
+        if self._enabled:
+            self._add_event(ProcessTerminatedEvent(pid))
+
+    def notify_process_killed(self, pid):
+        if self._enabled:
+            self._add_event(ProcessKilledEvent(pid))
+
+    def notify_process_starvation(self, pid, level):
+        if self._enabled:
+            self._add_event(ProcessStarvationEvent(pid, level))
+
+    def notify_process_new(self, pid):
+        if self._enabled:
+            self._add_event(ProcessNewEvent(pid))
+
+    def notify_process_cpu(self, pid, cpu):
+        if self._enabled:
+            self._add_event(ProcessCpuEvent(pid, cpu))
+
+    def notify_process_end(self, pid):
+        if self._enabled:
+            self._add_event(ProcessEndEvent(pid))
+
+    def get_events(self):
+        return self._events
 
-_events = []
-
-def _add_event(typ, data):
-    _events.append(
-        SimpleNamespace(etype=typ.name, **data)
-    )
-
-def notify_io_event_count(count):
-    _add_event(EventType.IO_QUEUE, {
-        'io_count': count
-    })
-
-def notify_page_swap(pid, idx, swap):
-    _add_event(EventType.PAGE_SWAP, {
-        'pid': pid,
-        'idx': idx,
-        'swap': swap
-    })
-
-def notify_page_new(pid, idx, swap, use):
-    _add_event(EventType.PAGE_NEW, {
-        'pid': pid,
-        'idx': idx,
-        'swap': swap,
-        'use': use
-    })
-
-def notify_page_use(pid, idx, use):
-    _add_event(EventType.PAGE_USE, {
-        'pid': pid,
-        'idx': idx,
-        'use': use
-    })
-
-def notify_page_free(pid, idx):
-    _add_event(EventType.PAGE_FREE, {
-        'pid': pid,
-        'idx': idx
-    })
-
-def notify_process_wait_page(pid, value):
-    _add_event(EventType.PROC_WAIT_PAGE, {
-        'pid': pid,
-        'waiting_for_page': value
-    })
-
-def notify_process_wait_io(pid, value):
-    _add_event(EventType.PROC_WAIT_IO, {
-        'pid': pid,
-        'waiting_for_io': value
-    })
-
-def notify_process_terminated(pid):
-    _add_event(EventType.PROC_TERM, {
-        'pid': pid
-    })
-
-def notify_process_killed(pid):
-    _add_event(EventType.PROC_KILL, {
-        'pid': pid
-    })
-
-def notify_process_starvation(pid, level):
-    _add_event(EventType.PROC_STARV, {
-        'pid' : pid,
-        'starvation_level': level
-    })
-
-def notify_process_new(pid):
-    _add_event(EventType.PROC_NEW, {
-        'pid': pid
-    })
-
-def notify_process_cpu(pid, cpu):
-    _add_event(EventType.PROC_CPU, {
-        'pid': pid,
-        'cpu': cpu
-    })
-
-def notify_process_end(pid):
-    _add_event(EventType.PROC_END, {
-        'pid': pid
-    })
-
-
-def get_events():
-    return _events
-
-def clear_events():
-    _events.clear()
+    def clear_events(self):
+        self._events.clear()
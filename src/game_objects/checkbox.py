@@ -1,4 +1,4 @@
-from typing import Callable, Type
+from typing import Callable, Optional, Type
 
 from engine.drawable import Drawable
 from game_objects.button import Button
@@ -8,7 +8,7 @@ class Checkbox(Button):
     def __init__(self,
                  label_text: str = '',
                  *,
-                 on_toggle_fn: Callable[[bool], None] = lambda checked: None,
+                 on_toggle_fn: Optional[Callable[[bool], None]] = None,
                  key_bind: str = '',
                  view_class: Type[Drawable] = CheckboxView
         ):
@@ -18,7 +18,8 @@ class Checkbox(Button):
 
     def _toggle(self):
         self._checked = not self._checked
-        self._on_toggle_fn(self._checked)
+        if self._on_toggle_fn is not None:
+            self._on_toggle_fn(self._checked)
 
     @property
     def checked(self):
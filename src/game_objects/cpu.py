@@ -1,9 +1,10 @@
+from constants import TIME_FOR_PROCESS_HAPPINESS
 from engine.game_object import GameObject
 from game_objects.views.cpu_view import CpuView
 
 
 class Cpu(GameObject):
-    def __init__(self, cpu_id, *, _time_for_process_happiness=5000):
+    def __init__(self, cpu_id, *, _time_for_process_happiness=TIME_FOR_PROCESS_HAPPINESS):
         self._cpu_id = cpu_id
         self._process = None
 
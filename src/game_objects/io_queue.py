@@ -1,25 +1,39 @@
 from collections import deque
 
-from constants import ONE_SECOND
-import game_monitor
+from constants import IO_EVENT_PROBABILITY_DENOMINATOR, MAX_IO_WAITING_TIME, ONE_SECOND
 from engine.game_object import GameObject
 from engine.game_event_type import GameEventType
-from engine.random import randint
 from game_objects.views.io_queue_view import IoQueueView
 
-_MAX_WAITING_TIME = 5000
 _BLINKING_INTERVAL_MS = 333
-_EVENT_PROBABILITY_DENOMINATOR = 3
 
 class _IoEventWaiter:
-    def __init__(self, current_time, callback):
+    def __init__(self, current_time, callback, completion_time=None):
         self._waiting_since = current_time
         self._callback = callback
+        self._completion_time = completion_time
 
     @property
     def waiting_since(self):
         return self._waiting_since
 
+    @property
+    def completion_time(self):
+        """Time at which the I/O event is ready, if given by a workload trace."""
+        return self._completion_time
+
+    def has_completed(self, current_time):
+        """Whether the I/O event has completed before the maximum waiting time, as given
+        by a workload trace."""
+        return (
+            self._completion_time is not None
+            and current_time >= self._completion_time
+            and self._completion_time < self._waiting_since + MAX_IO_WAITING_TIME
+        )
+
+    def has_waited_too_long(self, current_time):
+        return current_time >= self._waiting_since + MAX_IO_WAITING_TIME
+
     @property
     def callback(self):
         return self._callback
@@ -28,6 +42,7 @@ class IoQueue(GameObject):
 
     def __init__(self, process_manager):
         self._process_manager = process_manager
+        self._game_monitor = process_manager.stage.game_monitor
 
         self._subscriber_queue = deque([])
         self._event_count = 0
@@ -35,12 +50,32 @@ class IoQueue(GameObject):
 
         self._display_blink_color = False
 
+        self._random = process_manager.stage.random_streams.get_stream('io_events')
+
+        self._check_timer = None
+        self._schedule_check()
+
         super().__init__(IoQueueView(self))
 
-    def wait_for_event(self, callback):
-        self._subscriber_queue.append(
-            _IoEventWaiter(self._process_manager.stage.current_time, callback)
-        )
+    def wait_for_event(self, callback, *, completion_delay=None):
+        """Queues a callback, called when the player processes I/O events once an event
+        is available for it.
+
+        Args:
+            completion_delay: Time in milliseconds after which the event is available, as
+                given by a workload trace. By default, events become available at random.
+        """
+        current_time = self._process_manager.stage.current_time
+        completion_time = None
+        if completion_delay is not None:
+            completion_time = current_time + completion_delay
+        self._subscriber_queue.append(_IoEventWaiter(current_time, callback, completion_time))
+        self._schedule_check()
+
+    @property
+    def waiting_process_count(self):
+        """Number of processes whose I/O event has not been processed yet."""
+        return len(self._subscriber_queue)
 
     @property
     def event_count(self):
@@ -55,7 +90,67 @@ class IoQueue(GameObject):
             self._event_count -= 1
             callback = self._subscriber_queue.popleft().callback
             callback()
-        game_monitor.notify_io_event_count(self.event_count)
+        self._game_monitor.notify_io_event_count(self.event_count)
+        self._schedule_check()
+
+    def _schedule_check(self):
+        """(Re)schedules the next time at which I/O events may become available: either
+        when the oldest waiting process reaches its maximum waiting time, or at the next
+        random check, whichever comes first. With a workload trace, the next check is also
+        scheduled when the event of the oldest waiting process completes."""
+        if self._check_timer is not None:
+            self._check_timer.cancel()
+        deadline = self._last_update_time + ONE_SECOND
+        if self._event_count < len(self._subscriber_queue):
+            waiter = self._subscriber_queue[self._event_count]
+            deadline = min(deadline, waiter.waiting_since + MAX_IO_WAITING_TIME)
+            if waiter.completion_time is not None:
+                deadline = min(deadline, waiter.completion_time)
+        self._check_timer = self._process_manager.stage.timer_scheduler.schedule(
+            deadline, self._on_check_time)
+
+    def _on_check_time(self, current_time):
+        if self._process_manager.stage.workload_trace is not None:
+            self._handle_completed_events(current_time)
+
+        elif (
+            self._event_count < len(self._subscriber_queue)
+            and current_time >=
+                self._subscriber_queue[self._event_count].waiting_since + MAX_IO_WAITING_TIME
+        ):
+            self._last_update_time = current_time
+            self._event_count += 1
+
+        elif current_time >= self._last_update_time + ONE_SECOND:
+            self._last_update_time = current_time
+
+            if (
+                self._event_count < len(self._subscriber_queue)
+                and self._random.get_number(1, IO_EVENT_PROBABILITY_DENOMINATOR) == 1
+            ):
+                self._event_count = self._random.get_number(
+                    self._event_count + 1, len(self._subscriber_queue)
+                )
+                self._game_monitor.notify_io_event_count(self._event_count)
+
+        self._schedule_check()
+
+    def _handle_completed_events(self, current_time):
+        # Events are handled in order, so an event is only available once the events of all
+        # the processes that waited before are.
+        # As in games with random events, the count is not notified when events are only
+        # available because processes have waited for too long.
+        self._last_update_time = current_time
+        has_completed_events = False
+        while self._event_count < len(self._subscriber_queue):
+            waiter = self._subscriber_queue[self._event_count]
+            if waiter.has_completed(current_time):
+                has_completed_events = True
+            elif not waiter.has_waited_too_long(current_time):
+                break
+            self._event_count += 1
+        if has_completed_events:
+            self._game_monitor.notify_io_event_count(self._event_count)
 
     def _check_if_clicked_on(self, event):
         if event.type == GameEventType.MOUSE_LEFT_CLICK:
@@ -73,25 +168,7 @@ class IoQueue(GameObject):
                 if event.get_property('key') == 'space':
                     self.process_events()
 
-        if (
-            self._event_count < len(self._subscriber_queue)
-            and current_time >=
-                self._subscriber_queue[self._event_count].waiting_since + _MAX_WAITING_TIME
-        ):
-            self._last_update_time = current_time
-            self._event_count += 1
-
-        elif current_time >= self._last_update_time + ONE_SECOND:
-            self._last_update_time = current_time
-
-            if (
-                self._event_count < len(self._subscriber_queue)
-                and randint(1, _EVENT_PROBABILITY_DENOMINATOR) == 1
-            ):
-                self._event_count = randint(
-                    self._event_count + 1, len(self._subscriber_queue)
-                )
-                game_monitor.notify_io_event_count(self._event_count)
+        self._check_timer.run_if_due(current_time)
 
         self._display_blink_color = False
         if self._event_count > 0:
@@ -2,7 +2,6 @@ from typing import Optional
 
 from engine.game_event_type import GameEventType
 from engine.game_object import GameObject
-import game_monitor
 from game_objects.page_slot import PageSlot
 from game_objects.views.page_view import PageView
 
@@ -15,6 +14,7 @@ class Page(GameObject):
         self._idx = idx
         self._page_manager = page_manager
         self._stage = page_manager.stage
+        self._game_monitor = self._stage.game_monitor
 
         self._in_use = False
 
@@ -23,6 +23,7 @@ class Page(GameObject):
         self._swapping_to: Optional[PageSlot] = None
         self._started_swap_at: Optional[int] = None
         self._swap_percentage_completed: float = 0
+        self._swap_timer = None
         self._on_disk = False
 
         self._display_blink_color = False
@@ -85,24 +86,35 @@ class Page(GameObject):
         self._started_swap_at = current_time
         self._swapping_to = swapping_to
         swapping_to.page = self
+        self._swap_timer = self._stage.timer_scheduler.schedule(
+            current_time + self._stage.config.swap_delay_ms, self._on_swap_completed)
+
+    def cancel_swap_timer(self):
+        """The method called by the page manager when the page is deleted."""
+        if self._swap_timer is not None:
+            self._swap_timer.cancel()
+            self._swap_timer = None
+
+    def _on_swap_completed(self, _current_time):
+        self.view.set_xy(self._swapping_to.view.x, self._swapping_to.view.y)
+        self._swapping_from.page = None
+        self._swapping_from = None
+        self._swapping_to = None
+        self._started_swap_at = None
+        self._swap_timer = None
+        self._on_disk = not self._on_disk
+        self._swap_percentage_completed = 0
+        self._game_monitor.notify_page_swap(self.pid, self.idx, self.on_disk)
 
     def _update_swap(self, current_time):
-        """This method is called at each update. If a swap is in progress, it performs
-        appropriate checks and operations."""
+        """This method is called at each update. If a swap is in progress, it updates
+        its progress, and completes it if it is due."""
         if self.swap_in_progress:
             self._swap_percentage_completed = min(1,
                 (current_time - self._started_swap_at)
                 / self._stage.config.swap_delay_ms
             )
-            if self._swap_percentage_completed == 1:
-                self.view.set_xy(self._swapping_to.view.x, self._swapping_to.view.y)
-                self._swapping_from.page = None
-                self._swapping_from = None
-                self._swapping_to = None
-                self._started_swap_at = None
-                self._on_disk = not self._on_disk
-                self._swap_percentage_completed = 0
-                game_monitor.notify_page_swap(self.pid, self.idx, self.on_disk)
+            self._swap_timer.run_if_due(current_time)
 
     def _check_if_clicked_on(self, event):
         if event.type in [GameEventType.MOUSE_LEFT_CLICK, GameEventType.MOUSE_LEFT_DRAG]:
@@ -1,4 +1,4 @@
-from queue import Queue
+from collections import deque
 
 from engine.game_object import GameObject
 from game_objects.views.page_manager_view import PageManagerView
@@ -6,7 +6,6 @@ from game_objects.page import Page
 from game_objects.page_slot import PageSlot
 
 class PageManager(GameObject):
-    _TOTAL_ROWS = 11
     _NUM_COLS = 16
 
     def __init__(self, stage):
@@ -15,8 +14,8 @@ class PageManager(GameObject):
         self._ram_slots = []
         self._disk_slots = []
         self._pages = {}
-        self._swap_in_queue = Queue()
-        self._swap_out_queue = Queue()
+        self._swap_in_queue = deque()
+        self._swap_out_queue = deque()
 
         self._pages_in_ram_label_xy = (0, 0)
         self._pages_on_disk_label_xy = None
@@ -24,8 +23,10 @@ class PageManager(GameObject):
         super().__init__(PageManagerView(self))
 
     @classmethod
-    def get_total_rows(cls):
-        return cls._TOTAL_ROWS
+    def get_total_rows(cls, config):
+        # RAM rows come first, and the swap rows fill the rest of `num_page_rows`. Rows are
+        # added when there are more RAM rows than that.
+        return max(config.num_page_rows, config.num_ram_rows)
 
     @classmethod
     def get_num_cols(cls):
@@ -43,6 +44,10 @@ class PageManager(GameObject):
     def pages_on_disk_label_xy(self):
         return self._pages_on_disk_label_xy
 
+    @property
+    def page_count(self):
+        return len(self._pages)
+
     def get_page(self, pid, idx):
         return self._pages[(pid, idx)]
 
@@ -51,7 +56,7 @@ class PageManager(GameObject):
             self._stage.process_manager.view.width, 120)
 
         num_ram_rows = self._stage.config.num_ram_rows
-        num_swap_rows = self._TOTAL_ROWS - num_ram_rows
+        num_swap_rows = self.get_total_rows(self._stage.config) - num_ram_rows
 
         num_cols = PageManager._NUM_COLS
 
@@ -112,7 +117,7 @@ class PageManager(GameObject):
         swapping_from = next(
             source_slot for source_slot in source_slots if source_slot.page == page)
         page.init_swap(swapping_from)
-        swap_queue.put(page)
+        swap_queue.append(page)
 
         if swap_whole_row:
             slots_on_same_row = [
@@ -136,22 +141,32 @@ class PageManager(GameObject):
             if disk_slot.page == page:
                 disk_slot.page = None
                 break
+        for swap_queue in (self._swap_in_queue, self._swap_out_queue):
+            if page in swap_queue:
+                swap_queue.remove(page)
+        page.cancel_swap_timer()
         self.children.remove(page)
         del self._pages[(page.pid, page.idx)]
 
     def _handle_swap_queues(self, current_time):
+        if not self._swap_in_queue and not self._swap_out_queue:
+            return
+
         swap_in_progress = bool([page for page in self._pages.values() if page.swap_in_progress])
         empty_ram_slot = next((slot for slot in self._ram_slots if not slot.has_page), None)
         empty_disk_slot = next((slot for slot in self._disk_slots if not slot.has_page), None)
 
         if not swap_in_progress:
-            if empty_ram_slot and not self._swap_in_queue.empty():
-                page = self._swap_in_queue.get()
+            if empty_ram_slot and self._swap_in_queue:
+                page = self._swap_in_queue.popleft()
                 page.start_swap(current_time, empty_ram_slot)
-            elif empty_disk_slot and not self._swap_out_queue.empty():
-                page = self._swap_out_queue.get()
+            elif empty_disk_slot and self._swap_out_queue:
+                page = self._swap_out_queue.popleft()
                 page.start_swap(current_time, empty_disk_slot)
 
     def update(self, current_time, events):
         self._handle_swap_queues(current_time)
-        super().update(current_time, events)
+        if not self._stage.headless:
+            # Pages only need to be updated at each frame for display and input.
+            # Swaps are completed by their timers.
+            super().update(current_time, events)
@@ -1,7 +1,9 @@
+from constants import PRIORITY_TIME_BETWEEN_STARVATION_LEVELS
 from game_objects.process import Process
 from game_objects.views.priority_process_view import PriorityProcessView
 
 class PriorityProcess(Process):
     def __init__(self, pid, stage):
         super().__init__(pid, stage,
-                         time_between_starvation_levels=6000, view_class=PriorityProcessView)
+                         time_between_starvation_levels=PRIORITY_TIME_BETWEEN_STARVATION_LEVELS,
+                         view_class=PriorityProcessView)
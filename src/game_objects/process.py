@@ -2,26 +2,27 @@ from typing import Type
 from math import sqrt
 
 from constants import (
-    ONE_SECOND, LAST_ALIVE_STARVATION_LEVEL, DEAD_STARVATION_LEVEL, MAX_PAGES_PER_PROCESS
+    ONE_SECOND, LAST_ALIVE_STARVATION_LEVEL, DEAD_STARVATION_LEVEL, MAX_PAGES_PER_PROCESS,
+    NEW_PAGE_PROBABILITY_DENOMINATOR, TIME_BETWEEN_STARVATION_LEVELS
 )
-import game_monitor
 from engine.drawable import Drawable
 from engine.game_object import GameObject
 from engine.game_event_type import GameEventType
-from engine.random import randint
 from game_objects.views.process_view import ProcessView
 
-_NEW_PAGE_PROBABILITY_DENOMINATOR = 20
 _BLINKING_INTERVAL_MS = 200
 
-class Process(GameObject):
+class Process(GameObject): # pylint: disable=too-many-public-methods
     _ANIMATION_SPEED = 35
 
     def __init__(self, pid, stage,
-                 *, time_between_starvation_levels=10000, view_class: Type[Drawable] = ProcessView):
+                 *, time_between_starvation_levels=TIME_BETWEEN_STARVATION_LEVELS,
+                 view_class: Type[Drawable] = ProcessView):
         self._pid = pid
+        self._stage = stage
         self._process_manager = stage.process_manager
         self._page_manager = stage.page_manager
+        self._game_monitor = stage.game_monitor
         self._time_between_starvation_levels = time_between_starvation_levels
 
         self._cpu = None
@@ -41,12 +42,32 @@ class Process(GameObject):
 
         self._pages = []
 
+        # Scheduled at the first update, so that processes that are never part of the game
+        # (such as the one used to measure process views) do not leave a timer behind.
+        self._event_check_timer = None
+
+        self._io_blocking_random = stage.random_streams.get_stream('io_blocking')
+        self._page_creation_random = stage.random_streams.get_stream('page_creation')
+        self._graceful_termination_random = stage.random_streams.get_stream(
+            'graceful_termination')
+
         self._io_probability_numerator = int(
             stage.config.io_probability * 100)
         self._graceful_termination_probability_numerator = int(
             stage.config.graceful_termination_probability * 100
         )
 
+        # With a workload trace, events happen at the running times given by the trace
+        # instead of being drawn at random.
+        self._trace = None
+        if stage.workload_trace is not None and 0 < pid <= len(stage.workload_trace.processes):
+            self._trace = stage.workload_trace.processes[pid - 1]
+        # Time during which the process has had a CPU without being blocked, counted at
+        # event checks.
+        self._running_time = 0
+        self._next_io_block_index = 0
+        self._next_page_growth_index = 0
+
         super().__init__(view_class(self))
 
     @property
@@ -85,6 +106,10 @@ class Process(GameObject):
     def starvation_level(self):
         return self._starvation_level
 
+    @property
+    def pages(self):
+        return self._pages
+
     @property
     def display_blink_color(self):
         return self._display_blink_color
@@ -137,25 +162,29 @@ class Process(GameObject):
                     cpu.process = self
                     self._cpu = cpu
                     self.view.set_target_xy(cpu.view.x, cpu.view.y)
-                    game_monitor.notify_process_cpu(self._pid, self.has_cpu)
+                    self._game_monitor.notify_process_cpu(self._pid, self.has_cpu)
                     break
             if self.has_cpu:
-                self._last_state_change_time = self._last_update_time
+                self._last_state_change_time = self._now
                 for slot in self._process_manager.process_slots:
                     if slot.process == self:
                         slot.process = None
                         break
                 if len(self._pages) == 0:
-                    # Generate a number of pages between 1 and 4 with a higher
-                    # probability for higher numbers
-                    num_pages = round(sqrt(randint(1, 20)))
+                    if self._trace is not None:
+                        num_pages = self._trace.initial_page_count
+                    else:
+                        # Generate a number of pages between 1 and 4 with a higher
+                        # probability for higher numbers
+                        num_pages = round(sqrt(self._page_creation_random.get_number(1, 20)))
                     for i in range(num_pages):
                         page = self._page_manager.create_page(self._pid, i)
                         self._pages.append(page)
-                        game_monitor.notify_page_new(page.pid, page.idx, page.on_disk, page.in_use)
+                        self._game_monitor.notify_page_new(
+                            page.pid, page.idx, page.on_disk, page.in_use)
                 for page in self._pages:
                     page.in_use = True
-                    game_monitor.notify_page_use(page.pid, page.idx, page.in_use)
+                    self._game_monitor.notify_page_use(page.pid, page.idx, page.in_use)
 
     def yield_cpu(self):
         if self.has_cpu:
@@ -164,19 +193,19 @@ class Process(GameObject):
             if not self.is_waiting_for_io:
                 self._is_on_io_cooldown = False
             if not self.has_ended:
-                game_monitor.notify_process_cpu(self._pid, self.has_cpu)
-            self._last_state_change_time = self._last_update_time
+                self._game_monitor.notify_process_cpu(self._pid, self.has_cpu)
+            self._last_state_change_time = self._now
             for page in self._pages:
                 page.in_use = False
-                game_monitor.notify_page_use(page.pid, page.idx, page.in_use)
+                self._game_monitor.notify_page_use(page.pid, page.idx, page.in_use)
             if self.has_ended:
                 if self.starvation_level == 0:
                     self.view.target_y = -self.view.height
                 for page in self._pages:
-                    game_monitor.notify_page_free(page.pid, page.idx)
+                    self._game_monitor.notify_page_free(page.pid, page.idx)
                     self._page_manager.delete_page(page)
                 self._process_manager.del_process(self)
-                game_monitor.notify_process_end(self.pid)
+                self._game_monitor.notify_process_end(self.pid)
             else:
                 for slot in self._process_manager.process_slots:
                     if slot.process is None:
@@ -188,7 +217,7 @@ class Process(GameObject):
         was_blocked = self.is_blocked
         update_fn()
         if was_blocked != self.is_blocked:
-            self._last_state_change_time = self._last_update_time
+            self._last_state_change_time = self._now
 
     def _set_waiting_for_io(self, waiting_for_io):
         def update_fn():
@@ -199,24 +228,29 @@ class Process(GameObject):
         def update_fn():
             self._is_waiting_for_page = waiting_for_page
         if waiting_for_page != self.is_waiting_for_page:
-            game_monitor.notify_process_wait_page(self.pid, waiting_for_page)
+            self._game_monitor.notify_process_wait_page(self.pid, waiting_for_page)
         self._update_blocking_condition(update_fn)
 
     def _wait_for_io(self):
         self._set_waiting_for_io(True)
         self._is_on_io_cooldown = True
-        self._process_manager.io_queue.wait_for_event(self._on_io_event)
-        game_monitor.notify_process_wait_io(self.pid, self.is_waiting_for_io)
+        completion_delay = None
+        if self._trace is not None:
+            _, completion_delay = self._trace.io_blocks[self._next_io_block_index]
+            self._next_io_block_index += 1
+        self._process_manager.io_queue.wait_for_event(
+            self._on_io_event, completion_delay=completion_delay)
+        self._game_monitor.notify_process_wait_io(self.pid, self.is_waiting_for_io)
 
     def _on_io_event(self):
         if self.has_ended:
             return
         self._set_waiting_for_io(False)
-        game_monitor.notify_process_wait_io(self.pid, self.is_waiting_for_io)
+        self._game_monitor.notify_process_wait_io(self.pid, self.is_waiting_for_io)
 
     def _terminate_gracefully(self):
         if self._process_manager.terminate_process(self, False):
-            game_monitor.notify_process_terminated(self._pid)
+            self._game_monitor.notify_process_terminated(self._pid)
             self._has_ended = True
             self._set_waiting_for_io(False)
             self._set_waiting_for_page(False)
@@ -229,10 +263,10 @@ class Process(GameObject):
             self._set_waiting_for_page(False)
             self._starvation_level = DEAD_STARVATION_LEVEL
             for page in self._pages:
-                game_monitor.notify_page_free(page.pid, page.idx)
+                self._game_monitor.notify_page_free(page.pid, page.idx)
                 self._page_manager.delete_page(page)
             self._process_manager.del_process(self)
-            game_monitor.notify_process_killed(self._pid)
+            self._game_monitor.notify_process_killed(self._pid)
 
     def _check_if_clicked_on(self, event):
         if event.type in set([GameEventType.MOUSE_LEFT_CLICK, GameEventType.MOUSE_LEFT_DRAG]):
@@ -268,43 +302,74 @@ class Process(GameObject):
             if current_time - self._last_state_change_time >= self.cpu.time_for_process_happiness:
                 self._last_starvation_level_change_time = current_time
                 self._starvation_level = 0
-                game_monitor.notify_process_starvation(self._pid, self._starvation_level)
+                self._game_monitor.notify_process_starvation(self._pid, self._starvation_level)
         elif self.current_starvation_level_duration >= self.time_between_starvation_levels:
             self._last_starvation_level_change_time = current_time
             if self._starvation_level < LAST_ALIVE_STARVATION_LEVEL:
                 self._starvation_level += 1
-                game_monitor.notify_process_starvation(
+                self._game_monitor.notify_process_starvation(
                     self._pid, self._starvation_level)
             else:
                 self._terminate_by_user()
 
+    def _update_running_time(self):
+        if self.has_cpu and not self.is_blocked:
+            self._running_time += ONE_SECOND
+
+    def _is_io_block_due(self):
+        if self._trace is None:
+            return self._io_blocking_random.get_number(1, 100) <= self._io_probability_numerator
+        io_blocks = self._trace.io_blocks
+        return (
+            self._next_io_block_index < len(io_blocks)
+            and self._running_time >= io_blocks[self._next_io_block_index][0]
+        )
+
+    def _is_page_growth_due(self):
+        if self._trace is None:
+            return self._page_creation_random.get_number(
+                1, NEW_PAGE_PROBABILITY_DENOMINATOR) == 1
+        page_growth_times = self._trace.page_growth_times
+        if (
+            self._next_page_growth_index < len(page_growth_times)
+            and self._running_time >= page_growth_times[self._next_page_growth_index]
+        ):
+            self._next_page_growth_index += 1
+            return True
+        return False
+
+    def _is_graceful_termination_due(self):
+        if self._trace is None:
+            return (
+                self._graceful_termination_random.get_number(1, 100)
+                    <= self._graceful_termination_probability_numerator
+            )
+        termination_time = self._trace.graceful_termination_time
+        return termination_time is not None and self._running_time >= termination_time
+
     def _handle_io_probability(self):
         if self.has_cpu and not self.is_blocked:
             if (
                 not self.starvation_level == LAST_ALIVE_STARVATION_LEVEL
                 and not self._is_on_io_cooldown
-                and randint(1, 100) <= self._io_probability_numerator
+                and self._is_io_block_due()
             ):
                 self._wait_for_io()
 
     def _handle_new_page_probability(self):
         if self.has_cpu and not self.is_blocked:
-            if (
-                len(self._pages) < MAX_PAGES_PER_PROCESS
-                and randint(1, _NEW_PAGE_PROBABILITY_DENOMINATOR) == 1
-            ):
+            if len(self._pages) < MAX_PAGES_PER_PROCESS and self._is_page_growth_due():
                 new_page = self._page_manager.create_page(self._pid, len(self._pages))
                 self._pages.append(new_page)
                 new_page.in_use = True
-                game_monitor.notify_page_new(
+                self._game_monitor.notify_page_new(
                     new_page.pid, new_page.idx, new_page.on_disk, new_page.in_use)
 
     def _handle_graceful_termination_probability(self, current_time):
         if self.has_cpu and not self.is_blocked:
             if (
-                current_time - self._last_state_change_time
-                    >= ONE_SECOND
-                    and randint(1, 100) <= self._graceful_termination_probability_numerator
+                current_time - self._last_state_change_time >= ONE_SECOND
+                and self._is_graceful_termination_due()
             ):
                 self._terminate_gracefully()
 
@@ -314,18 +379,47 @@ class Process(GameObject):
         else:
             self._display_blink_color = False
 
+    @property
+    def _now(self):
+        # Processes that have nothing to do are not updated at every frame in headless
+        # runs, so the time of their last update can lag behind the time of the stage.
+        return max(self._last_update_time, self._stage.current_time)
+
+    def _on_event_check_time(self, current_time):
+        if self.has_ended:
+            return
+        self._last_update_time = current_time
+        self._handle_unavailable_pages()
+
+        self._last_event_check_time = current_time
+        self._update_running_time()
+        self._update_starvation_level(current_time)
+        self._handle_io_probability()
+        self._handle_new_page_probability()
+        self._handle_graceful_termination_probability(current_time)
+
+        if not self.has_ended:
+            self._schedule_event_check()
+
+    def _schedule_event_check(self):
+        self._event_check_timer = self._stage.timer_scheduler.schedule(
+            self._last_event_check_time + ONE_SECOND, self._on_event_check_time)
+
+    @property
+    def needs_frame_update(self):
+        """Whether the process has work to do at every frame besides its timed events,
+        even when nothing is rendered."""
+        return self.has_cpu or self.is_waiting_for_page or self.is_in_motion
+
     def update(self, current_time, events):
         self._last_update_time = current_time
         self._handle_events(events)
 
         if not self.has_ended:
             self._handle_unavailable_pages()
-            if current_time >= self._last_event_check_time + ONE_SECOND:
-                self._last_event_check_time = current_time
-                self._update_starvation_level(current_time)
-                self._handle_io_probability()
-                self._handle_new_page_probability()
-                self._handle_graceful_termination_probability(current_time)
+            if self._event_check_timer is None:
+                self._schedule_event_check()
+            self._event_check_timer.run_if_due(current_time)
 
         self.view.move_towards_target_xy(self._ANIMATION_SPEED)
         self._handle_blinking_animation(current_time)
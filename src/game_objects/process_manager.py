@@ -1,11 +1,9 @@
-from math import inf
+from math import ceil, inf
 import re
 
-from constants import ONE_SECOND
-import game_monitor
+from constants import ONE_SECOND, STARTUP_PROCESS_CREATION_INTERVAL
 from engine.game_event_type import GameEventType
 from engine.game_object import GameObject
-from engine.random import randint
 from game_objects.checkbox import Checkbox
 from game_objects.cpu import Cpu
 from game_objects.io_queue import IoQueue
@@ -37,6 +35,7 @@ class ProcessManager(GameObject):
 
     def __init__(self, stage):
         self._stage = stage
+        self._game_monitor = stage.game_monitor
 
         self._cpu_list = None
         self._alive_process_list = None
@@ -44,6 +43,7 @@ class ProcessManager(GameObject):
         self._user_terminated_process_slots = None
         self._io_queue = None
         self._processes = None
+        self._process_children = None
         self._sort_processes_button = None
         self._auto_sort_checkbox = None
         self._auto_sort_checkbox_final_x_position = None
@@ -51,11 +51,16 @@ class ProcessManager(GameObject):
         self._next_pid = None
         self._last_new_process_check = None
         self._last_process_creation_time = None
+        self._game_start_time = None
+        self._process_creation_timer = None
         self._gracefully_terminated_process_count = 0
         self._user_terminated_process_count = 0
         self._sort_in_progress = False
         self._last_sort_time = 0
 
+        self._process_arrival_random = stage.random_streams.get_stream('process_arrival')
+        self._priority_random = stage.random_streams.get_stream('priority')
+
         self._new_process_probability_numerator = int(
             stage.config.new_process_probability * 100)
 
@@ -88,6 +93,15 @@ class ProcessManager(GameObject):
         # user refers to in-game user, not to the player.
         return self._user_terminated_process_count
 
+    @property
+    def gracefully_terminated_process_count(self):
+        return self._gracefully_terminated_process_count
+
+    @property
+    def process_count(self):
+        """Number of processes that can be looked up by pid, until they are deleted."""
+        return len(self._processes)
+
     def get_process(self, pid):
         return self._processes[pid]
 
@@ -101,11 +115,17 @@ class ProcessManager(GameObject):
         self._user_terminated_process_slots = []
         self._io_queue = IoQueue(self)
         self._processes = {}
+        # Processes that are still among the children, including ended ones that are
+        # still displayed.
+        self._process_children = []
 
         self._next_pid = 1
         self._last_new_process_check = 0
         self._last_process_creation_time = 0
+        # Arrival times of workload traces are relative to the start of the game.
+        self._game_start_time = self._stage.current_time
         self._user_terminated_process_count = 0
+        self._schedule_process_creation()
 
         for i in range(self._stage.config.num_cpus):
             self.cpu_list.append(Cpu(i + 1))
@@ -120,7 +140,12 @@ class ProcessManager(GameObject):
         io_queue.view.set_xy(50, 10)
         self.children.append(io_queue)
 
-        for row in range(_NUM_PROCESS_SLOT_ROWS):
+        # Rows are added below the usual ones when `max_processes` exceeds their slots.
+        num_process_slot_rows = max(
+            _NUM_PROCESS_SLOT_ROWS,
+            ceil(self._stage.config.max_processes / _NUM_PROCESS_SLOT_COLUMNS),
+        )
+        for row in range(num_process_slot_rows):
             for column in range(_NUM_PROCESS_SLOT_COLUMNS):
                 process_slot = ProcessSlot()
                 x = 50 + column * process_slot.view.width + column * 5
@@ -170,20 +195,27 @@ class ProcessManager(GameObject):
             self._next_pid += 1
 
             process_cls = Process
-            if randint(1, 100) <= int(self._stage.config.priority_process_probability * 100):
+            if self._stage.workload_trace is not None:
+                if self._stage.workload_trace.processes[pid - 1].is_priority:
+                    process_cls = PriorityProcess
+            elif (
+                self._priority_random.get_number(1, 100)
+                    <= int(self._stage.config.priority_process_probability * 100)
+            ):
                 process_cls = PriorityProcess
             process = process_cls(pid, self._stage)
 
             process_slot = self.process_slots[process_slot_id]
             process_slot.process = process
             self.children.append(process)
+            self._process_children.append(process)
             self._alive_process_list.append(process)
 
             process.view.set_xy(process_slot.view.x,
                                 self.view.height + process.view.height)
             process.view.target_y = process_slot.view.y
 
-            game_monitor.notify_process_new(pid)
+            self._game_monitor.notify_process_new(pid)
             self._processes[pid] = process
             return True
         return False
@@ -306,32 +338,80 @@ class ProcessManager(GameObject):
                         if cpu.has_process:
                             cpu.process.yield_cpu()
 
+    @property
+    def processes_are_moving(self):
+        for process in self._process_children:
+            if process.is_in_motion:
+                return True
+        return False
+
     def _check_game_over(self):
         if self._user_terminated_process_count == self.MAX_TERMINATED_BY_USER:
-            processes_are_moving = False
-            for child in self.children:
-                if isinstance(child, Process):
-                    if child.is_in_motion:
-                        processes_are_moving = True
-                        break
-            if not processes_are_moving:
+            if not self.processes_are_moving:
                 self._stage.game_over = True
                 return True
         return False
 
     def _handle_process_creation(self, current_time):
-        if self._next_pid <= self._stage.config.num_processes_at_startup and current_time - \
-                self._last_new_process_check >= 50:
+        if self._stage.workload_trace is not None:
+            self._handle_traced_process_arrivals(current_time)
+        elif self._next_pid <= self._stage.config.num_processes_at_startup and current_time - \
+                self._last_new_process_check >= STARTUP_PROCESS_CREATION_INTERVAL:
             self._last_new_process_check = current_time
             self._last_process_creation_time = current_time
             self._create_process()
         elif current_time - self._last_new_process_check >= ONE_SECOND:
             self._last_new_process_check = current_time
-            if randint(1, 100) <= self._new_process_probability_numerator or current_time - \
-                    self._last_process_creation_time >= self._max_wait_between_new_processes:
+            if (
+                self._process_arrival_random.get_number(1, 100)
+                    <= self._new_process_probability_numerator
+                or current_time - self._last_process_creation_time
+                    >= self._max_wait_between_new_processes
+            ):
                 self._create_process()
                 self._last_process_creation_time = current_time
 
+    def _handle_traced_process_arrivals(self, current_time):
+        # Processes that arrive while there are already `max_processes` processes wait for
+        # a free slot, so that each process of the trace always gets the same pid.
+        self._last_new_process_check = current_time
+        traced_processes = self._stage.workload_trace.processes
+        while (
+            self._next_pid <= len(traced_processes)
+            and self._game_start_time + traced_processes[self._next_pid - 1].arrival_time
+                <= current_time
+            and self._create_process()
+        ):
+            self._last_process_creation_time = current_time
+
+    def _schedule_traced_process_arrival(self):
+        traced_processes = self._stage.workload_trace.processes
+        if self._next_pid > len(traced_processes):
+            # Every process of the trace has arrived.
+            self._process_creation_timer = None
+            return
+        if len(self._alive_process_list) < self._stage.config.max_processes:
+            deadline = self._game_start_time + traced_processes[self._next_pid - 1].arrival_time
+        else:
+            deadline = self._last_new_process_check + ONE_SECOND
+        self._process_creation_timer = self._stage.timer_scheduler.schedule(
+            deadline, self._on_process_creation_time)
+
+    def _schedule_process_creation(self):
+        if self._stage.workload_trace is not None:
+            self._schedule_traced_process_arrival()
+            return
+        if self._next_pid <= self._stage.config.num_processes_at_startup:
+            interval = STARTUP_PROCESS_CREATION_INTERVAL
+        else:
+            interval = ONE_SECOND
+        self._process_creation_timer = self._stage.timer_scheduler.schedule(
+            self._last_new_process_check + interval, self._on_process_creation_time)
+
+    def _on_process_creation_time(self, current_time):
+        self._handle_process_creation(current_time)
+        self._schedule_process_creation()
+
     def _handle_timed_powerups(self, current_time):
         if (
             self.stage.uptime_manager.uptime_ms >= self.stage.config.time_ms_to_show_sort_button
@@ -357,7 +437,15 @@ class ProcessManager(GameObject):
             self._continue_sorting()
 
     def _update_children(self, current_time, events):
-        for game_object in self.children:
+        if self._stage.headless:
+            # Without display or input, only processes that have something to do
+            # at each frame need to be updated. Timed events are run by the stage.
+            game_objects = [
+                process for process in self._process_children if process.needs_frame_update
+            ]
+        else:
+            game_objects = self.children
+        for game_object in game_objects:
             game_object.update(current_time, events)
             if (
                 isinstance(game_object, Process)
@@ -365,13 +453,15 @@ class ProcessManager(GameObject):
                 and game_object.view.y <= -game_object.view.height
             ):
                 self.children.remove(game_object)
+                self._process_children.remove(game_object)
 
     def update(self, current_time, events):
         if self._check_game_over():
             return
 
         self._handle_events(events)
-        self._handle_process_creation(current_time)
+        if self._process_creation_timer is not None:
+            self._process_creation_timer.run_if_due(current_time)
         self._handle_timed_powerups(current_time)
         self._handle_sorting()
         self._update_children(current_time, events)
@@ -14,6 +14,9 @@ class UptimeManager(GameObject):
         self._uptime = 0
         self._uptime_text = '0:00:00'
 
+        self._update_timer = stage.timer_scheduler.schedule(
+            self._last_update_time + ONE_SECOND, self._on_update_time)
+
         super().__init__(UptimeManagerView(self))
 
     @property
@@ -24,8 +27,12 @@ class UptimeManager(GameObject):
     def uptime_text(self):
         return self._uptime_text
 
-    def update(self, current_time, events):
-        if current_time - self._last_update_time >= ONE_SECOND:
-            self._last_update_time = current_time
-            self._uptime += ONE_SECOND
+    def _on_update_time(self, current_time):
+        self._last_update_time = current_time
+        self._uptime += ONE_SECOND
         self._uptime_text = str(timedelta(seconds=int(self._uptime / ONE_SECOND)))
+        self._update_timer = self._stage.timer_scheduler.schedule(
+            current_time + ONE_SECOND, self._on_update_time)
+
+    def update(self, current_time, events):
+        self._update_timer.run_if_due(current_time)
@@ -1,6 +1,8 @@
 import asyncio
 from os import path
+import argparse
 
+from cli import resolve_path
 from engine.game_manager import GameManager
 from engine.window_config import WindowConfig
 from game_info import TITLE
@@ -9,6 +11,17 @@ from scenes.how_to_play import HowToPlay
 from scenes.main_menu import MainMenu
 from window_size import WINDOW_SIZE
 
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+                prog="desktop",
+                description="Run the game")
+    parser.add_argument('--profile', nargs='?', const='profile.pstats', metavar='PSTATS_FILE',
+        help="profile the game, print a report on exit and write the profile to a file"
+            " (default: profile.pstats)")
+    return parser.parse_args()
+
+args = parse_arguments()
+
 async def main():
     game_manager = GameManager()
     game_manager.window_config = WindowConfig(WINDOW_SIZE, TITLE, path.join('assets', 'icon.png'))
@@ -22,6 +35,18 @@ async def main():
     game_manager.add_scene(how_to_play_scene)
 
     game_manager.startup_scene = main_menu_scene
-    await game_manager.play()
+
+    if args.profile is None:
+        await game_manager.play()
+        return
+
+    # The profiler is only imported when needed, to keep it out of the web version.
+    from profiler import FrameProfiler # pylint: disable=import-outside-toplevel
+    game_manager.profiler = FrameProfiler()
+    try:
+        await game_manager.play()
+    finally:
+        game_manager.profiler.save(resolve_path(args.profile))
+        game_manager.profiler.print_report()
 
 asyncio.run(main())
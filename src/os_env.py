@@ -0,0 +1,178 @@
+"""
+Environment API over `Stage`, for training agents to play the game.
+
+`YoureTheOsEnv` follows the conventions of Gymnasium environments: `reset` starts a new
+game and returns the first observation, and `step` applies actions, advances the game by a
+fixed amount of virtual time and returns the next observation along with a reward.
+The stage runs headless on a `FixedStepClock` and is never rendered, so stepping only
+costs the game logic.
+
+Actions are the dicts handled by the stage for automation scripts:
+`{'type': 'process', 'pid': pid}`, `{'type': 'page', 'pid': pid, 'idx': idx}` and
+`{'type': 'io_queue'}`. Invalid actions are reported and ignored, like in scripts.
+
+Observations are flat integer arrays of `observation_size` elements. They start with one
+row of `PROCESS_FEATURES` features per process position, the CPUs first, then the
+process slots, in on-screen order, and end with the number of pending I/O events.
+Empty positions are all zeros. For each process, the features are:
+- `FEATURE_PID`: The pid of the process.
+- `FEATURE_STARVATION_LEVEL`: Its starvation level, from 0 (happy) to 5.
+- `FEATURE_ON_CPU`: 1 if the process is on a CPU.
+- `FEATURE_WAITING_FOR_IO`, `FEATURE_WAITING_FOR_PAGE`: 1 if the process is blocked.
+- `FEATURE_HAS_ENDED`: 1 if the process has terminated, and only waits to be removed
+  from its CPU.
+- `FEATURE_PAGE_LOCATIONS`: For each of its possible pages, `PAGE_NONE`, `PAGE_IN_RAM`
+  or `PAGE_ON_DISK`.
+- `FEATURE_PAGE_SWAPS`: For each of its possible pages, 1 if a swap was requested and is
+  not complete yet.
+"""
+
+import numpy as np
+import pygame
+
+from constants import FRAMERATE, MAX_PAGES_PER_PROCESS, ONE_SECOND
+from engine.clock import FixedStepClock
+from scenes.stage import Stage
+from stage_config import StageConfig
+from window_size import WINDOW_SIZE
+
+PAGE_NONE = 0
+PAGE_IN_RAM = 1
+PAGE_ON_DISK = 2
+
+FEATURE_PID = 0
+FEATURE_STARVATION_LEVEL = 1
+FEATURE_ON_CPU = 2
+FEATURE_WAITING_FOR_IO = 3
+FEATURE_WAITING_FOR_PAGE = 4
+FEATURE_HAS_ENDED = 5
+FEATURE_PAGE_LOCATIONS = slice(6, 6 + MAX_PAGES_PER_PROCESS)
+FEATURE_PAGE_SWAPS = slice(6 + MAX_PAGES_PER_PROCESS, 6 + 2 * MAX_PAGES_PER_PROCESS)
+PROCESS_FEATURES = 6 + 2 * MAX_PAGES_PER_PROCESS
+
+
+class YoureTheOsEnv:
+    def __init__(self, config: StageConfig = StageConfig(), *,
+                 step_ms: int = 100, frame_ms: float = ONE_SECOND / FRAMERATE):
+        """
+        Args:
+            config: The configuration of the games.
+            step_ms: Virtual time that each call to `step` advances the game by.
+            frame_ms: Duration of a frame of the stage. Animations advance once per frame,
+                so the game only plays like an interactive one at the default framerate.
+        """
+        self._config = config
+        self._step_ms = step_ms
+        self._frame_ms = frame_ms
+        self._stage = None
+        self._pending_actions = []
+
+    @property
+    def config(self):
+        return self._config
+
+    @property
+    def step_ms(self):
+        return self._step_ms
+
+    @property
+    def stage(self):
+        """The stage of the current game, or None before the first `reset`."""
+        return self._stage
+
+    @property
+    def num_positions(self):
+        """Number of process positions in observations."""
+        return self._config.num_cpus + self._config.max_processes
+
+    @property
+    def observation_size(self):
+        return self.num_positions * PROCESS_FEATURES + 1
+
+    def reset(self, seed: int = None):
+        """Starts a new game.
+
+        Args:
+            seed: The seed of the game. A random seed is chosen if not provided.
+
+        Returns:
+            tuple: The first observation, and a dict of information about the game.
+        """
+        self._stage = Stage(config=self._config, standalone=True, seed=seed)
+        self._stage.screen = pygame.Surface(WINDOW_SIZE)
+        self._stage.headless = True
+        self._stage.clock = FixedStepClock(self._frame_ms)
+        self._stage.setup()
+        self._stage.script_callback = self._take_pending_actions
+        self._pending_actions = []
+        return self._get_observation(), self._get_info()
+
+    def step(self, actions: list):
+        """Applies actions, then advances the game by `step_ms` of virtual time.
+
+        The actions are applied in order, at the first frame of the step.
+
+        Returns:
+            tuple: The observation, the score gained during the step as reward, whether the
+                game is over, whether it was cut short (never, as games have no time limit),
+                and a dict of information about the game.
+        """
+        if self._stage is None:
+            raise RuntimeError('The environment needs to be reset before the first step.')
+        stage = self._stage
+        score = stage.score_manager.score
+        self._pending_actions = list(actions)
+        # Observations do not use the events of the game monitor, and pending events would
+        # prevent the clock from jumping to the next deadline.
+        self._stage.game_monitor.clear_events()
+
+        # pylint confuses the `current_time` property overridden by `Stage` with a method.
+        # pylint: disable=comparison-with-callable
+        end_time = stage.current_time + self._step_ms
+        if not stage.game_over:
+            # The actions are applied by the first update, so the step starts with a frame.
+            stage.clock.tick()
+            stage.update(stage.current_time, [])
+        while stage.current_time < end_time and not stage.game_over:
+            stage.step_headless(end_time)
+
+        reward = stage.score_manager.score - score
+        return self._get_observation(), reward, stage.game_over, False, self._get_info()
+
+    def _take_pending_actions(self, _events):
+        actions = self._pending_actions
+        self._pending_actions = []
+        return actions
+
+    def _get_info(self):
+        return {
+            'seed': self._stage.seed,
+            'time_ms': self._stage.current_time,
+            'score': self._stage.score_manager.score,
+            'uptime_ms': self._stage.uptime_manager.uptime_ms,
+        }
+
+    def _get_observation(self):
+        process_manager = self._stage.process_manager
+        observation = np.zeros(self.observation_size, dtype=np.int32)
+        processes = np.reshape(
+            observation[:-1], (self.num_positions, PROCESS_FEATURES))
+
+        positions = [cpu.process for cpu in process_manager.cpu_list]
+        positions += [slot.process for slot in process_manager.process_slots]
+        for features, process in zip(processes, positions):
+            if process is None:
+                continue
+            features[FEATURE_PID] = process.pid
+            features[FEATURE_STARVATION_LEVEL] = process.starvation_level
+            features[FEATURE_ON_CPU] = process.has_cpu
+            features[FEATURE_WAITING_FOR_IO] = process.is_waiting_for_io
+            features[FEATURE_WAITING_FOR_PAGE] = process.is_waiting_for_page
+            features[FEATURE_HAS_ENDED] = process.has_ended
+            for page in process.pages:
+                features[FEATURE_PAGE_LOCATIONS][page.idx] = (
+                    PAGE_ON_DISK if page.on_disk else PAGE_IN_RAM)
+                features[FEATURE_PAGE_SWAPS][page.idx] = page.swap_requested
+
+        observation[-1] = process_manager.io_queue.event_count
+        return observation
@@ -0,0 +1,172 @@
+"""
+Profiling of the main loop of the game, to find which part of the frames is slow.
+
+While a `FrameProfiler` is running, the main loop runs under `cProfile`, and the wall time
+of each subsystem of a frame is measured: event polling, the automation script, the
+process, page, score and uptime managers, and rendering. Subsystems are timed by replacing
+some of their methods on their class, so the objects created while profiling, e.g. when a
+game starts again, are timed too.
+
+At the end, the subsystems can be printed ranked by the total time they took, followed by
+the game object types that took the most time, as accounted by `cost_accounting`, and the
+functions that took the most time. The profile can be written to a `.pstats` file to be
+explored with `pstats` or tools like snakeviz.
+"""
+
+from dataclasses import dataclass
+import cProfile
+import functools
+import pstats
+import sys
+import time
+
+from cli import print_table
+from engine.game_manager import GameManager
+from engine.game_object import cost_accounting
+from engine.scene import Scene
+from game_objects.page_manager import PageManager
+from game_objects.process_manager import ProcessManager
+from game_objects.score_manager import ScoreManager
+from game_objects.uptime_manager import UptimeManager
+from scenes.stage import Stage
+
+# Methods timed for each subsystem. Timers of game objects run from the timer scheduler,
+# so their callbacks are timed along with their `update` method.
+SUBSYSTEMS = {
+    'events': ((GameManager, '_get_events'),),
+    'script': ((Stage, '_get_script_events'),),
+    'process_manager': (
+        (ProcessManager, 'update'),
+        (ProcessManager, '_on_process_creation_time'),
+    ),
+    'page_manager': ((PageManager, 'update'),),
+    'score_manager': ((ScoreManager, 'update'), (ScoreManager, '_on_update_time')),
+    'uptime_manager': ((UptimeManager, 'update'), (UptimeManager, '_on_update_time')),
+    'render': ((Scene, 'render'),),
+}
+
+
+@dataclass
+class SubsystemTimes:
+    calls: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+    # Number of timed methods of the subsystem being run, so that a timed method called
+    # from another one is not counted twice.
+    depth: int = 0
+
+    def add(self, duration_ns):
+        self.calls += 1
+        self.total_ns += duration_ns
+        self.max_ns = max(self.max_ns, duration_ns)
+
+
+def _timed(method, times):
+    @functools.wraps(method)
+    def timed_method(*args, **kwargs):
+        if times.depth > 0:
+            return method(*args, **kwargs)
+        times.depth += 1
+        start_time = time.perf_counter_ns()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            times.depth -= 1
+            times.add(time.perf_counter_ns() - start_time)
+    return timed_method
+
+
+class FrameProfiler:
+    """Profiles the main loop of a `GameManager`, which starts and stops it around the loop.
+
+    Only one profiler can run at a time, as subsystems are timed on their classes.
+    """
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+        self._times = {name: SubsystemTimes() for name in SUBSYSTEMS}
+        self._original_methods = []
+        self._wall_time_ns = 0
+        self._start_time = None
+
+    @property
+    def times(self):
+        """`SubsystemTimes` by subsystem name."""
+        return self._times
+
+    @property
+    def wall_time_ns(self):
+        return self._wall_time_ns
+
+    def start(self):
+        for name, methods in SUBSYSTEMS.items():
+            for cls, method_name in methods:
+                method = cls.__dict__[method_name]
+                self._original_methods.append((cls, method_name, method))
+                setattr(cls, method_name, _timed(method, self._times[name]))
+        cost_accounting.reset()
+        cost_accounting.enable()
+        self._start_time = time.perf_counter_ns()
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+        self._wall_time_ns += time.perf_counter_ns() - self._start_time
+        cost_accounting.disable()
+        for cls, method_name, method in reversed(self._original_methods):
+            setattr(cls, method_name, method)
+        self._original_methods.clear()
+
+    def save(self, file_path):
+        """Writes the `cProfile` profile to a `.pstats` file."""
+        self._profile.dump_stats(file_path)
+
+    def print_report(self, out_file=sys.stdout, *, top_types=15, top_functions=20):
+        """Prints the subsystems ranked by total time, then the game object types and the
+        functions that took the most time by themselves."""
+        ranking = sorted(self._times.items(), key=lambda item: item[1].total_ns, reverse=True)
+        other_ns = self._wall_time_ns - sum(times.total_ns for _, times in ranking)
+        rows = [('Subsystem', 'Calls', 'Total (s)', 'Share', 'Mean (ms)', 'Max (ms)')]
+        for name, times in ranking:
+            rows.append((
+                name,
+                str(times.calls),
+                f'{times.total_ns / 1e9:.3f}',
+                f'{times.total_ns / max(self._wall_time_ns, 1):.1%}',
+                f'{times.total_ns / max(times.calls, 1) / 1e6:.3f}',
+                f'{times.max_ns / 1e6:.3f}',
+            ))
+        rows.append((
+            'other', '', f'{other_ns / 1e9:.3f}',
+            f'{other_ns / max(self._wall_time_ns, 1):.1%}', '', '',
+        ))
+        print_table(rows, out_file)
+
+        print(f'\nTop {top_types} game object types by own time:', file=out_file)
+        print_type_costs(cost_accounting, out_file, top=top_types)
+
+        print(f'\nTop {top_functions} functions by own time:', file=out_file)
+        stats = pstats.Stats(self._profile, stream=out_file)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(top_functions)
+
+
+def print_type_costs(accounting, out_file=sys.stdout, *, top=None):
+    """Prints the game object types ranked by the time taken by their `update` and `render`
+    methods, per frame, with their number of instances."""
+    frame_count = max(accounting.frame_count, 1)
+    ranking = sorted(
+        accounting.costs.items(), key=lambda item: item[1].total_ns, reverse=True)[:top]
+    rows = [(
+        'Type', 'Instances', 'Max instances', 'Update (ms/frame)', 'Render (ms/frame)',
+        'Total (s)'
+    )]
+    for cls, cost in ranking:
+        rows.append((
+            cls.__name__,
+            str(cost.instances),
+            str(cost.max_instances),
+            f'{cost.update_ns / frame_count / 1e6:.3f}',
+            f'{cost.render_ns / frame_count / 1e6:.3f}',
+            f'{cost.total_ns / 1e9:.3f}',
+        ))
+    print_table(rows, out_file)
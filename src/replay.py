@@ -0,0 +1,354 @@
+"""
+Recording and playback of games.
+
+A replay contains everything needed to simulate a game again, identically: the seed,
+the stage configuration, the time of every update of the stage, and the actions
+and input events handled at each of these updates.
+
+Replays are stored in a compact binary format: a header, followed by a zlib-compressed
+stream of variable-length records. Times are stored as the difference with the previous
+update, so most updates only take two bytes before compression.
+
+Run this module to play a replay back without a window, as fast as possible, and check
+that it reaches the same score and uptime as the recorded game.
+"""
+
+from dataclasses import asdict, dataclass, field
+import argparse
+import json
+import sys
+import zlib
+
+import pygame
+
+from cli import format_uptime, resolve_path
+from constants import FRAMERATE, ONE_SECOND
+from engine.clock import FixedStepClock
+from engine.game_event import GameEvent
+from engine.game_event_type import GameEventType
+from scenes.stage import Stage
+from stage_config import StageConfig
+from window_size import WINDOW_SIZE
+
+_ONE_FRAME_MS = ONE_SECOND / FRAMERATE
+
+_MAGIC = b'YTOSREPLAY'
+_VERSION = 1
+
+_FLAG_STANDALONE = 1
+_FLAG_HEADLESS = 2
+
+_RECORD_TICK = 1
+_RECORD_PROCESS_ACTION = 2
+_RECORD_PAGE_ACTION = 3
+_RECORD_IO_QUEUE_ACTION = 4
+_RECORD_OTHER_ACTION = 5
+_RECORD_INPUT_EVENT = 6
+_RECORD_END = 7
+
+
+class ReplayFormatError(Exception):
+    pass
+
+
+def _write_varint(buffer: bytearray, value: int):
+    while value >= 0x80:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _write_signed_varint(buffer: bytearray, value: int):
+    # Zigzag encoding, so that small negative numbers are also stored in few bytes.
+    _write_varint(buffer, value * 2 if value >= 0 else -value * 2 - 1)
+
+
+def _write_json(buffer: bytearray, value):
+    encoded = json.dumps(value, default=repr).encode('utf_8')
+    _write_varint(buffer, len(encoded))
+    buffer.extend(encoded)
+
+
+def _is_id(value):
+    return type(value) is int and value >= 0 # pylint: disable=unidiomatic-typecheck
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self._data = data
+        self._position = 0
+
+    @property
+    def at_end(self):
+        return self._position >= len(self._data)
+
+    def read_byte(self):
+        if self.at_end:
+            raise ReplayFormatError('Unexpected end of replay.')
+        value = self._data[self._position]
+        self._position += 1
+        return value
+
+    def read_varint(self):
+        value = 0
+        shift = 0
+        while True:
+            byte = self.read_byte()
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def read_signed_varint(self):
+        value = self.read_varint()
+        return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+    def read_json(self):
+        length = self.read_varint()
+        if self._position + length > len(self._data):
+            raise ReplayFormatError('Unexpected end of replay.')
+        encoded = self._data[self._position:self._position + length]
+        self._position += length
+        return json.loads(encoded.decode('utf_8'))
+
+
+@dataclass
+class ReplayTick:
+    time: int
+    events: list = field(default_factory=list)
+    actions: list = field(default_factory=list)
+
+
+def _read_tick_record(reader: _Reader, record_type: int, tick: ReplayTick):
+    if record_type == _RECORD_PROCESS_ACTION:
+        tick.actions.append({'type': 'process', 'pid': reader.read_varint()})
+    elif record_type == _RECORD_PAGE_ACTION:
+        pid = reader.read_varint()
+        tick.actions.append({'type': 'page', 'pid': pid, 'idx': reader.read_varint()})
+    elif record_type == _RECORD_IO_QUEUE_ACTION:
+        tick.actions.append({'type': 'io_queue'})
+    elif record_type == _RECORD_OTHER_ACTION:
+        tick.actions.append(reader.read_json())
+    elif record_type == _RECORD_INPUT_EVENT:
+        event = reader.read_json()
+        tick.events.append(GameEvent(GameEventType[event['type']], event['properties']))
+    else:
+        raise ReplayFormatError(f'Unknown record type: {record_type}.')
+
+
+@dataclass
+class Replay:
+    seed: int
+    config: StageConfig
+    standalone: bool
+    headless: bool
+    start_time: int
+    ticks: list = field(default_factory=list)
+    final_score: int = 0
+    final_uptime_ms: int = 0
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        if len(data) <= len(_MAGIC) or not data.startswith(_MAGIC):
+            raise ReplayFormatError('Not a replay file.')
+        version = data[len(_MAGIC)]
+        if version != _VERSION:
+            raise ReplayFormatError(f'Unsupported replay version: {version}.')
+        try:
+            reader = _Reader(zlib.decompress(data[len(_MAGIC) + 1:]))
+        except zlib.error as exc:
+            raise ReplayFormatError('Corrupted replay.') from exc
+
+        seed = reader.read_signed_varint()
+        start_time = reader.read_varint()
+        flags = reader.read_byte()
+        replay = cls(
+            seed=seed,
+            config=StageConfig(**reader.read_json()),
+            standalone=bool(flags & _FLAG_STANDALONE),
+            headless=bool(flags & _FLAG_HEADLESS),
+            start_time=start_time,
+        )
+
+        time = start_time
+        tick = None
+        ended = False
+        while not reader.at_end:
+            record_type = reader.read_byte()
+            if record_type == _RECORD_TICK:
+                time += reader.read_varint()
+                tick = ReplayTick(time)
+                replay.ticks.append(tick)
+            elif record_type == _RECORD_END:
+                replay.final_score = reader.read_varint()
+                replay.final_uptime_ms = reader.read_varint()
+                ended = True
+            elif tick is None:
+                raise ReplayFormatError('Action or event recorded before the first update.')
+            else:
+                _read_tick_record(reader, record_type, tick)
+        if not ended:
+            raise ReplayFormatError('Unexpected end of replay.')
+        return replay
+
+    @classmethod
+    def load(cls, file_path):
+        with open(file_path, 'rb') as in_file:
+            return cls.from_bytes(in_file.read())
+
+
+class ReplayRecorder:
+    """Records the game of a stage, when set as its `recorder`.
+
+    Recording starts over each time the stage is set up, and stops at game over.
+    """
+
+    def __init__(self):
+        self._header = bytearray()
+        self._records = bytearray()
+        self._last_time = 0
+
+    def start(self, seed: int, config: StageConfig, *,
+              standalone: bool, headless: bool, current_time: int):
+        self._header = bytearray()
+        _write_signed_varint(self._header, seed)
+        _write_varint(self._header, current_time)
+        self._header.append(
+            (_FLAG_STANDALONE if standalone else 0) | (_FLAG_HEADLESS if headless else 0))
+        _write_json(self._header, asdict(config))
+
+        self._records = bytearray()
+        self._last_time = current_time
+
+    def record_tick(self, current_time: int, events: list):
+        self._records.append(_RECORD_TICK)
+        _write_varint(self._records, current_time - self._last_time)
+        self._last_time = current_time
+        for event in events:
+            self._records.append(_RECORD_INPUT_EVENT)
+            _write_json(self._records, {'type': event.type.name, 'properties': event.properties})
+
+    def record_action(self, action):
+        if action == {'type': 'io_queue'}:
+            self._records.append(_RECORD_IO_QUEUE_ACTION)
+        elif (
+            isinstance(action, dict) and action.keys() == {'type', 'pid'}
+            and action['type'] == 'process' and _is_id(action['pid'])
+        ):
+            self._records.append(_RECORD_PROCESS_ACTION)
+            _write_varint(self._records, action['pid'])
+        elif (
+            isinstance(action, dict) and action.keys() == {'type', 'pid', 'idx'}
+            and action['type'] == 'page' and _is_id(action['pid']) and _is_id(action['idx'])
+        ):
+            self._records.append(_RECORD_PAGE_ACTION)
+            _write_varint(self._records, action['pid'])
+            _write_varint(self._records, action['idx'])
+        else:
+            # Malformed actions are recorded too, since they are reported when handled.
+            self._records.append(_RECORD_OTHER_ACTION)
+            _write_json(self._records, action)
+
+    def to_bytes(self, final_score: int, final_uptime_ms: int):
+        end = bytearray([_RECORD_END])
+        _write_varint(end, final_score)
+        _write_varint(end, final_uptime_ms)
+        return (
+            _MAGIC + bytes([_VERSION])
+            + zlib.compress(bytes(self._header + self._records + end), 9)
+        )
+
+    def save(self, file_path, final_score: int, final_uptime_ms: int):
+        with open(file_path, 'wb') as out_file:
+            out_file.write(self.to_bytes(final_score, final_uptime_ms))
+
+
+class _RecordedActions: # pylint: disable=too-few-public-methods
+    """Stands in for the automation script, returning the recorded actions."""
+
+    def __init__(self, clock, on_script_events=None):
+        self.actions = []
+        self._clock = clock
+        self._on_script_events = on_script_events
+        # The script gets the events emitted since it was last called, at the previous update.
+        self._events_time = clock.current_time
+
+    def __call__(self, events):
+        if self._on_script_events is not None:
+            self._on_script_events(self._events_time, events)
+        self._events_time = self._clock.current_time
+        return self.actions
+
+
+@dataclass(frozen=True)
+class ReplayResult:
+    score: int
+    uptime_ms: int
+    expected_score: int
+    expected_uptime_ms: int
+
+    @property
+    def matches(self):
+        return self.score == self.expected_score and self.uptime_ms == self.expected_uptime_ms
+
+
+def play_replay(replay: Replay, *, on_script_events=None):
+    """Simulates a recorded game again, without a window and as fast as possible.
+
+    Args:
+        on_script_events: Called with the time at which they were emitted and the events
+            passed to the automation script, each time it would have been called.
+
+    Returns:
+        ReplayResult: The score and uptime reached, along with the recorded ones.
+    """
+    stage = Stage(config=replay.config, standalone=replay.standalone, seed=replay.seed)
+    stage.screen = pygame.Surface(WINDOW_SIZE)
+    stage.headless = replay.headless
+    clock = FixedStepClock(_ONE_FRAME_MS)
+    clock.advance_to(replay.start_time)
+    stage.clock = clock
+    stage.setup()
+
+    recorded_actions = _RecordedActions(clock, on_script_events)
+    stage.script_callback = recorded_actions
+
+    for tick in replay.ticks:
+        clock.advance_to(tick.time)
+        recorded_actions.actions = tick.actions
+        stage.update(stage.current_time, tick.events)
+
+    return ReplayResult(
+        stage.score_manager.score,
+        stage.uptime_manager.uptime_ms,
+        replay.final_score,
+        replay.final_uptime_ms,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                prog="replay",
+                description="Play a recorded game back and check that it ends the same way")
+    parser.add_argument('filename', help="filename of the replay")
+    args = parser.parse_args()
+
+    try:
+        replay = Replay.load(resolve_path(args.filename))
+    except (OSError, ReplayFormatError) as exc:
+        print(f'Cannot load replay: {exc}', file=sys.stderr)
+        return 2
+
+    result = play_replay(replay)
+    print(f'Uptime: {format_uptime(result.uptime_ms)}'
+          f' (recorded: {format_uptime(result.expected_uptime_ms)})')
+    print(f'Score: {result.score} (recorded: {result.expected_score})')
+    print(f'Seed: {replay.seed}')
+    if not result.matches:
+        print('The replay did not reach the recorded result.', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
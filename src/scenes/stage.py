@@ -1,8 +1,11 @@
 import sys
+from types import FunctionType, MemberDescriptorType, ModuleType
 
 from constants import ONE_SECOND
-import game_monitor
+from game_monitor import GameMonitor
+from engine.random import RandomStreams
 from engine.scene import Scene
+from engine.snapshot import Snapshot
 from game_objects.button import Button
 from game_objects.game_over_dialog import GameOverDialog
 from game_objects.in_game_menu_dialog import InGameMenuDialog
@@ -14,15 +17,30 @@ from game_objects.uptime_manager import UptimeManager
 from stage_config import StageConfig
 
 
-class Stage(Scene):
+def _is_script_definition(value):
+    return isinstance(
+        value, (
+            FunctionType, type, ModuleType, staticmethod, classmethod, property,
+            MemberDescriptorType,
+        ))
+
+
+class Stage(Scene): # pylint: disable=too-many-public-methods
     def __init__(self, name='', config : StageConfig = StageConfig(),
-                 *, script=None, standalone=False):
+                 *, script=None, standalone=False, seed=None, workload_trace=None):
         self._name = name
 
         self._config = config
         self._script = script
         self._script_callback = None
+        self._script_globals = None
         self._standalone = standalone
+        self._recorder = None
+        self._checkpointer = None
+        self._seed = seed
+        self._random_streams = None
+        self._workload_trace = workload_trace
+        self._game_monitor = GameMonitor()
 
         self._paused_since = None
         self._total_paused_time = 0
@@ -56,6 +74,11 @@ class Stage(Scene):
         self._game_over_time = None
         self._game_over_dialog = None
 
+        self._game_monitor.clear_events()
+        self._timer_scheduler.clear()
+        # Without a fixed seed, each new game gets a new random seed.
+        self._random_streams = RandomStreams(self._seed)
+
         self._process_manager = ProcessManager(self)
         self._page_manager = PageManager(self)
 
@@ -97,6 +120,15 @@ class Stage(Scene):
 
         self._prepare_automation_script()
 
+        if self._recorder is not None:
+            self._recorder.start(
+                self.seed, self._config,
+                standalone=self._standalone, headless=self.headless,
+                current_time=self.current_time)
+
+        if self._checkpointer is not None:
+            self._checkpointer.start(self)
+
     @property
     def name(self):
         return self._name
@@ -113,6 +145,113 @@ class Stage(Scene):
     def config(self, value):
         self._config = value
 
+    @property
+    def seed(self):
+        """The seed of the current game, from which all its randomness derives."""
+        return self._random_streams.seed
+
+    @seed.setter
+    def seed(self, value):
+        """Sets the seed of the next games, or None for a new random seed for each game."""
+        self._seed = value
+
+    @property
+    def script(self):
+        """The automation script, as source code or code object, if any."""
+        return self._script
+
+    @property
+    def script_callback(self):
+        """The `run_os` function of the automation script, if any. Set up by `setup`."""
+        return self._script_callback
+
+    @script_callback.setter
+    def script_callback(self, value):
+        self._script_callback = value
+        self._game_monitor.enabled = value is not None
+
+    @property
+    def recorder(self):
+        """Optional `ReplayRecorder` that records each game played on the stage."""
+        return self._recorder
+
+    @recorder.setter
+    def recorder(self, value):
+        self._recorder = value
+
+    @property
+    def checkpointer(self):
+        """Optional `Checkpointer` that saves the game periodically, to resume it later."""
+        return self._checkpointer
+
+    @checkpointer.setter
+    def checkpointer(self, value):
+        self._checkpointer = value
+
+    @property
+    def script_globals(self):
+        """The global namespace the automation script was run in, if any."""
+        return self._script_globals
+
+    @property
+    def script_definitions(self):
+        """Functions, classes and modules of the automation script, ordered by name. They
+        are created again each time the script is run, so they are not part of its state."""
+        if self._script_globals is None:
+            return ()
+        return tuple(
+            value for name, value in sorted(self._script_globals.items())
+            if not name.startswith('__') and _is_script_definition(value)
+        )
+
+    @property
+    def script_state(self):
+        """Variables of the automation script: its global variables, and the attributes of
+        its classes, named `<class>.<attribute>`, as classes can hold state too. Functions,
+        classes and modules are left out."""
+        if self._script_globals is None:
+            return {}
+        state = {}
+        for name, value in self._script_globals.items():
+            if name.startswith('__'):
+                continue
+            if isinstance(value, type):
+                for attribute, attribute_value in value.__dict__.items():
+                    if not attribute.startswith('__') and not _is_script_definition(
+                            attribute_value):
+                        state[f'{name}.{attribute}'] = attribute_value
+            elif not _is_script_definition(value):
+                state[name] = value
+        return state
+
+    @script_state.setter
+    def script_state(self, value):
+        if self._script_globals is None:
+            return
+        for name, variable_value in value.items():
+            class_name, _, attribute = name.rpartition('.')
+            if class_name:
+                setattr(self._script_globals[class_name], attribute, variable_value)
+            else:
+                self._script_globals[name] = variable_value
+        # The callback may be an object of the script, which was just replaced.
+        self.script_callback = self._script_globals.get('run_os')
+
+    @property
+    def random_streams(self):
+        return self._random_streams
+
+    @property
+    def game_monitor(self):
+        """The `GameMonitor` gathering the events sent to the automation script. It is
+        disabled when there is no script callback, as nothing would read the events."""
+        return self._game_monitor
+
+    @property
+    def workload_trace(self):
+        """Optional `WorkloadTrace` giving the workload of each game, instead of random events."""
+        return self._workload_trace
+
     @property
     def game_over(self):
         return self._game_over
@@ -129,10 +268,73 @@ class Stage(Scene):
     def page_manager(self):
         return self._page_manager
 
+    @property
+    def score_manager(self):
+        return self._score_manager
+
     @property
     def uptime_manager(self):
         return self._uptime_manager
 
+    @Scene.next_deadline.getter
+    def next_deadline(self): # pylint: disable=invalid-overridden-method
+        if (
+            self._game_over
+            or self._in_game_menu_dialog
+            # The automation script needs to be called at the next frame to react to events.
+            or self._game_monitor.get_events()
+            # Animations advance by a fixed amount per frame, and must not be skipped.
+            or self._process_manager.processes_are_moving
+        ):
+            return None
+        return self._timer_scheduler.next_deadline
+
+    @Scene.is_finished.getter
+    def is_finished(self): # pylint: disable=invalid-overridden-method
+        return self._game_over
+
+    def snapshot(self):
+        """Captures the logical state of the game, so that it can be restored later.
+
+        The state includes game objects, timers, random number generators and the clock,
+        but neither the recorder nor the checkpointer. Views are copied, but not their
+        pygame surfaces, which are shared. The automation script is shared too, along with
+        the global namespace it runs in. Events waiting to be sent to the automation script
+        are part of the state, as each stage has its own game monitor.
+
+        Returns:
+            Snapshot: The captured state, which can be restored any number of times.
+        """
+        state = {
+            key: value for key, value in self.__dict__.items()
+            if key not in ('_recorder', '_checkpointer', '_script_globals')
+        }
+        return Snapshot(state, self, shared=(self.scene_manager, self._script_callback))
+
+    def restore(self, snapshot: Snapshot):
+        """Brings the game back to the state captured by `snapshot`.
+
+        A snapshot can be restored any number of times, so exploring many alternatives from
+        the same state only takes one snapshot.
+        """
+        self.__dict__.update(snapshot.load(self))
+
+    def clone(self):
+        """Returns an independent copy of the stage in its current state, without recorder
+        nor checkpointer.
+
+        Updating the copy does not affect this stage, which makes it possible to simulate
+        what would happen after different actions. The copy has a copy of the clock, so a
+        copy of a stage running on a `RealTimeClock` needs another clock to be stepped
+        independently of wall-clock time.
+        """
+        stage = type(self).__new__(type(self))
+        stage.restore(self.snapshot())
+        stage._script_globals = self._script_globals # pylint: disable=protected-access
+        stage.recorder = None
+        stage.checkpointer = None
+        return stage
+
     @property
     def is_paused(self):
         return self._paused_since is not None
@@ -177,13 +379,16 @@ class Stage(Scene):
 
     def _get_script_events(self):
         if self._script_callback is None:
+            self._game_monitor.clear_events()
             return []
-        events = self._script_callback(game_monitor.get_events())
-        game_monitor.clear_events()
+        events = self._script_callback(self._game_monitor.get_events())
+        self._game_monitor.clear_events()
         return events
 
     def _process_script_events(self):
         for event in self._get_script_events():
+            if self._recorder is not None:
+                self._recorder.record_action(event)
             try:
                 if event['type'] == 'io_queue':
                     self._process_manager.io_queue.process_events()
@@ -198,7 +403,8 @@ class Stage(Scene):
 
     def _prepare_automation_script(self):
         # pylint: disable=exec-used
-        self._script_callback = None
+        self.script_callback = None
+        self._script_globals = None
         if self._script is None:
             return
 
@@ -207,16 +413,20 @@ class Stage(Scene):
             'num_cpus': self._config.num_cpus,
             'num_ram_pages': num_cols * self._config.num_ram_rows,
             'num_swap_pages':
-                num_cols * (PageManager.get_total_rows() - self._config.num_ram_rows),
+                num_cols * (PageManager.get_total_rows(self._config) - self._config.num_ram_rows),
         }
 
         exec(self._script, script_globals)
+        self._script_globals = script_globals
         try:
-            self._script_callback = script_globals['run_os']
+            self.script_callback = script_globals['run_os']
         except KeyError:
             pass
 
     def update(self, current_time, events):
+        if self._recorder is not None and not self._game_over:
+            self._recorder.record_tick(current_time, events)
+
         dialog = None
 
         if self._in_game_menu_dialog:
@@ -248,5 +458,9 @@ class Stage(Scene):
             dialog.update(current_time, events)
         else:
             self._process_script_events()
+            self._timer_scheduler.run_due(current_time)
             for game_object in self._scene_objects:
                 game_object.update(current_time, events)
+
+        if self._checkpointer is not None:
+            self._checkpointer.record_tick(self)
@@ -0,0 +1,232 @@
+"""
+Entry point to soak-test the game: simulate a long uptime headless, and check that nothing
+keeps growing.
+
+The same stage is played over and over, a new game starting as soon as the previous one is
+over, like a kiosk left running for days. At regular intervals of simulated time, a sample
+is taken of the memory allocated by Python, as traced by `tracemalloc`, and of the number
+of objects held by the stage: children of the process and page managers, processes that
+can be looked up by pid, processes waiting for I/O, pending monitor events and timers.
+
+These are all bounded in a healthy game, so a metric is reported as growing when its lowest
+value over the last quarter of the samples is higher than its highest value over the first
+quarter. The first sample is ignored, as it includes allocations made once per process,
+e.g. fonts and images. When memory grows, the source lines whose allocations grew the most
+are printed.
+"""
+
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, fields
+from os import path
+import argparse
+import csv
+import gc
+import sys
+import tracemalloc
+
+from cli import format_uptime, parse_uptime, resolve_path
+from constants import ONE_SECOND
+from difficulty_levels import difficulty_levels_map
+from engine.clock import FixedStepClock
+from engine.game_manager import GameManager
+from scenes.stage import Stage
+from stage_config import StageConfig
+
+
+@dataclass(frozen=True)
+class SoakSample:
+    time_ms: int
+    games: int
+    traced_memory: int
+    process_manager_children: int
+    page_manager_children: int
+    processes: int
+    io_waiters: int
+    monitor_events: int
+    timers: int
+
+
+METRICS = tuple(field.name for field in fields(SoakSample))[2:]
+
+# Growth below which memory is not reported, as it can come from caches filling up slowly.
+_MEMORY_TOLERANCE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class SoakResult:
+    samples: list
+    memory_growth: list
+    """Largest growths of allocated memory by source line, as `tracemalloc.StatisticDiff`."""
+
+
+def take_sample(stage: Stage, games: int):
+    """Returns a `SoakSample` of the stage, after the given number of finished games."""
+    # Game objects reference each other, so finished games are only freed by the collector.
+    gc.collect()
+    return SoakSample(
+        time_ms=stage.current_time,
+        games=games,
+        traced_memory=tracemalloc.get_traced_memory()[0],
+        process_manager_children=len(stage.process_manager.children),
+        page_manager_children=len(stage.page_manager.children),
+        processes=stage.process_manager.process_count,
+        io_waiters=stage.process_manager.io_queue.waiting_process_count,
+        monitor_events=len(stage.game_monitor.get_events()),
+        timers=len(stage.timer_scheduler),
+    )
+
+
+def find_growing_metrics(samples, *, warm_up_samples=1):
+    """Returns the names of the metrics that keep growing over the samples.
+
+    A metric keeps growing if its lowest value over the last quarter of the samples is
+    higher than its highest value over the first quarter, after the warm-up samples.
+    """
+    samples = samples[warm_up_samples:]
+    quarter = len(samples) // 4
+    if quarter == 0:
+        return []
+    growing_metrics = []
+    for name in METRICS:
+        values = [getattr(sample, name) for sample in samples]
+        tolerance = _MEMORY_TOLERANCE if name == 'traced_memory' else 0
+        if min(values[-quarter:]) > max(values[:quarter]) + tolerance:
+            growing_metrics.append(name)
+    return growing_metrics
+
+
+def _take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ))
+
+
+def run_soak(script, config: StageConfig, *, duration_ms: int, sample_interval_ms: int,
+             seed: int = None, on_sample=None, top_lines=10):
+    """Plays games headless for a simulated duration, and samples them at regular intervals.
+
+    Args:
+        script: Source or code object of the automated script.
+        seed: If provided, the seed of the first game, incremented for each next game.
+            Otherwise, each game gets a new random seed.
+        on_sample: Called with each `SoakSample`.
+        top_lines: Number of source lines listed in the memory growth.
+
+    Returns:
+        SoakResult: The samples, and the source lines whose allocations grew the most
+            between the first sample after warm-up and the end.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        stage = Stage(config=config, script=script, standalone=True, seed=seed)
+        stage.clock = FixedStepClock(ONE_SECOND / GameManager.fps)
+        stage.headless = True
+        stage.setup()
+
+        games = 0
+        samples = []
+        first_snapshot = None
+        next_sample_time = sample_interval_ms
+        # pylint confuses the properties overridden by `Stage` with methods.
+        # pylint: disable=comparison-with-callable,using-constant-test
+        while stage.current_time < duration_ms:
+            stage.step_headless()
+            if stage.is_finished:
+                games += 1
+                if seed is not None:
+                    stage.seed = seed + games
+                stage.setup()
+            if stage.current_time >= next_sample_time:
+                sample = take_sample(stage, games)
+                samples.append(sample)
+                if len(samples) == 2:
+                    first_snapshot = _take_snapshot()
+                if on_sample is not None:
+                    on_sample(sample)
+                next_sample_time += sample_interval_ms
+
+        memory_growth = []
+        if first_snapshot is not None:
+            memory_growth = _take_snapshot().compare_to(first_snapshot, 'lineno')[:top_lines]
+        return SoakResult(samples, memory_growth)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+
+def _print_summary(samples):
+    if not samples:
+        return
+    last_sample = samples[-1]
+    print(f'{last_sample.games} games over {format_uptime(last_sample.time_ms)}')
+    for name in METRICS:
+        values = [getattr(sample, name) for sample in samples]
+        print(f'{name}: first {values[0]}, max {max(values)}, last {values[-1]}')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                prog="soak",
+                description="Play an automated script headless for a long simulated uptime,"
+                    " and check that neither memory nor game objects keep growing")
+    parser.add_argument('script', help="filename of the automated script")
+    parser.add_argument('--duration', type=parse_uptime, default='24:00:00',
+        help="simulated duration, in seconds or as M:SS or H:MM:SS (default: 24:00:00)")
+    parser.add_argument('--sample-interval', type=parse_uptime, default='10:00',
+        help="simulated time between samples, in the same format (default: 10:00)")
+    parser.add_argument('--difficulty', default='normal', choices=difficulty_levels_map.keys(),
+        help="difficulty level of the games (default: normal)")
+    parser.add_argument('--seed', type=int,
+        help="seed of the first game, incremented for each next game (default: random)")
+    parser.add_argument('--output', metavar='SAMPLES_FILE',
+        help="CSV file to write the samples to")
+    args = parser.parse_args()
+
+    script_path = path.abspath(resolve_path(args.script))
+    if not path.isfile(script_path):
+        parser.error(f'script not found: {script_path}')
+    with open(script_path, encoding='utf_8') as in_file:
+        script = compile(in_file.read(), script_path, 'exec')
+
+    with (
+        open(resolve_path(args.output), 'w', encoding='utf_8', newline='')
+        if args.output is not None else nullcontext()
+    ) as out_file:
+        writer = None
+        if out_file is not None:
+            writer = csv.DictWriter(out_file, [field.name for field in fields(SoakSample)])
+            writer.writeheader()
+
+        def on_sample(sample):
+            if writer is not None:
+                writer.writerow(asdict(sample))
+                out_file.flush()
+            print(f'\r{format_uptime(sample.time_ms)} / {format_uptime(args.duration)},'
+                  f' {sample.games} games', end='', file=sys.stderr)
+
+        try:
+            result = run_soak(
+                script, difficulty_levels_map[args.difficulty].config,
+                duration_ms=args.duration, sample_interval_ms=args.sample_interval,
+                seed=args.seed, on_sample=on_sample)
+        except Exception as exc: # pylint: disable=broad-exception-caught
+            print(f'\nThe script failed: {exc.__class__.__name__}: {exc}', file=sys.stderr)
+            return 1
+    print(file=sys.stderr)
+
+    _print_summary(result.samples)
+    growing_metrics = find_growing_metrics(result.samples)
+    if 'traced_memory' in growing_metrics:
+        print('\nLargest memory growths:')
+        for stat in result.memory_growth:
+            print(stat)
+    if growing_metrics:
+        print(f'\nGrowing: {", ".join(growing_metrics)}')
+        return 1
+    print('\nNothing keeps growing')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
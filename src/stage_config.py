@@ -1,6 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 
-from constants import MAX_PROCESSES, ONE_MINUTE
+from constants import MAX_PROCESSES, NUM_PAGE_ROWS, ONE_MINUTE
 
 @dataclass(frozen=True)
 class StageConfig:
@@ -8,6 +8,7 @@ class StageConfig:
     num_processes_at_startup: int = 14
     max_processes: int = MAX_PROCESSES
     num_ram_rows: int = 8
+    num_page_rows: int = NUM_PAGE_ROWS
     swap_delay_ms: int = 100
     new_process_probability: float = 0.05
     priority_process_probability: float = 0.01
@@ -15,3 +16,6 @@ class StageConfig:
     graceful_termination_probability: float = 0.01
     time_ms_to_show_sort_button: int = 6 * ONE_MINUTE
     time_ms_to_show_auto_sort_checkbox: int = 12 * ONE_MINUTE
+
+# Type of each field of `StageConfig`, by name, to parse values given on the command line.
+CONFIG_FIELD_TYPES = {field.name: field.type for field in fields(StageConfig)}
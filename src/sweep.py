@@ -0,0 +1,265 @@
+"""
+Entry point to measure how an automation script performs across stage configurations.
+
+Any `StageConfig` field can be swept, over a grid of values or by random search, starting
+from the configuration of a difficulty level. Each point of the sweep is played headless
+with several seeds, in parallel in a pool of worker processes, and results are summarized
+in a single table, with the mean and its 95% confidence interval for each point.
+
+Parameters are given as `name=values`, where values are either a comma-separated list,
+or a range `low:high:step` including both ends. In random search, a range can omit its step,
+and values are then drawn uniformly between its ends.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from os import path
+import argparse
+import csv
+import itertools
+import math
+import random
+import statistics
+import sys
+
+from cli import print_table, resolve_path
+from difficulty_levels import difficulty_levels_map
+from stage_config import CONFIG_FIELD_TYPES, StageConfig
+from tournament import parse_seed_range, run_headless_game
+
+# Two-sided 95% critical values of Student's t distribution, by degrees of freedom.
+_T_CRITICAL_VALUES_95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+_Z_CRITICAL_VALUE_95 = 1.960
+
+_METRICS = ('score', 'uptime_ms', 'ragequits', 'graceful_terminations')
+
+
+def confidence_interval(values):
+    """Returns the mean of values and the half-width of its 95% confidence interval.
+
+    The half-width is NaN if there are less than two values.
+    """
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return mean, math.nan
+    degrees_of_freedom = len(values) - 1
+    if degrees_of_freedom <= len(_T_CRITICAL_VALUES_95):
+        critical_value = _T_CRITICAL_VALUES_95[degrees_of_freedom - 1]
+    else:
+        critical_value = _Z_CRITICAL_VALUE_95
+    return mean, critical_value * statistics.stdev(values) / math.sqrt(len(values))
+
+
+@dataclass(frozen=True)
+class Parameter:
+    name: str
+    values: tuple = ()
+    low: float = None
+    high: float = None
+    step: float = None
+
+    @classmethod
+    def parse(cls, arg):
+        """Parses `name=v1,v2,...` or `name=low:high[:step]`."""
+        name, equals, spec = arg.partition('=')
+        if not equals or name not in CONFIG_FIELD_TYPES:
+            raise ValueError(f'not a StageConfig field: {name}')
+        field_type = CONFIG_FIELD_TYPES[name]
+        if ':' in spec:
+            bounds = [field_type(value) for value in spec.split(':')]
+            if len(bounds) not in (2, 3) or bounds[0] > bounds[1]:
+                raise ValueError(f'invalid range: {spec}')
+            if len(bounds) == 3 and bounds[2] <= 0:
+                raise ValueError(f'invalid step: {spec}')
+            return cls(name, low=bounds[0], high=bounds[1],
+                       step=bounds[2] if len(bounds) == 3 else None)
+        return cls(name, values=tuple(field_type(value) for value in spec.split(',')))
+
+    @property
+    def is_range(self):
+        return self.low is not None
+
+    def grid_values(self):
+        if not self.is_range:
+            return list(self.values)
+        if self.step is None:
+            raise ValueError(f'{self.name}: a range needs a step in a grid search')
+        num_steps = math.floor((self.high - self.low) / self.step + 1e-9)
+        # Rounding avoids values like 0.30000000000000004 in float ranges.
+        return [CONFIG_FIELD_TYPES[self.name](round(self.low + i * self.step, 9))
+                for i in range(num_steps + 1)]
+
+    def sample(self, rng: random.Random):
+        if not self.is_range:
+            return rng.choice(self.values)
+        if self.step is not None:
+            return rng.choice(self.grid_values())
+        if CONFIG_FIELD_TYPES[self.name] is int:
+            return rng.randint(self.low, self.high)
+        return rng.uniform(self.low, self.high)
+
+
+def grid_points(parameters):
+    """Returns every combination of the values of the parameters."""
+    names = [parameter.name for parameter in parameters]
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(parameter.grid_values() for parameter in parameters))
+    ]
+
+
+def random_points(parameters, num_points, rng: random.Random):
+    return [
+        {parameter.name: parameter.sample(rng) for parameter in parameters}
+        for _ in range(num_points)
+    ]
+
+
+@dataclass(frozen=True)
+class PointSummary:
+    point: dict
+    num_games: int
+    num_errors: int
+    # Mean and confidence interval half-width of each metric
+    metrics: dict
+
+
+def run_sweep(script_path, base_config: StageConfig, points, seeds, *, jobs=None,
+              on_game_over=None):
+    """Plays each point of the sweep with each seed, in worker processes.
+
+    Args:
+        on_game_over: Called with the number of games played so far, after each game.
+
+    Returns:
+        list: The `PointSummary` of each point, in the same order as `points`.
+    """
+    stats_by_point = [[] for _ in points]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(
+                run_headless_game, script_path, replace(base_config, **point), seed
+            ): point_index
+            for point_index, point in enumerate(points)
+            for seed in seeds
+        }
+        for num_games, future in enumerate(as_completed(futures), 1):
+            stats_by_point[futures[future]].append(future.result())
+            if on_game_over is not None:
+                on_game_over(num_games)
+
+    return [_summarize(point, point_stats) for point, point_stats in zip(points, stats_by_point)]
+
+
+def _summarize(point, point_stats):
+    games = [stats for stats in point_stats if not stats.error]
+    metrics = {
+        metric: confidence_interval([getattr(stats, metric) for stats in games])
+        if games else (math.nan, math.nan)
+        for metric in _METRICS
+    }
+    return PointSummary(point, len(point_stats), len(point_stats) - len(games), metrics)
+
+
+def _format_interval(mean, half_width, decimals=0):
+    if math.isnan(mean):
+        return '-'
+    if math.isnan(half_width):
+        return f'{mean:.{decimals}f}'
+    return f'{mean:.{decimals}f} ± {half_width:.{decimals}f}'
+
+
+def print_summaries(summaries, out_file=sys.stdout):
+    names = list(summaries[0].point) if summaries else []
+    rows = [(*names, 'Games', 'Errors', 'Score', 'Uptime (s)', 'Ragequits', 'Graceful')]
+    for summary in summaries:
+        uptime_mean, uptime_half_width = summary.metrics['uptime_ms']
+        rows.append((
+            *(str(value) for value in summary.point.values()),
+            str(summary.num_games),
+            str(summary.num_errors),
+            _format_interval(*summary.metrics['score']),
+            _format_interval(uptime_mean / 1000, uptime_half_width / 1000),
+            _format_interval(*summary.metrics['ragequits'], decimals=1),
+            _format_interval(*summary.metrics['graceful_terminations'], decimals=1),
+        ))
+    print_table(rows, out_file)
+
+
+def write_summaries(summaries, out_file):
+    """Writes summaries to a CSV file, with the mean and bounds of each confidence interval."""
+    names = list(summaries[0].point) if summaries else []
+    columns = [*names, 'games', 'errors']
+    for metric in _METRICS:
+        columns += [f'{metric}_mean', f'{metric}_ci_low', f'{metric}_ci_high']
+    writer = csv.writer(out_file)
+    writer.writerow(columns)
+    for summary in summaries:
+        row = [*summary.point.values(), summary.num_games, summary.num_errors]
+        for metric in _METRICS:
+            mean, half_width = summary.metrics[metric]
+            row += [mean, mean - half_width, mean + half_width]
+        writer.writerow(row)
+
+
+def _parameter(arg):
+    try:
+        return Parameter.parse(arg)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                prog="sweep",
+                description="Play an automated script over a sweep of stage configurations")
+    parser.add_argument('script', help="filename of the automated script")
+    parser.add_argument('parameters', nargs='+', type=_parameter, metavar='name=values',
+        help="StageConfig field to sweep, with its values as v1,v2,... or low:high[:step]")
+    parser.add_argument('--random', type=int, metavar='NUM_POINTS',
+        help="draw this number of random points instead of sweeping the whole grid")
+    parser.add_argument('--sweep-seed', type=int,
+        help="seed of the random search, to draw the same points again")
+    parser.add_argument('--difficulty', default='normal', choices=difficulty_levels_map.keys(),
+        help="difficulty level the swept fields are changed from (default: normal)")
+    parser.add_argument('--seeds', type=parse_seed_range, default=range(10), metavar='[START:]STOP',
+        help="seeds of the games played at each point, from START (0 by default)"
+            " to STOP excluded (default: 10)")
+    parser.add_argument('--jobs', type=int,
+        help="number of games played in parallel (default: number of CPUs)")
+    parser.add_argument('--output', default='sweep-results.csv', metavar='RESULTS_FILE',
+        help="CSV file to write the summary of each point to (default: sweep-results.csv)")
+    args = parser.parse_args()
+
+    script_path = path.abspath(resolve_path(args.script))
+    if not path.isfile(script_path):
+        parser.error(f'script not found: {script_path}')
+    try:
+        if args.random is not None:
+            points = random_points(args.parameters, args.random, random.Random(args.sweep_seed))
+        else:
+            points = grid_points(args.parameters)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    num_games = len(points) * len(args.seeds)
+    summaries = run_sweep(
+        script_path, difficulty_levels_map[args.difficulty].config, points, args.seeds,
+        jobs=args.jobs,
+        on_game_over=lambda played: print(
+            f'\r{played}/{num_games} games', end='', file=sys.stderr),
+    )
+    print(file=sys.stderr)
+
+    with open(resolve_path(args.output), 'w', encoding='utf_8', newline='') as out_file:
+        write_summaries(summaries, out_file)
+    print_summaries(summaries)
+    return 1 if any(summary.num_errors for summary in summaries) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,30 @@
+import pytest
+
+from benchmarks.scaling_benchmark import SCALING_PARAMETERS, benchmark_size, scaling_exponent
+from difficulty_levels import difficulty_levels_map
+from game_objects.page_manager import PageManager
+
+_CONFIG = difficulty_levels_map['normal'].config
+
+class TestScalingBenchmark:
+    def test_processes_beyond_the_limit(self, display):
+        point = benchmark_size('processes', 56, _CONFIG, display, seed=0, duration_ms=4000)
+        assert point.size == 56
+        assert point.frames == 240
+        assert point.process_manager_update.mean_ms > 0
+        assert point.render.mean_ms > 0
+
+    def test_page_slots(self, display):
+        point = benchmark_size('page_slots', 352, _CONFIG, display, seed=0, duration_ms=1000)
+        assert point.page_manager_update.mean_ms > 0
+
+        config = SCALING_PARAMETERS['page_slots'](_CONFIG, 352)
+        assert PageManager.get_total_rows(config) * PageManager.get_num_cols() == 352
+        assert config.num_ram_rows == 11
+        assert PageManager.get_total_rows(_CONFIG) == 11
+
+    def test_scaling_exponent(self):
+        sizes = [1, 2, 4, 8]
+        assert scaling_exponent(sizes, [3, 3, 3, 3]) == pytest.approx(0)
+        assert scaling_exponent(sizes, [2 * size for size in sizes]) == pytest.approx(1)
+        assert scaling_exponent(sizes, [size ** 2 for size in sizes]) == pytest.approx(2)
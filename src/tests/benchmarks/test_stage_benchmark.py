@@ -0,0 +1,48 @@
+import pytest
+
+from benchmarks.stage_benchmark import (
+    BenchmarkFormatError, StageBenchmark, TimingStats, benchmark_stage, find_regressions,
+    results_from_json, results_to_json
+)
+from difficulty_levels import difficulty_levels_map
+
+def _result(mean_ms):
+    stats = TimingStats(mean_ms, 2 * mean_ms)
+    return StageBenchmark(frames=60, games=1, update=stats, render=stats, frame=stats)
+
+class TestStageBenchmark:
+    def test_benchmark_stage(self, display):
+        result = benchmark_stage(
+            difficulty_levels_map['insane'].config, display, seed=0, duration_ms=3000)
+        assert result.frames == 180
+        assert result.games == 1
+        assert 0 < result.update.mean_ms <= result.update.p99_ms
+        assert 0 < result.frame.mean_ms
+        assert result.frame.mean_ms == pytest.approx(
+            result.update.mean_ms + result.render.mean_ms)
+
+    def test_timing_stats(self):
+        stats = TimingStats.from_durations([1.0] * 99 + [100.0])
+        assert stats.mean_ms == pytest.approx(1.99)
+        assert stats.p99_ms == pytest.approx(1.99)
+        assert TimingStats.from_durations([5.0]) == TimingStats(5.0, 5.0)
+
+    def test_json(self):
+        results = {'easy': _result(1.0), 'insane': _result(3.0)}
+        assert results_from_json(results_to_json(results, seed=0, duration_ms=60000)) == results
+        with pytest.raises(BenchmarkFormatError):
+            results_from_json('{"version": 1, "results": {"easy": {}}}')
+        with pytest.raises(BenchmarkFormatError):
+            results_from_json('not json')
+
+    def test_find_regressions(self):
+        baseline = {'easy': _result(1.0), 'insane': _result(3.0)}
+        results = {'easy': _result(1.05), 'insane': _result(4.0), 'hard': _result(9.0)}
+        regressions = find_regressions(baseline, results, threshold=0.1)
+        assert {(regression.name, regression.measure, regression.statistic)
+                for regression in regressions} == {
+            ('insane', measure, statistic)
+            for measure in ('update', 'render', 'frame') for statistic in ('mean_ms', 'p99_ms')
+        }
+        assert regressions[0].ratio == pytest.approx(4 / 3)
+        assert find_regressions(baseline, results, threshold=0.5) == []
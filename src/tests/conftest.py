@@ -4,15 +4,52 @@ os.chdir('src')
 import pygame
 import pytest
 
+from constants import FRAMERATE, ONE_SECOND
+from engine.clock import FixedStepClock
 import scenes.stage
 from stage_config import StageConfig
 from window_size import WINDOW_SIZE
 
+_STAGE_CURRENT_TIME = scenes.stage.Stage.__dict__['current_time']
+
+class VirtualClock:
+    """Drives a stage in virtual time, so that scenarios lasting minutes of game time run
+    in milliseconds.
+
+    The stage is stepped like in headless games, by `Scene.step_headless`: rather than
+    updating the stage at every frame, time jumps straight to the next deadline of its
+    timers whenever nothing happens before it.
+    """
+
+    def __init__(self, stage):
+        self._stage = stage
+        self._clock = FixedStepClock(ONE_SECOND / FRAMERATE, stage.current_time)
+        self.update_count = 0
+        stage.clock = self._clock
+
+    def advance_to(self, time_ms):
+        """Updates the stage until its current time reaches `time_ms`, or the game is over."""
+        stage = self._stage
+        while stage.current_time < time_ms and not stage.is_finished:
+            stage.step_headless(time_ms)
+            self.update_count += 1
+
+    def advance(self, duration_ms):
+        self.advance_to(self._stage.current_time + duration_ms)
+
 @pytest.fixture
 def screen(monkeypatch):
     screen = pygame.Surface(WINDOW_SIZE)
     return screen
 
+@pytest.fixture
+def display(monkeypatch):
+    """The display surface, without a window."""
+    monkeypatch.setenv('SDL_VIDEODRIVER', 'dummy')
+    pygame.display.init()
+    yield pygame.display.set_mode(WINDOW_SIZE)
+    pygame.display.quit()
+
 @pytest.fixture
 def Stage(monkeypatch):
     @property
@@ -44,3 +81,12 @@ def stage_custom_config(screen, Stage):
         stage.setup()
         return stage
     return create_stage
+
+@pytest.fixture
+def virtual_clock(Stage, monkeypatch):
+    """Returns a function that puts a stage on a `VirtualClock`.
+
+    Stages then follow their own clock, instead of the constant time of the `Stage` fixture.
+    """
+    monkeypatch.setattr(Stage, 'current_time', _STAGE_CURRENT_TIME)
+    return VirtualClock
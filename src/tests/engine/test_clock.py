@@ -0,0 +1,36 @@
+from engine.clock import FixedStepClock
+
+class TestFixedStepClock:
+    def test_initial_time(self):
+        assert FixedStepClock(16).current_time == 0
+        assert FixedStepClock(16, start_time=500).current_time == 500
+
+    def test_tick(self):
+        clock = FixedStepClock(1000 / 60)
+        for _ in range(60):
+            clock.tick()
+        assert clock.current_time == 1000
+
+    def test_time_only_changes_on_tick(self):
+        clock = FixedStepClock(10)
+        clock.tick()
+        assert clock.current_time == 10
+        assert clock.current_time == 10
+
+    def test_advance_to(self):
+        clock = FixedStepClock(10)
+        clock.advance_to(5000)
+        assert clock.current_time == 5000
+        clock.advance_to(1000)
+        assert clock.current_time == 5000
+        clock.tick()
+        assert clock.current_time == 5010
+
+    def test_advance(self):
+        clock = FixedStepClock(1000 / 60)
+        clock.tick()
+        clock.advance(1000)
+        assert clock.current_time == 1016
+        for _ in range(60):
+            clock.tick()
+        assert clock.current_time == 2016
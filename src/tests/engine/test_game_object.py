@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from engine.drawable import Drawable
+from engine.game_object import GameObject, cost_accounting
+
+class _View(Drawable):
+    @property
+    def width(self):
+        return 0
+
+    @property
+    def height(self):
+        return 0
+
+    def draw(self, surface):
+        pass
+
+class _Leaf(GameObject):
+    def __init__(self):
+        super().__init__(_View())
+
+    def update(self, current_time, events):
+        time.sleep(0.002)
+
+class _SlowLeaf(_Leaf):
+    def update(self, current_time, events):
+        super().update(current_time, events)
+        time.sleep(0.002)
+
+class _Container(GameObject):
+    def __init__(self, children):
+        super().__init__(_View())
+        self._children = children
+
+@pytest.fixture
+def accounting():
+    cost_accounting.reset()
+    cost_accounting.enable()
+    yield cost_accounting
+    cost_accounting.disable()
+    cost_accounting.reset()
+
+class TestCostAccounting:
+    def test_time_by_concrete_class(self, accounting):
+        container = _Container([_Leaf(), _Leaf(), _SlowLeaf()])
+
+        container.update(0, [])
+        accounting.end_frame()
+
+        leaf_cost = accounting.costs[_Leaf]
+        slow_leaf_cost = accounting.costs[_SlowLeaf]
+        container_cost = accounting.costs[_Container]
+        assert leaf_cost.update_calls == 2
+        # The method of the base class is accounted to the concrete class, only once.
+        assert slow_leaf_cost.update_calls == 1
+        assert slow_leaf_cost.update_ns >= 4_000_000
+        # The time spent in children is not accounted to their parent.
+        assert container_cost.update_calls == 1
+        assert container_cost.update_ns < 2_000_000
+
+    def test_instances_per_frame(self, accounting):
+        leaves = [_Leaf() for _ in range(3)]
+        container = _Container(leaves)
+
+        container.update(0, [])
+        container.render(None)
+        accounting.end_frame()
+        assert accounting.costs[_Leaf].instances == 3
+        assert accounting.costs[_Leaf].render_calls == 3
+
+        container.children.pop()
+        container.update(0, [])
+        accounting.end_frame()
+        assert accounting.frame_count == 2
+        assert accounting.costs[_Leaf].instances == 2
+        assert accounting.costs[_Leaf].max_instances == 3
+
+    def test_disable(self, accounting):
+        accounting.disable()
+
+        assert not accounting.enabled
+        assert _Leaf.__dict__['update'].__name__ == 'update'
+        _Container([_Leaf()]).update(0, [])
+        accounting.end_frame()
+        assert not accounting.costs
+        assert accounting.frame_count == 0
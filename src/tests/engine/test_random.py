@@ -0,0 +1,34 @@
+from engine.random import RandomStreams
+
+def _draw(stream, count=20):
+    return [stream.get_number(1, 1000) for _ in range(count)]
+
+class TestRandomStreams:
+    def test_same_seed_same_numbers(self):
+        assert (
+            _draw(RandomStreams(42).get_stream('io_events'))
+            == _draw(RandomStreams(42).get_stream('io_events'))
+        )
+
+    def test_different_seeds(self):
+        assert (
+            _draw(RandomStreams(1).get_stream('io_events'))
+            != _draw(RandomStreams(2).get_stream('io_events'))
+        )
+
+    def test_streams_are_independent(self):
+        streams = RandomStreams(42)
+        _draw(streams.get_stream('io_blocking'), 100)
+
+        assert _draw(streams.get_stream('io_events')) == _draw(
+            RandomStreams(42).get_stream('io_events'))
+
+    def test_get_stream_returns_same_stream(self):
+        streams = RandomStreams(42)
+        assert streams.get_stream('priority') is streams.get_stream('priority')
+
+    def test_random_seed(self):
+        streams = RandomStreams()
+        assert isinstance(streams.seed, int)
+        assert _draw(streams.get_stream('priority')) == _draw(
+            RandomStreams(streams.seed).get_stream('priority'))
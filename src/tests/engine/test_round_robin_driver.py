@@ -0,0 +1,79 @@
+from engine.round_robin_driver import RoundRobinDriver
+from scenes.stage import Stage
+from stage_config import StageConfig
+
+_SCRIPT = '''
+def run_os(events):
+    actions = []
+    for event in events:
+        if event.etype == 'PROC_NEW' and event.pid <= num_cpus:
+            actions.append({'type': 'process', 'pid': event.pid})
+        elif event.etype == 'IO_QUEUE' and event.io_count > 0:
+            actions.append({'type': 'io_queue'})
+    return actions
+'''
+
+_FAILING_SCRIPT = '''
+def run_os(events):
+    raise RuntimeError('oops')
+'''
+
+def _create_stage(seed, script=_SCRIPT):
+    return Stage(config=StageConfig(num_cpus=2), script=script, standalone=True, seed=seed)
+
+def _result(stage):
+    return stage.score_manager.score, stage.uptime_manager.uptime_ms, stage.current_time
+
+class TestRoundRobinDriver:
+    def test_scenes_play_like_alone(self):
+        driver = RoundRobinDriver([_create_stage(seed) for seed in range(3)])
+        assert driver.num_active_scenes == 3
+        driver.run()
+        assert driver.is_finished
+        assert driver.errors == [None, None, None]
+
+        for seed, stage in enumerate(driver.scenes):
+            assert stage.game_over
+            alone = RoundRobinDriver([_create_stage(seed)])
+            alone.run()
+            assert _result(alone.scenes[0]) == _result(stage)
+
+    def test_events_are_sent_to_the_script_of_their_stage(self):
+        driver = RoundRobinDriver([_create_stage(1), _create_stage(2)])
+        stage, other_stage = driver.scenes
+        driver.step()
+        for each_stage in (stage, other_stage):
+            assert [
+                (event.etype, event.pid) for event in each_stage.game_monitor.get_events()
+            ] == [('PROC_NEW', 1)]
+        # The events of the other stage wait for its next step.
+        stage.step_headless()
+        assert [
+            (event.etype, event.pid) for event in other_stage.game_monitor.get_events()
+        ] == [('PROC_NEW', 1)]
+
+    def test_error_stops_only_its_scene(self):
+        driver = RoundRobinDriver([_create_stage(1, _FAILING_SCRIPT), _create_stage(1)])
+        driver.step()
+        driver.step()
+        assert isinstance(driver.errors[0], RuntimeError)
+        assert driver.num_active_scenes == 1
+        driver.run()
+        assert driver.errors[1] is None
+        assert driver.scenes[1].game_over
+
+    def test_max_time(self):
+        driver = RoundRobinDriver([_create_stage(seed) for seed in range(2)], max_time_ms=20000)
+        driver.run()
+        for stage in driver.scenes:
+            assert not stage.game_over
+            assert 20000 <= stage.current_time < 21000
+
+    def test_stop_condition(self):
+        driver = RoundRobinDriver(
+            [_create_stage(seed) for seed in range(2)],
+            stop_condition=lambda stage: stage.process_manager.user_terminated_process_count >= 2)
+        driver.run()
+        for stage in driver.scenes:
+            assert not stage.game_over
+            assert stage.process_manager.user_terminated_process_count == 2
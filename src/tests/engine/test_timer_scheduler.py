@@ -0,0 +1,65 @@
+from engine.timer_scheduler import TimerScheduler
+
+class TestTimerScheduler:
+    def test_run_due(self):
+        scheduler = TimerScheduler()
+        calls = []
+        scheduler.schedule(2000, lambda time: calls.append(('second', time)))
+        scheduler.schedule(1000, lambda time: calls.append(('first', time)))
+
+        scheduler.run_due(999)
+        assert calls == []
+
+        scheduler.run_due(1500)
+        assert calls == [('first', 1500)]
+
+        scheduler.run_due(3000)
+        assert calls == [('first', 1500), ('second', 3000)]
+
+    def test_next_deadline(self):
+        scheduler = TimerScheduler()
+        assert scheduler.next_deadline is None
+
+        timer = scheduler.schedule(1000, lambda time: None)
+        scheduler.schedule(2000, lambda time: None)
+        assert scheduler.next_deadline == 1000
+
+        timer.cancel()
+        assert scheduler.next_deadline == 2000
+
+    def test_cancel(self):
+        scheduler = TimerScheduler()
+        calls = []
+        timer = scheduler.schedule(1000, calls.append)
+        timer.cancel()
+
+        scheduler.run_due(1000)
+        assert calls == []
+        assert not timer.pending
+
+    def test_run_if_due_fires_once(self):
+        scheduler = TimerScheduler()
+        calls = []
+        timer = scheduler.schedule(1000, calls.append)
+
+        timer.run_if_due(500)
+        assert calls == []
+
+        timer.run_if_due(1000)
+        scheduler.run_due(1000)
+        timer.run_if_due(1100)
+        assert calls == [1000]
+
+    def test_rescheduled_timer_waits_for_next_tick(self):
+        scheduler = TimerScheduler()
+        calls = []
+
+        def callback(time):
+            calls.append(time)
+            scheduler.schedule(time, callback)
+
+        scheduler.schedule(1000, callback)
+        scheduler.run_due(1000)
+        assert calls == [1000]
+        scheduler.run_due(1000)
+        assert calls == [1000, 1000]
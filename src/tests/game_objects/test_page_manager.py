@@ -229,4 +229,15 @@ class TestPageManager:
             child for child in page_manager.children if isinstance(child, PageSlot) and child.page == page_to_delete
         ), None)
         assert containing_slot is None
-         
\ No newline at end of file
+         
+    def test_page_rows(self, stage_custom_config):
+        def num_slots(config):
+            page_manager = PageManager(stage_custom_config(config))
+            page_manager.setup()
+            return len([child for child in page_manager.children if isinstance(child, PageSlot)])
+
+        num_cols = PageManager.get_num_cols()
+        assert num_slots(StageConfig(num_ram_rows=3)) == 11 * num_cols
+        assert num_slots(StageConfig(num_ram_rows=3, num_page_rows=20)) == 20 * num_cols
+        # There are always as many rows as RAM rows.
+        assert num_slots(StageConfig(num_ram_rows=12, num_page_rows=4)) == 12 * num_cols
@@ -328,16 +328,17 @@ class TestProcessManager:
                 process_slot for process_slot in process_manager.process_slots if process_slot.process is not None
             ]) == stage_config.num_processes_at_startup + 2
 
-    def test_show_sort_button(self, ready_process_manager_custom_config):
+    def test_show_sort_button(self, stage_custom_config, virtual_clock):
         stage_config = StageConfig(
             num_processes_at_startup = 0,
             new_process_probability = 0,
             time_ms_to_show_sort_button = 6 * ONE_MINUTE
         )
-        process_manager = ready_process_manager_custom_config(stage_config)
+        stage = stage_custom_config(stage_config)
+        clock = virtual_clock(stage)
 
         sort_button = None
-        for child in process_manager.children:
+        for child in stage.process_manager.children:
             if isinstance(child, SortButton):
                 sort_button = child
                 break
@@ -345,26 +346,24 @@ class TestProcessManager:
         assert sort_button is not None
         assert not sort_button.visible
 
-        for i in range(int(stage_config.time_ms_to_show_sort_button / ONE_SECOND)):
-            process_manager.stage.update(i * ONE_SECOND, [])
-            assert not sort_button.visible
+        clock.advance_to(stage_config.time_ms_to_show_sort_button - 1)
+        assert not sort_button.visible
 
-        process_manager.stage.update(stage_config.time_ms_to_show_sort_button, [])
-        process_manager.stage.update(stage_config.time_ms_to_show_sort_button + 1, [])
-        # We execute one extra update because the process manager determines the visibility of the button
-        # based on the stage's UptimeManager, which may get updated after the ProcessManager.
+        clock.advance_to(stage_config.time_ms_to_show_sort_button)
+        assert stage.current_time == stage_config.time_ms_to_show_sort_button
         assert sort_button.visible
 
-    def test_show_auto_sort_checkbox(self, ready_process_manager_custom_config):
+    def test_show_auto_sort_checkbox(self, stage_custom_config, virtual_clock):
         stage_config = StageConfig(
             num_processes_at_startup = 0,
             new_process_probability = 0,
             time_ms_to_show_auto_sort_checkbox = 12 * ONE_MINUTE
         )
-        process_manager = ready_process_manager_custom_config(stage_config)
+        stage = stage_custom_config(stage_config)
+        clock = virtual_clock(stage)
 
         auto_sort_checkbox = None
-        for child in process_manager.children:
+        for child in stage.process_manager.children:
             if isinstance(child, Checkbox) and child.text == 'Auto-Sort':
                 auto_sort_checkbox = child
                 break
@@ -372,14 +371,11 @@ class TestProcessManager:
         assert auto_sort_checkbox is not None
         assert not auto_sort_checkbox.visible
 
-        for i in range(int(stage_config.time_ms_to_show_auto_sort_checkbox / ONE_SECOND)):
-            process_manager.stage.update(i * ONE_SECOND, [])
-            assert not auto_sort_checkbox.visible
+        clock.advance_to(stage_config.time_ms_to_show_auto_sort_checkbox - 1)
+        assert not auto_sort_checkbox.visible
 
-        process_manager.stage.update(stage_config.time_ms_to_show_auto_sort_checkbox, [])
-        process_manager.stage.update(stage_config.time_ms_to_show_auto_sort_checkbox + 1, [])
-        # We execute one extra update because the process manager determines the visibility of the checkbox
-        # based on the stage's UptimeManager, which may get updated after the ProcessManager.
+        clock.advance_to(stage_config.time_ms_to_show_auto_sort_checkbox)
+        assert stage.current_time == stage_config.time_ms_to_show_auto_sort_checkbox
         assert auto_sort_checkbox.visible
 
     def test_get_current_stats(self, ready_process_manager_custom_config):
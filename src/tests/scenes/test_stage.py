@@ -0,0 +1,151 @@
+import pickle
+
+import pytest
+
+from constants import FRAMERATE, ONE_MINUTE, ONE_SECOND
+from engine.clock import FixedStepClock
+from engine.snapshot import SnapshotFormatError
+import scenes.stage
+from stage_config import StageConfig
+
+def _create_stage(screen):
+    stage = scenes.stage.Stage(config=StageConfig(io_probability=0.1), seed=99)
+    stage.screen = screen
+    stage.clock = FixedStepClock(ONE_SECOND / FRAMERATE)
+    stage.setup()
+    return stage
+
+def _step(stage, duration_ms):
+    end_time = stage.current_time + duration_ms
+    while stage.current_time < end_time:
+        stage.clock.tick()
+        stage.update(stage.current_time, [])
+
+def _state(stage):
+    process_manager = stage.process_manager
+    return (
+        stage.current_time,
+        stage.score_manager.score,
+        stage.uptime_manager.uptime_ms,
+        process_manager.io_queue.event_count,
+        sorted(
+            (pid, process.starvation_level, process.has_cpu, process.is_blocked)
+            for pid, process in process_manager._processes.items()
+        ),
+    )
+
+class TestStageSnapshot:
+    def test_clone_is_independent(self, screen):
+        stage = _create_stage(screen)
+        _step(stage, 30 * ONE_SECOND)
+        state = _state(stage)
+
+        clone = stage.clone()
+        assert _state(clone) == state
+
+        for process in list(clone.process_manager._processes.values())[:4]:
+            process.toggle()
+        _step(clone, 10 * ONE_SECOND)
+
+        assert _state(clone) != state
+        assert _state(stage) == state
+
+    def test_clones_evolve_identically(self, screen):
+        stage = _create_stage(screen)
+        _step(stage, 10 * ONE_SECOND)
+
+        clone1 = stage.clone()
+        clone2 = stage.clone()
+        _step(clone1, 20 * ONE_SECOND)
+        _step(clone2, 20 * ONE_SECOND)
+
+        assert _state(clone1) == _state(clone2)
+
+    def test_restore(self, screen):
+        stage = _create_stage(screen)
+        _step(stage, 10 * ONE_SECOND)
+        snapshot = stage.snapshot()
+        state = _state(stage)
+
+        _step(stage, 20 * ONE_SECOND)
+        state_after = _state(stage)
+
+        stage.restore(snapshot)
+        assert _state(stage) == state
+        assert stage.process_manager.stage is stage
+
+        _step(stage, 20 * ONE_SECOND)
+        assert _state(stage) == state_after
+
+    def test_surfaces_are_shared(self, screen):
+        stage = _create_stage(screen)
+        clone = stage.clone()
+
+        assert clone.screen is stage.screen
+        assert clone.process_manager.view is not stage.process_manager.view
+        assert (
+            clone.process_manager.view._idle_processes_text_surface
+            is stage.process_manager.view._idle_processes_text_surface
+        )
+
+    def test_state_needs_snapshot_to_load(self, screen):
+        snapshot = _create_stage(screen).snapshot()
+
+        with pytest.raises(SnapshotFormatError):
+            pickle.loads(snapshot._data)
+
+class TestStageVirtualTime:
+    def test_timers_run_when_due(self, stage_custom_config, virtual_clock):
+        stage = stage_custom_config(
+            StageConfig(num_processes_at_startup=0, new_process_probability=0))
+        clock = virtual_clock(stage)
+        calls = []
+        stage.timer_scheduler.schedule(10 * ONE_MINUTE, calls.append)
+
+        clock.advance_to(10 * ONE_MINUTE - 1)
+        assert calls == []
+
+        clock.advance_to(30 * ONE_MINUTE)
+        # Like in headless games, a timer due within the current frame runs at its end.
+        assert len(calls) == 1
+        assert 10 * ONE_MINUTE <= calls[0] <= 10 * ONE_MINUTE + ONE_SECOND / FRAMERATE
+        assert stage.current_time == 30 * ONE_MINUTE
+        # The uptime timer runs up to a frame late each second, so it can lag a second behind.
+        assert 30 * ONE_MINUTE - ONE_SECOND <= stage.uptime_manager.uptime_ms <= 30 * ONE_MINUTE
+        # Time jumps from one timer to the next instead of going through every frame.
+        frame_count = 30 * ONE_MINUTE / (ONE_SECOND / FRAMERATE)
+        assert clock.update_count < frame_count / 5
+
+    def test_idle_processes_end_the_game(self, stage, virtual_clock):
+        clock = virtual_clock(stage)
+
+        clock.advance_to(ONE_MINUTE)
+
+        assert stage.is_finished
+        assert stage.current_time < ONE_MINUTE
+        assert stage.uptime_manager.uptime_ms < ONE_MINUTE
+        assert not stage.process_manager._sort_processes_button.visible
+
+class TestStageGameMonitor:
+    def test_disabled_without_script(self, screen):
+        stage = _create_stage(screen)
+        assert not stage.game_monitor.enabled
+
+        _step(stage, 10 * ONE_SECOND)
+        assert not stage.game_monitor.get_events()
+
+    def test_enabled_with_script(self, screen):
+        events = []
+        def run_os(new_events):
+            events.extend(new_events)
+            return []
+
+        stage = _create_stage(screen)
+        stage.script_callback = run_os
+        assert stage.game_monitor.enabled
+
+        _step(stage, 10 * ONE_SECOND)
+        assert any(event.etype == 'PROC_NEW' for event in events)
+
+        stage.script_callback = None
+        assert not stage.game_monitor.enabled
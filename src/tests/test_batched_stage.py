@@ -0,0 +1,191 @@
+import pytest
+
+from constants import ONE_SECOND
+from engine.clock import FixedStepClock
+import scenes.stage
+from stage_config import StageConfig
+
+np = pytest.importorskip('numpy')
+
+# pylint: disable=wrong-import-position
+from batched_stage import ACTION_IO_QUEUE, ACTION_NONE, BatchedStage
+
+_QUIET_CONFIG = StageConfig(
+    num_processes_at_startup=4,
+    new_process_probability=0,
+    priority_process_probability=0,
+    io_probability=0,
+    graceful_termination_probability=0,
+)
+
+def _step_until(batched_stage, time_ms, actions=ACTION_NONE):
+    while batched_stage.current_time[0] < time_ms:
+        batched_stage.step(np.full(batched_stage.num_envs, actions))
+
+class TestBatchedStage:
+    def test_startup_processes(self):
+        batched_stage = BatchedStage(3, _QUIET_CONFIG, seed=1)
+        _step_until(batched_stage, ONE_SECOND)
+
+        assert (batched_stage.process_exists.sum(axis=1) == 4).all()
+        assert (batched_stage.pid[:, :4] == [1, 2, 3, 4]).all()
+        assert (batched_stage.starvation_level[:, :4] == 1).all()
+
+    def test_process_on_cpu_becomes_happy_and_scores(self):
+        batched_stage = BatchedStage(2, _QUIET_CONFIG, seed=1)
+        _step_until(batched_stage, ONE_SECOND)
+        batched_stage.step(np.full(2, batched_stage.process_action(0)))
+
+        assert (batched_stage.cpu[:, 0] == 0).all()
+        assert (batched_stage.page_count[:, 0] > 0).all()
+        assert not batched_stage.page_on_disk[:, 0].any()
+
+        _step_until(batched_stage, 7 * ONE_SECOND)
+        assert (batched_stage.starvation_level[:, 0] == 0).all()
+        assert (batched_stage.score > 0).all()
+
+    def test_toggling_process_twice_frees_cpu(self):
+        batched_stage = BatchedStage(1, _QUIET_CONFIG, seed=1)
+        _step_until(batched_stage, ONE_SECOND)
+        batched_stage.step([batched_stage.process_action(0)])
+        batched_stage.step([batched_stage.process_action(0)])
+
+        assert batched_stage.cpu[0, 0] == -1
+
+    def test_starving_processes_are_terminated(self):
+        batched_stage = BatchedStage(1, _QUIET_CONFIG, seed=1)
+        _step_until(batched_stage, 52 * ONE_SECOND)
+
+        assert batched_stage.user_terminated_process_count[0] == 4
+        assert not batched_stage.process_exists.any()
+        assert not batched_stage.game_over[0]
+
+    def test_game_over_matches_stage(self, screen):
+        config = StageConfig(
+            new_process_probability=0,
+            priority_process_probability=0,
+            io_probability=0,
+            graceful_termination_probability=0,
+        )
+        stage = scenes.stage.Stage(config=config, standalone=True, seed=1)
+        stage.screen = screen
+        stage.headless = True
+        stage.clock = FixedStepClock(100)
+        stage.setup()
+        while stage.process_manager.user_terminated_process_count < 10:
+            stage.clock.tick()
+            stage.update(stage.current_time, [])
+
+        batched_stage = BatchedStage(2, config, seed=1, step_ms=100)
+        dones = np.zeros(2, dtype=bool)
+        while not dones.all():
+            _, dones = batched_stage.step(np.full(2, ACTION_NONE))
+
+        assert (batched_stage.current_time == stage.current_time).all()
+        assert (batched_stage.uptime_ms == stage.uptime_manager.uptime_ms).all()
+        assert (batched_stage.score == stage.score_manager.score).all()
+
+    def test_actions_match_stage(self, screen):
+        config = StageConfig(
+            new_process_probability=0,
+            priority_process_probability=0,
+            io_probability=0,
+            graceful_termination_probability=0,
+        )
+        # Pid of the process moved to or from a CPU, by time.
+        toggled_pids = {
+            1000: 1, 1100: 2, 1200: 3, 1300: 4,
+            8000: 1, 8100: 5,
+            15000: 2, 15100: 6,
+            20000: 5, 20100: 1,
+            26000: 3, 26100: 7, 26200: 8,
+        }
+        end_time = 40 * ONE_SECOND
+
+        stage = scenes.stage.Stage(config=config, standalone=True, seed=1)
+        stage.screen = screen
+        stage.headless = True
+        stage.clock = FixedStepClock(100)
+        stage.setup()
+        stage_results = []
+        while stage.current_time < end_time:
+            stage.clock.tick()
+            if stage.current_time in toggled_pids:
+                stage.process_manager.get_process(toggled_pids[stage.current_time]).toggle()
+            stage.update(stage.current_time, [])
+            stage_results.append((stage.score_manager.score, stage.uptime_manager.uptime_ms))
+
+        batched_stage = BatchedStage(1, config, seed=1, step_ms=100)
+        batched_results = []
+        while batched_stage.current_time[0] < end_time:
+            action = ACTION_NONE
+            pid = toggled_pids.get(batched_stage.current_time[0] + 100)
+            if pid is not None:
+                action = batched_stage.process_action(
+                    np.flatnonzero(batched_stage.pid[0] == pid)[0])
+            batched_stage.step([action])
+            batched_results.append((batched_stage.score[0], batched_stage.uptime_ms[0]))
+
+        assert batched_stage.score[0] > 0
+        assert batched_results == stage_results
+
+    def test_io_events(self):
+        config = StageConfig(num_processes_at_startup=1, new_process_probability=0,
+                             io_probability=1, graceful_termination_probability=0)
+        batched_stage = BatchedStage(4, config, seed=1)
+        _step_until(batched_stage, ONE_SECOND)
+        batched_stage.step(np.full(4, batched_stage.process_action(0)))
+        _step_until(batched_stage, 3 * ONE_SECOND)
+
+        assert batched_stage.is_blocked[:, 0].all()
+
+        # I/O events happen at the latest after 5 seconds.
+        _step_until(batched_stage, 8 * ONE_SECOND)
+        assert (batched_stage.io_event_count == 1).all()
+
+        batched_stage.step(np.full(4, ACTION_IO_QUEUE))
+        assert not batched_stage.is_blocked[:, 0].any()
+        assert (batched_stage.io_event_count == 0).all()
+
+    def test_swap_page(self):
+        batched_stage = BatchedStage(1, _QUIET_CONFIG, seed=1)
+        _step_until(batched_stage, ONE_SECOND)
+        batched_stage.step([batched_stage.process_action(0)])
+        assert not batched_stage.page_on_disk[0, 0, 0]
+
+        batched_stage.step([batched_stage.page_action(0, 0)])
+        assert batched_stage.page_swap_requested[0, 0, 0]
+        assert batched_stage.is_blocked[0, 0]
+
+        _step_until(batched_stage, batched_stage.current_time[0] + 2 * _QUIET_CONFIG.swap_delay_ms)
+        assert batched_stage.page_on_disk[0, 0, 0]
+        assert not batched_stage.page_swap_requested[0, 0, 0]
+        assert batched_stage.is_blocked[0, 0]
+
+        batched_stage.step([batched_stage.page_action(0, 0)])
+        _step_until(batched_stage, batched_stage.current_time[0] + 2 * _QUIET_CONFIG.swap_delay_ms)
+        assert not batched_stage.page_on_disk[0, 0, 0]
+        assert not batched_stage.is_blocked[0, 0]
+
+    def test_same_seed_gives_same_games(self):
+        def play(seed):
+            batched_stage = BatchedStage(8, StageConfig(io_probability=0.2), seed=seed)
+            rng = np.random.default_rng(0)
+            for _ in range(600):
+                batched_stage.step(rng.integers(0, batched_stage.num_actions, 8))
+            return batched_stage.score.copy(), batched_stage.uptime_ms.copy()
+
+        first_score, first_uptime = play(42)
+        second_score, second_uptime = play(42)
+        assert (first_score == second_score).all()
+        assert (first_uptime == second_uptime).all()
+
+    def test_reset_only_given_envs(self):
+        batched_stage = BatchedStage(2, _QUIET_CONFIG, seed=1)
+        _step_until(batched_stage, 60 * ONE_SECOND)
+        batched_stage.reset(np.array([True, False]))
+
+        assert batched_stage.current_time[0] == 0
+        assert batched_stage.current_time[1] == 60 * ONE_SECOND
+        assert batched_stage.user_terminated_process_count[0] == 0
+        assert batched_stage.user_terminated_process_count[1] == 4
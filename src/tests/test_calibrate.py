@@ -0,0 +1,69 @@
+from calibrate import TunedParameter, calibrate, config_at, format_difficulty_level
+from difficulty_levels import DifficultyLevel
+from stage_config import StageConfig
+from tournament import run_headless_game
+
+_SCRIPT = '''
+def run_os(events):
+    return []
+'''
+
+def _fake_uptime(config):
+    # Shorter games with more I/O and fewer CPUs.
+    return 600_000 * config.num_cpus / 4 * (1 - config.io_probability)
+
+class TestCalibrate:
+    def test_tuned_parameter(self):
+        parameter = TunedParameter.parse('num_cpus=8:2')
+        assert parameter.value_at(0) == 8
+        assert parameter.value_at(0.5) == 5
+        assert parameter.value_at(1) == 2
+
+        parameter = TunedParameter.parse('io_probability=0:0.3')
+        assert parameter.value_at(1 / 3) == 0.1
+
+    def test_calibrate(self):
+        parameters = [TunedParameter.parse('io_probability=0:0.9')]
+        steps = []
+        step = calibrate(_fake_uptime, StageConfig(), parameters, 300_000,
+                         tolerance=0.01, on_step=steps.append)
+
+        assert step.config == StageConfig(io_probability=0.5)
+        assert step.median_uptime_ms == 300_000
+        assert [step.difficulty for step in steps[:2]] == [0, 1]
+        assert steps[0].config == config_at(StageConfig(), parameters, 0)
+
+    def test_calibrate_stops_when_parameters_cannot_be_tuned_more_finely(self):
+        parameters = [TunedParameter.parse('num_cpus=8:1')]
+        steps = []
+        step = calibrate(_fake_uptime, StageConfig(io_probability=0), parameters, 410_000,
+                         tolerance=0, max_steps=100, on_step=steps.append)
+
+        assert step.config.num_cpus == 3
+        assert len(steps) < 10
+
+    def test_calibrate_out_of_reach(self):
+        parameters = [TunedParameter.parse('io_probability=0:0.5')]
+        step = calibrate(_fake_uptime, StageConfig(), parameters, 1_000_000)
+        assert step.difficulty == 0
+
+    def test_format_difficulty_level(self):
+        config = StageConfig(num_cpus=6, graceful_termination_probability=0)
+        code = format_difficulty_level(DifficultyLevel('Medium', config))
+
+        assert code.startswith('_medium_difficulty = DifficultyLevel(\n    \'Medium\',')
+        assert 'graceful_termination_probability=0,' in code
+        assert 'max_processes' not in code
+        namespace = {'DifficultyLevel': DifficultyLevel, 'StageConfig': StageConfig}
+        exec(code, namespace) # pylint: disable=exec-used
+        assert namespace['_medium_difficulty'] == DifficultyLevel('Medium', config)
+
+    def test_max_uptime(self, tmp_path):
+        script_path = tmp_path / 'script.py'
+        script_path.write_text(_SCRIPT)
+        config = StageConfig(new_process_probability=0, io_probability=0)
+
+        stats = run_headless_game(str(script_path), config, 1, max_uptime_ms=30_000)
+        assert 29_000 <= stats.uptime_ms <= 30_000
+        # Without the limit, all processes would starve and the game would be over.
+        assert stats.ragequits == 0
@@ -0,0 +1,138 @@
+import io
+
+import pytest
+
+from checkpoint import CheckpointFormatError, Checkpointer, load_checkpoint, save_checkpoint
+from engine.clock import FixedStepClock
+from scenes.stage import Stage
+from stage_config import StageConfig
+
+_SCRIPT = '''
+event_count = 0
+waiting_pids = []
+
+def run_os(events):
+    global event_count
+    event_count += len(events)
+    actions = []
+    for event in events:
+        if event.etype == 'PROC_NEW' and event.pid <= num_cpus:
+            actions.append({'type': 'process', 'pid': event.pid})
+        elif event.etype == 'PROC_WAIT_IO' and event.waiting_for_io:
+            waiting_pids.append(event.pid)
+        elif event.etype == 'IO_QUEUE' and event.io_count > 0:
+            actions.append({'type': 'io_queue'})
+    return actions
+'''
+
+_CONFIG = StageConfig(num_cpus=2, io_probability=0.2)
+
+with open('../automated_skeleton.py', encoding='utf_8') as skeleton_file:
+    _SKELETON_SCRIPT = skeleton_file.read()
+
+def _create_stage(screen, checkpointer=None, script=_SCRIPT):
+    stage = Stage(config=_CONFIG, script=compile(script, 'script', 'exec'), standalone=True,
+                  seed=7)
+    stage.screen = screen
+    stage.clock = FixedStepClock(1000 / 60)
+    stage.headless = True
+    stage.checkpointer = checkpointer
+    stage.setup()
+    return stage
+
+def _play_until(stage, time_ms):
+    while stage.current_time < time_ms and not stage.game_over:
+        stage.step_headless()
+
+def _result(stage):
+    return (
+        stage.score_manager.score,
+        stage.uptime_manager.uptime_ms,
+        stage.current_time,
+        stage.script_state['event_count'],
+        stage.script_state['waiting_pids'],
+    )
+
+class TestCheckpoint:
+    def test_resumed_game_plays_the_same(self, screen):
+        stage = _create_stage(screen)
+        _play_until(stage, 20000)
+        checkpoint_file = io.BytesIO()
+        save_checkpoint(stage, checkpoint_file)
+
+        resumed_stage = _create_stage(screen)
+        checkpoint_file.seek(0)
+        load_checkpoint(resumed_stage, checkpoint_file)
+        assert _result(resumed_stage) == _result(stage)
+
+        for each_stage in (stage, resumed_stage):
+            _play_until(each_stage, float('inf'))
+        assert resumed_stage.script_state['waiting_pids']
+        assert _result(resumed_stage) == _result(stage)
+
+    def test_checkpointer(self, screen, tmp_path):
+        file_path = str(tmp_path / 'game.checkpoint')
+        checkpointer = Checkpointer(file_path, interval_s=0)
+        stage = _create_stage(screen, checkpointer)
+        assert not checkpointer.resumed
+        _play_until(stage, 5000)
+
+        # Simulates a process killed after the last checkpoint.
+        other_checkpointer = Checkpointer(file_path)
+        resumed_stage = _create_stage(screen, other_checkpointer)
+        assert other_checkpointer.resumed
+        assert _result(resumed_stage) == _result(stage)
+
+        for each_stage in (stage, resumed_stage):
+            _play_until(each_stage, float('inf'))
+        assert _result(resumed_stage) == _result(stage)
+
+        # The checkpoint saved at game over gives the result of the game.
+        finished_stage = _create_stage(screen, Checkpointer(file_path))
+        assert finished_stage.game_over
+        assert _result(finished_stage) == _result(stage)
+
+    def test_script_with_classes(self, screen):
+        # The state of the skeleton is held by the class attributes of `RunOs`, and by
+        # instances of the classes of the script.
+        def skeleton_result(stage):
+            processes = stage.script_state['RunOs.processes']
+            return (
+                stage.score_manager.score,
+                stage.current_time,
+                sorted(processes),
+                [len(process.pages) for _, process in sorted(processes.items())],
+                stage.script_state['RunOs.io_queue'].io_count,
+            )
+
+        stage = _create_stage(screen, script=_SKELETON_SCRIPT)
+        _play_until(stage, 20000)
+        assert stage.script_state['RunOs.processes']
+        checkpoint_file = io.BytesIO()
+        save_checkpoint(stage, checkpoint_file)
+
+        resumed_stage = _create_stage(screen, script=_SKELETON_SCRIPT)
+        checkpoint_file.seek(0)
+        load_checkpoint(resumed_stage, checkpoint_file)
+        assert skeleton_result(resumed_stage) == skeleton_result(stage)
+        processes = resumed_stage.script_state['RunOs.processes']
+        assert type(next(iter(processes.values()))) is resumed_stage.script_globals['Process']
+
+        for each_stage in (stage, resumed_stage):
+            _play_until(each_stage, float('inf'))
+        assert skeleton_result(resumed_stage) == skeleton_result(stage)
+
+    def test_invalid_checkpoint(self, screen):
+        stage = _create_stage(screen)
+        with pytest.raises(CheckpointFormatError):
+            load_checkpoint(stage, io.BytesIO(b'not a checkpoint'))
+        checkpoint_file = io.BytesIO()
+        save_checkpoint(stage, checkpoint_file)
+        with pytest.raises(CheckpointFormatError):
+            load_checkpoint(stage, io.BytesIO(checkpoint_file.getvalue()[:100]))
+
+    def test_unpicklable_script_state(self, screen):
+        stage = _create_stage(screen)
+        stage.script_state = {'generator': (pid for pid in range(3))}
+        with pytest.raises(CheckpointFormatError):
+            save_checkpoint(stage, io.BytesIO())
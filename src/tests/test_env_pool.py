@@ -0,0 +1,73 @@
+import pytest
+
+from constants import ONE_SECOND
+from stage_config import StageConfig
+
+np = pytest.importorskip('numpy')
+
+# pylint: disable=wrong-import-position
+from env_pool import ACTION_PAGE, EnvPool, EnvPoolError, encode_action
+from os_env import PROCESS_FEATURES, YoureTheOsEnv
+
+_CONFIG = StageConfig(io_probability=0.1)
+
+def _policy(observation):
+    # Moves the first waiting processes to the CPUs, without checking if CPUs are free.
+    pids = observation[:-1].reshape(-1, PROCESS_FEATURES)[_CONFIG.num_cpus:, 0]
+    return [{'type': 'process', 'pid': int(pid)} for pid in pids[pids > 0][:2]]
+
+class TestEnvPool:
+    def test_matches_single_env(self):
+        with EnvPool(4, _CONFIG, num_workers=2, step_ms=ONE_SECOND) as pool:
+            observations, infos = pool.reset(seed=100)
+            assert (infos['seed'] == [100, 101, 102, 103]).all()
+            for _ in range(30):
+                observations, rewards, _, _, infos = pool.step(
+                    [_policy(observation) for observation in observations])
+
+        env = YoureTheOsEnv(_CONFIG, step_ms=ONE_SECOND)
+        observation, _ = env.reset(seed=102)
+        for _ in range(30):
+            observation, reward, _, _, info = env.step(_policy(observation))
+
+        assert (observations[2] == observation).all()
+        assert rewards[2] == reward
+        assert infos['score'][2] == info['score']
+        assert infos['time_ms'][2] == 30 * ONE_SECOND
+
+    def test_reset_only_given_envs(self):
+        with EnvPool(3, _CONFIG, num_workers=2, step_ms=ONE_SECOND) as pool:
+            pool.reset(seed=1)
+            pool.step([[], [], []])
+            _, infos = pool.reset(seed=1, env_mask=np.array([False, True, False]))
+
+        assert (infos['time_ms'] == [ONE_SECOND, 0, ONE_SECOND]).all()
+
+    def test_envs_are_not_stepped_before_reset(self):
+        with EnvPool(2, _CONFIG, num_workers=1) as pool:
+            _, _, terminated, _, infos = pool.step([[], []])
+
+        assert terminated.all()
+        assert (infos['time_ms'] == 0).all()
+
+    def test_too_many_actions(self):
+        with EnvPool(1, _CONFIG, max_actions_per_step=1) as pool:
+            pool.reset(seed=1)
+            with pytest.raises(ValueError):
+                pool.step([[{'type': 'io_queue'}, {'type': 'io_queue'}]])
+
+    def test_dead_worker(self):
+        with EnvPool(2, _CONFIG, num_workers=2, timeout_s=1) as pool:
+            pool.reset(seed=1)
+            pool._workers[0].kill()
+            pool._workers[0].join()
+
+            with pytest.raises(EnvPoolError):
+                pool.step([[], []])
+            with pytest.raises(EnvPoolError):
+                pool.step([[], []])
+
+    def test_encode_action(self):
+        assert encode_action({'type': 'page', 'pid': 3, 'idx': 1}) == (ACTION_PAGE, 3, 1)
+        with pytest.raises(ValueError):
+            encode_action({'type': 'reboot'})
@@ -0,0 +1,148 @@
+import io
+
+import pytest
+
+from constants import FRAMERATE, ONE_SECOND
+from engine.clock import FixedStepClock
+from extract_workload import (
+    EventLogFormatError, derive_workload, events_from_replay, read_event_log, write_event_log
+)
+from game_monitor import event_from_dict
+from replay import Replay, ReplayRecorder
+import scenes.stage
+from stage_config import StageConfig
+from workload_trace import ProcessTrace
+
+_SCRIPT = '''
+running = set()
+
+def run_os(events):
+    actions = []
+    for event in events:
+        if event.etype in ('PROC_NEW', 'PROC_STARV') and len(running) < num_cpus:
+            if event.etype == 'PROC_NEW' or event.starvation_level >= 3:
+                running.add(event.pid)
+                actions.append({'type': 'process', 'pid': event.pid})
+        elif event.etype == 'PROC_STARV' and event.starvation_level == 0:
+            running.discard(event.pid)
+            actions.append({'type': 'process', 'pid': event.pid})
+        elif event.etype in ('PROC_TERM', 'PROC_KILL'):
+            running.discard(event.pid)
+        elif event.etype == 'IO_QUEUE' and event.io_count > 0:
+            actions.append({'type': 'io_queue'})
+        elif event.etype == 'PAGE_NEW' and event.swap:
+            actions.append({'type': 'page', 'pid': event.pid, 'idx': event.idx})
+    return actions
+'''
+
+_CONFIG = StageConfig(
+    num_ram_rows=3,
+    io_probability=0.1,
+    graceful_termination_probability=0.05,
+    priority_process_probability=0.3,
+)
+
+def _play(screen, *, seed=0, workload_trace=None, recorder=None):
+    """Plays a game, and returns the events passed to the script, with their time."""
+    stage = scenes.stage.Stage(config=_CONFIG, script=_SCRIPT, standalone=True, seed=seed,
+                               workload_trace=workload_trace)
+    stage.screen = screen
+    stage.headless = True
+    stage.clock = FixedStepClock(ONE_SECOND / FRAMERATE)
+    stage.recorder = recorder
+    stage.setup()
+
+    timed_events = []
+    script_callback = stage.script_callback
+    events_time = stage.current_time
+
+    def record_events(events):
+        nonlocal events_time
+        timed_events.extend((events_time, event) for event in events)
+        events_time = stage.current_time
+        return script_callback(events)
+
+    stage.script_callback = record_events
+    while not stage.game_over:
+        stage.clock.tick()
+        stage.update(stage.current_time, [])
+    return stage, timed_events
+
+def _event(etype, **properties):
+    return event_from_dict({'etype': etype, **properties})
+
+class TestExtractWorkload:
+    def test_derived_workload_plays_the_same_game(self, screen):
+        recorder = ReplayRecorder()
+        stage, _ = _play(screen, seed=3, recorder=recorder)
+        replay = Replay.from_bytes(
+            recorder.to_bytes(stage.score_manager.score, stage.uptime_manager.uptime_ms))
+
+        timed_events = events_from_replay(replay)
+        workload_trace = derive_workload(timed_events)
+        assert any(process.is_priority for process in workload_trace.processes)
+        assert any(process.io_blocks for process in workload_trace.processes)
+
+        other_stage, other_timed_events = _play(
+            screen, seed=4, workload_trace=workload_trace)
+        assert other_stage.score_manager.score == stage.score_manager.score
+        assert other_stage.uptime_manager.uptime_ms == stage.uptime_manager.uptime_ms
+        assert [
+            (time, event.as_dict()) for time, event in other_timed_events
+        ] == [
+            (time, event.as_dict()) for time, event in timed_events
+        ]
+
+    def test_derive_workload(self):
+        timed_events = [
+            (16, _event('PROC_NEW', pid=1)),
+            (16, _event('PROC_NEW', pid=2)),
+            (33, _event('PROC_CPU', pid=1, cpu=True)),
+            (33, _event('PAGE_NEW', pid=1, idx=0, swap=False, use=True)),
+            (33, _event('PAGE_NEW', pid=1, idx=1, swap=False, use=True)),
+            (33, _event('PAGE_USE', pid=1, idx=0, use=True)),
+            (33, _event('PAGE_USE', pid=1, idx=1, use=True)),
+            (2016, _event('PROC_WAIT_IO', pid=1, waiting_for_io=True)),
+            (3016, _event('IO_QUEUE', io_count=1)),
+            (3033, _event('PROC_WAIT_IO', pid=1, waiting_for_io=False)),
+            (3033, _event('IO_QUEUE', io_count=0)),
+            (5016, _event('PAGE_NEW', pid=1, idx=2, swap=False, use=True)),
+            (6016, _event('PROC_STARV', pid=2, starvation_level=2)),
+            (6016, _event('PROC_WAIT_IO', pid=1, waiting_for_io=True)),
+            (12016, _event('PROC_STARV', pid=2, starvation_level=3)),
+            (12016, _event('PROC_WAIT_IO', pid=1, waiting_for_io=False)),
+            (14016, _event('PROC_TERM', pid=1)),
+        ]
+
+        assert derive_workload(timed_events).processes == (
+            ProcessTrace(16, initial_page_count=2, io_blocks=((2000, 1000), (5000, 5000)),
+                         page_growth_times=(4000,), graceful_termination_time=8000),
+            ProcessTrace(16, is_priority=True),
+        )
+
+    def test_event_log(self):
+        timed_events = [
+            (16, _event('PROC_NEW', pid=1)),
+            (1016, _event('IO_QUEUE', io_count=2)),
+        ]
+        log_file = io.StringIO()
+        write_event_log(timed_events, log_file)
+        log_file.seek(0)
+
+        assert [
+            (time, event.as_dict()) for time, event in read_event_log(log_file)
+        ] == [
+            (time, event.as_dict()) for time, event in timed_events
+        ]
+
+    @pytest.mark.parametrize('line', [
+        'not json',
+        '[16, "PROC_NEW"]',
+        '{"etype": "PROC_NEW", "pid": 1}',
+        '{"time": 16, "pid": 1}',
+        '{"time": 16, "etype": "PROC_UNKNOWN", "pid": 1}',
+        '{"time": 16, "etype": "PROC_NEW", "process": 1}',
+    ])
+    def test_invalid_event_log(self, line):
+        with pytest.raises(EventLogFormatError):
+            read_event_log(io.StringIO(line + '\n'))
@@ -0,0 +1,94 @@
+import pickle
+
+import pytest
+
+from game_monitor import EventType, GameMonitor, event_from_dict
+
+def _notify_all(game_monitor):
+    game_monitor.notify_io_event_count(2)
+    game_monitor.notify_page_new(1, 0, False, True)
+    game_monitor.notify_page_use(1, 0, False)
+    game_monitor.notify_page_swap(1, 0, True)
+    game_monitor.notify_page_free(1, 0)
+    game_monitor.notify_process_new(1)
+    game_monitor.notify_process_cpu(1, True)
+    game_monitor.notify_process_starvation(1, 3)
+    game_monitor.notify_process_wait_io(1, True)
+    game_monitor.notify_process_wait_page(1, False)
+    game_monitor.notify_process_terminated(1)
+    game_monitor.notify_process_killed(2)
+    game_monitor.notify_process_end(1)
+
+class TestGameMonitor:
+    def test_event_fields(self):
+        game_monitor = GameMonitor()
+        _notify_all(game_monitor)
+        events = game_monitor.get_events()
+
+        assert {event.etype for event in events} == {event_type.name for event_type in EventType}
+        assert [event.as_dict() for event in events[:3]] == [
+            {'etype': 'IO_QUEUE', 'io_count': 2},
+            {'etype': 'PAGE_NEW', 'pid': 1, 'idx': 0, 'swap': False, 'use': True},
+            {'etype': 'PAGE_USE', 'pid': 1, 'idx': 0, 'use': False},
+        ]
+        starvation_event = events[7]
+        assert (starvation_event.pid, starvation_event.starvation_level) == (1, 3)
+
+        game_monitor.clear_events()
+        assert not game_monitor.get_events()
+
+    def test_events_are_slotted(self):
+        game_monitor = GameMonitor()
+        game_monitor.notify_page_use(1, 0, True)
+        event = game_monitor.get_events()[0]
+
+        assert not hasattr(event, '__dict__')
+        with pytest.raises(AttributeError):
+            event.extra = 1
+
+    def test_round_trip(self):
+        game_monitor = GameMonitor()
+        _notify_all(game_monitor)
+
+        for event in game_monitor.get_events():
+            assert event_from_dict(event.as_dict()) == event
+            assert pickle.loads(pickle.dumps(event)) == event
+
+    def test_event_from_invalid_dict(self):
+        with pytest.raises(ValueError):
+            event_from_dict({'etype': 'PROC_UNKNOWN', 'pid': 1})
+        with pytest.raises(TypeError):
+            event_from_dict({'etype': 'PROC_NEW', 'process': 1})
+
+    def test_disabled(self):
+        game_monitor = GameMonitor(enabled=False)
+        _notify_all(game_monitor)
+        assert not game_monitor.get_events()
+
+        game_monitor.enabled = True
+        game_monitor.notify_process_new(1)
+        assert len(game_monitor.get_events()) == 1
+
+        game_monitor.enabled = False
+        assert not game_monitor.get_events()
+
+    def test_bounded(self, capsys):
+        game_monitor = GameMonitor(max_events=5)
+        for pid in range(8):
+            game_monitor.notify_process_new(pid)
+
+        # The oldest events are kept.
+        assert [event.pid for event in game_monitor.get_events()] == [0, 1, 2, 3, 4]
+        assert game_monitor.dropped_event_count == 3
+        assert capsys.readouterr().err.count('dropping events') == 1
+
+        game_monitor.clear_events()
+        game_monitor.notify_process_new(8)
+        assert [event.pid for event in game_monitor.get_events()] == [8]
+
+        for pid in range(9, 14):
+            game_monitor.notify_process_new(pid)
+        assert [event.pid for event in game_monitor.get_events()] == [8, 9, 10, 11, 12]
+        assert game_monitor.dropped_event_count == 4
+        # The warning is only printed once.
+        assert not capsys.readouterr().err
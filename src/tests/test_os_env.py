@@ -0,0 +1,109 @@
+import pytest
+
+from constants import ONE_SECOND
+from stage_config import StageConfig
+
+np = pytest.importorskip('numpy')
+
+# pylint: disable=wrong-import-position
+from os_env import (
+    FEATURE_ON_CPU, FEATURE_PAGE_LOCATIONS, FEATURE_PID, FEATURE_STARVATION_LEVEL,
+    PAGE_IN_RAM, PAGE_NONE, PROCESS_FEATURES, YoureTheOsEnv
+)
+
+_CONFIG = StageConfig(
+    num_processes_at_startup=4,
+    new_process_probability=0,
+    priority_process_probability=0,
+    io_probability=0,
+    graceful_termination_probability=0,
+)
+
+def _process_rows(env, observation):
+    return observation[:-1].reshape(env.num_positions, PROCESS_FEATURES)
+
+class TestYoureTheOsEnv:
+    def test_reset(self):
+        env = YoureTheOsEnv(_CONFIG)
+        observation, info = env.reset(seed=1)
+
+        assert observation.shape == (env.observation_size,)
+        assert not observation.any()
+        assert info['seed'] == 1
+        assert info['time_ms'] == 0
+
+    def test_step_advances_virtual_time(self):
+        env = YoureTheOsEnv(_CONFIG, step_ms=ONE_SECOND)
+        env.reset(seed=1)
+        observation, reward, terminated, truncated, info = env.step([])
+
+        assert info['time_ms'] == ONE_SECOND
+        assert reward == 0
+        assert not terminated
+        assert not truncated
+
+        rows = _process_rows(env, observation)
+        num_cpus = _CONFIG.num_cpus
+        assert (rows[num_cpus:num_cpus + 4, FEATURE_PID] == [1, 2, 3, 4]).all()
+        assert (rows[num_cpus:num_cpus + 4, FEATURE_STARVATION_LEVEL] == 1).all()
+
+    def test_process_action(self):
+        env = YoureTheOsEnv(_CONFIG, step_ms=ONE_SECOND)
+        env.reset(seed=1)
+        _, total_reward, _, _, _ = env.step([])
+        observation, reward, _, _, _ = env.step([{'type': 'process', 'pid': 1}])
+        total_reward += reward
+
+        cpu_row = _process_rows(env, observation)[0]
+        assert cpu_row[FEATURE_PID] == 1
+        assert cpu_row[FEATURE_ON_CPU] == 1
+        assert cpu_row[FEATURE_PAGE_LOCATIONS][0] == PAGE_IN_RAM
+        assert set(cpu_row[FEATURE_PAGE_LOCATIONS]) <= {PAGE_IN_RAM, PAGE_NONE}
+
+        for _ in range(10):
+            _, reward, _, _, info = env.step([])
+            total_reward += reward
+        assert total_reward == info['score'] > 0
+
+    def test_actions_take_effect_at_the_start_of_the_step(self):
+        env = YoureTheOsEnv(_CONFIG, step_ms=ONE_SECOND)
+        env.reset(seed=1)
+        for _ in range(2):
+            _, _, _, _, info = env.step([])
+        start_time = info['time_ms']
+        env.step([{'type': 'process', 'pid': 1}])
+
+        stage = env.stage
+        process = stage.process_manager.get_process(1)
+        assert process.has_cpu
+        state_change_time = stage.current_time - process.current_state_duration
+        # Applied at the first frame of the step, which lasts 17 ms once rounded.
+        assert start_time < state_change_time <= start_time + 17
+
+    def test_game_over(self):
+        env = YoureTheOsEnv(
+            StageConfig(new_process_probability=0, io_probability=0), step_ms=10 * ONE_SECOND)
+        env.reset(seed=1)
+        terminated = False
+        steps = 0
+        while not terminated:
+            _, _, terminated, _, info = env.step([])
+            steps += 1
+            assert steps < 100
+
+        assert env.stage.game_over
+        assert info['time_ms'] < steps * 10 * ONE_SECOND
+
+    def test_same_seed_gives_same_observations(self):
+        def play(seed):
+            env = YoureTheOsEnv(StageConfig(io_probability=0.1), step_ms=ONE_SECOND)
+            observations = [env.reset(seed=seed)[0]]
+            for pid in range(1, 30):
+                observations.append(env.step([{'type': 'process', 'pid': pid}])[0])
+            return np.stack(observations)
+
+        assert (play(7) == play(7)).all()
+
+    def test_step_before_reset(self):
+        with pytest.raises(RuntimeError):
+            YoureTheOsEnv().step([])
@@ -0,0 +1,85 @@
+import asyncio
+import io
+import pstats
+
+from constants import ONE_MINUTE
+from engine.game_manager import GameManager
+from engine.game_object import cost_accounting
+from game_objects.process_manager import ProcessManager
+from profiler import SUBSYSTEMS, FrameProfiler
+from scenes.stage import Stage
+from stage_config import StageConfig
+
+_SCRIPT = '''
+def run_os(events):
+    return [
+        {'type': 'process', 'pid': event.pid}
+        for event in events
+        if event.etype == 'PROC_NEW' and event.pid <= num_cpus
+    ]
+'''
+
+def _play(screen, profiler):
+    stage = Stage(config=StageConfig(), script=compile(_SCRIPT, 'script', 'exec'),
+                  standalone=True, seed=3)
+    stage.screen = screen
+    game_manager = GameManager()
+    game_manager.add_scene(stage)
+    game_manager.startup_scene = stage
+    game_manager.profiler = profiler
+    asyncio.run(game_manager.play(headless=True, max_time_ms=ONE_MINUTE))
+    return stage
+
+class TestFrameProfiler:
+    def test_times_subsystems(self, screen):
+        profiler = FrameProfiler()
+        _play(screen, profiler)
+
+        for name in ('script', 'process_manager', 'page_manager', 'score_manager',
+                     'uptime_manager'):
+            times = profiler.times[name]
+            assert times.calls > 0
+            assert 0 < times.max_ns <= times.total_ns
+            assert times.depth == 0
+        # Headless games neither poll events nor render.
+        assert profiler.times['events'].calls == 0
+        assert profiler.times['render'].calls == 0
+        assert sum(times.total_ns for times in profiler.times.values()) < profiler.wall_time_ns
+
+    def test_restores_methods(self, screen):
+        methods = {
+            (cls, method_name): cls.__dict__[method_name]
+            for subsystem_methods in SUBSYSTEMS.values()
+            for cls, method_name in subsystem_methods
+        }
+        _play(screen, FrameProfiler())
+
+        for (cls, method_name), method in methods.items():
+            assert cls.__dict__[method_name] is method
+        assert ProcessManager.update is methods[(ProcessManager, 'update')]
+
+    def test_report(self, screen, tmp_path):
+        profiler = FrameProfiler()
+        _play(screen, profiler)
+
+        out_file = io.StringIO()
+        profiler.print_report(out_file, top_functions=5)
+        lines = out_file.getvalue().splitlines()
+        assert lines[0].split()[0] == 'Subsystem'
+        ranked_names = [line.split()[0] for line in lines[1:len(SUBSYSTEMS) + 1]]
+        assert sorted(ranked_names) == sorted(SUBSYSTEMS)
+        assert ranked_names[0] == max(
+            profiler.times, key=lambda name: profiler.times[name].total_ns)
+        assert 'Top 5 functions by own time:' in lines
+        type_line = lines.index('Top 15 game object types by own time:')
+        type_names = [line.split()[0] for line in lines[type_line + 2:type_line + 17] if line]
+        assert 'ProcessManager' in type_names
+        assert not cost_accounting.enabled
+        assert cost_accounting.frame_count > 0
+
+        profiler.save(tmp_path / 'profile.pstats')
+        stats = pstats.Stats(str(tmp_path / 'profile.pstats'))
+        assert any(
+            function_name == 'update' and file_name.endswith('process_manager.py')
+            for file_name, _, function_name in stats.stats
+        )
@@ -0,0 +1,100 @@
+import pytest
+
+from constants import FRAMERATE, ONE_SECOND
+from engine.clock import FixedStepClock
+from engine.game_event import GameEvent
+from engine.game_event_type import GameEventType
+from replay import Replay, ReplayFormatError, ReplayRecorder, play_replay
+import scenes.stage
+from stage_config import StageConfig
+
+_SCRIPT = '''
+def run_os(events):
+    actions = []
+    for event in events:
+        if event.etype == 'PROC_NEW' and event.pid % 2 == 0:
+            actions.append({'type': 'process', 'pid': event.pid})
+        elif event.etype == 'IO_QUEUE' and event.io_count > 0:
+            actions.append({'type': 'io_queue'})
+        elif event.etype == 'PAGE_NEW' and not event.swap:
+            actions.append({'type': 'page', 'pid': event.pid, 'idx': event.idx})
+    return actions
+'''
+
+def _record_game(screen, *, headless, duration_ms=3 * 60 * ONE_SECOND):
+    stage = scenes.stage.Stage(
+        config=StageConfig(io_probability=0.1), script=_SCRIPT, standalone=True, seed=1234)
+    stage.screen = screen
+    stage.headless = headless
+    stage.clock = FixedStepClock(ONE_SECOND / FRAMERATE)
+    recorder = ReplayRecorder()
+    stage.recorder = recorder
+    stage.setup()
+    while stage.current_time < duration_ms and not stage.game_over:
+        stage.clock.tick()
+        stage.update(stage.current_time, [])
+    return stage, recorder
+
+class TestReplay:
+    @pytest.mark.parametrize('headless', [False, True])
+    def test_replay_reaches_recorded_result(self, screen, headless):
+        stage, recorder = _record_game(screen, headless=headless)
+        data = recorder.to_bytes(stage.score_manager.score, stage.uptime_manager.uptime_ms)
+
+        replay = Replay.from_bytes(data)
+        assert replay.seed == 1234
+        assert replay.config == stage.config
+        assert replay.headless == headless
+
+        result = play_replay(replay)
+        assert result.matches
+        assert result.score == stage.score_manager.score
+        assert result.uptime_ms == stage.uptime_manager.uptime_ms
+
+    def test_replay_detects_different_result(self, screen):
+        stage, recorder = _record_game(screen, headless=True)
+        data = recorder.to_bytes(
+            stage.score_manager.score + 1, stage.uptime_manager.uptime_ms)
+
+        assert not play_replay(Replay.from_bytes(data)).matches
+
+    def test_record_actions_and_events(self):
+        recorder = ReplayRecorder()
+        recorder.start(-5, StageConfig(), standalone=False, headless=False, current_time=16)
+        recorder.record_tick(33, [
+            GameEvent(GameEventType.MOUSE_LEFT_CLICK, {'position': (10, 20), 'shift': True}),
+        ])
+        recorder.record_action({'type': 'process', 'pid': 3})
+        recorder.record_action({'type': 'page', 'pid': 300, 'idx': 2})
+        recorder.record_tick(1033, [])
+        recorder.record_action({'type': 'io_queue'})
+        recorder.record_action({'type': 'process', 'pid': 'abc'})
+
+        replay = Replay.from_bytes(recorder.to_bytes(1500, 2000))
+
+        assert replay.seed == -5
+        assert replay.start_time == 16
+        assert not replay.standalone
+        assert [tick.time for tick in replay.ticks] == [33, 1033]
+        assert replay.ticks[0].actions == [
+            {'type': 'process', 'pid': 3},
+            {'type': 'page', 'pid': 300, 'idx': 2},
+        ]
+        assert replay.ticks[1].actions == [{'type': 'io_queue'}, {'type': 'process', 'pid': 'abc'}]
+        event = replay.ticks[0].events[0]
+        assert event.type == GameEventType.MOUSE_LEFT_CLICK
+        assert tuple(event.get_property('position')) == (10, 20)
+        assert event.get_property('shift')
+        assert replay.ticks[1].events == []
+        assert replay.final_score == 1500
+        assert replay.final_uptime_ms == 2000
+
+    def test_invalid_data(self):
+        recorder = ReplayRecorder()
+        recorder.start(0, StageConfig(), standalone=True, headless=True, current_time=0)
+        data = recorder.to_bytes(0, 0)
+
+        with pytest.raises(ReplayFormatError):
+            Replay.from_bytes(b'not a replay')
+        with pytest.raises(ReplayFormatError):
+            Replay.from_bytes(data[:-4])
@@ -0,0 +1,64 @@
+from dataclasses import replace
+
+from constants import ONE_MINUTE
+from soak import SoakSample, find_growing_metrics, run_soak
+from stage_config import StageConfig
+
+_SCRIPT = '''
+def run_os(events):
+    actions = []
+    for event in events:
+        if event.etype == 'PROC_NEW' and event.pid <= num_cpus:
+            actions.append({'type': 'process', 'pid': event.pid})
+        elif event.etype == 'IO_QUEUE' and event.io_count > 0:
+            actions.append({'type': 'io_queue'})
+    return actions
+'''
+
+_SAMPLE = SoakSample(
+    time_ms=0,
+    games=0,
+    traced_memory=1000000,
+    process_manager_children=40,
+    page_manager_children=100,
+    processes=10,
+    io_waiters=1,
+    monitor_events=0,
+    timers=12,
+)
+
+class TestSoak:
+    def test_run_soak(self):
+        samples = []
+        result = run_soak(_SCRIPT, StageConfig(num_cpus=2), duration_ms=10 * ONE_MINUTE,
+                          sample_interval_ms=ONE_MINUTE, seed=0, on_sample=samples.append)
+        assert result.samples == samples
+        assert len(samples) == 10
+        assert [sample.time_ms // ONE_MINUTE for sample in samples] == list(range(1, 11))
+        assert samples[-1].games > 1
+        assert find_growing_metrics(samples) == []
+
+    def test_growing_metric(self):
+        samples = [
+            replace(_SAMPLE, time_ms=index, processes=10 + index, io_waiters=index % 3)
+            for index in range(9)
+        ]
+        assert find_growing_metrics(samples) == ['processes']
+
+    def test_plateau(self):
+        samples = [
+            replace(_SAMPLE, time_ms=index, processes=min(10 + index, 13)) for index in range(17)
+        ]
+        assert find_growing_metrics(samples) == []
+
+    def test_small_memory_growth(self):
+        samples = [
+            replace(_SAMPLE, time_ms=index, traced_memory=1000000 + 1000 * index)
+            for index in range(9)
+        ]
+        assert find_growing_metrics(samples) == []
+        samples = [
+            replace(_SAMPLE, time_ms=index, traced_memory=1000000 + 100000 * index)
+            for index in range(9)
+        ]
+        assert find_growing_metrics(samples) == ['traced_memory']
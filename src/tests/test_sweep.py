@@ -0,0 +1,84 @@
+import io
+import math
+import random
+
+import pytest
+
+from stage_config import StageConfig
+from sweep import (
+    Parameter, confidence_interval, grid_points, print_summaries, random_points, run_sweep
+)
+from tournament import run_headless_game
+
+_SCRIPT = '''
+def run_os(events):
+    return [
+        {'type': 'process', 'pid': event.pid}
+        for event in events if event.etype == 'PROC_NEW' and event.pid <= num_cpus
+    ]
+'''
+
+class TestParameter:
+    def test_parse_values(self):
+        parameter = Parameter.parse('num_cpus=1,2,4')
+        assert parameter.grid_values() == [1, 2, 4]
+
+    def test_parse_range(self):
+        parameter = Parameter.parse('io_probability=0:0.3:0.1')
+        assert parameter.grid_values() == [0, 0.1, 0.2, 0.3]
+        assert Parameter.parse('num_ram_rows=2:8:3').grid_values() == [2, 5, 8]
+
+    @pytest.mark.parametrize('arg', ['num_gpus=1', 'num_cpus', 'num_cpus=4:2', 'num_cpus=1:4:0'])
+    def test_parse_invalid(self, arg):
+        with pytest.raises(ValueError):
+            Parameter.parse(arg)
+
+    def test_range_without_step(self):
+        parameter = Parameter.parse('num_cpus=1:16')
+        with pytest.raises(ValueError):
+            parameter.grid_values()
+        rng = random.Random(1)
+        assert all(1 <= parameter.sample(rng) <= 16 for _ in range(100))
+        assert isinstance(parameter.sample(rng), int)
+
+class TestSweep:
+    def test_grid_points(self):
+        points = grid_points([Parameter.parse('num_cpus=1,2'), Parameter.parse('num_ram_rows=4,8')])
+        assert points == [
+            {'num_cpus': 1, 'num_ram_rows': 4},
+            {'num_cpus': 1, 'num_ram_rows': 8},
+            {'num_cpus': 2, 'num_ram_rows': 4},
+            {'num_cpus': 2, 'num_ram_rows': 8},
+        ]
+
+    def test_random_points_are_reproducible(self):
+        parameters = [Parameter.parse('io_probability=0:0.5'), Parameter.parse('num_cpus=1,2')]
+        assert random_points(parameters, 5, random.Random(3)) == \
+            random_points(parameters, 5, random.Random(3))
+
+    def test_confidence_interval(self):
+        mean, half_width = confidence_interval([1, 2, 3])
+        assert mean == 2
+        assert half_width == pytest.approx(4.303 / math.sqrt(3))
+        assert math.isnan(confidence_interval([5])[1])
+
+    def test_run_sweep(self, tmp_path):
+        script_path = tmp_path / 'script.py'
+        script_path.write_text(_SCRIPT)
+        config = StageConfig(num_processes_at_startup=8)
+        points = [{'num_cpus': 2}, {'num_cpus': 4}]
+
+        summaries = run_sweep(str(script_path), config, points, range(2), jobs=2)
+        assert [summary.point for summary in summaries] == points
+        assert all(summary.num_games == 2 and summary.num_errors == 0 for summary in summaries)
+
+        scores = [
+            run_headless_game(str(script_path), StageConfig(num_processes_at_startup=8,
+                                                            num_cpus=4), seed).score
+            for seed in range(2)
+        ]
+        assert summaries[1].metrics['score'] == confidence_interval(scores)
+
+        out_file = io.StringIO()
+        print_summaries(summaries, out_file)
+        assert out_file.getvalue().splitlines()[0].split()[:3] == ['num_cpus', 'Games', 'Errors']
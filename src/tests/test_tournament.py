@@ -0,0 +1,136 @@
+import io
+
+from difficulty_levels import difficulty_levels_map
+from tournament import (
+    GameResult, play_game, print_halving_rounds, print_statistics, rank_scripts,
+    run_headless_game, run_headless_games, run_successive_halving, run_tournament
+)
+
+_SCRIPT = '''
+def run_os(events):
+    return [
+        {'type': 'process', 'pid': event.pid}
+        for event in events if event.etype == 'PROC_NEW' and event.pid <= num_cpus
+    ]
+'''
+
+_IO_SCRIPT = '''
+def run_os(events):
+    actions = []
+    for event in events:
+        if event.etype == 'PROC_NEW' and event.pid <= num_cpus:
+            actions.append({'type': 'process', 'pid': event.pid})
+        elif event.etype == 'IO_QUEUE' and event.io_count > 0:
+            actions.append({'type': 'io_queue'})
+    return actions
+'''
+
+_IDLE_SCRIPT = '''
+def run_os(events):
+    return []
+'''
+
+_FAILING_SCRIPT = '''
+def run_os(events):
+    raise RuntimeError('oops')
+'''
+
+class TestTournament:
+    def test_play_game(self, tmp_path):
+        script_path = tmp_path / 'script.py'
+        script_path.write_text(_SCRIPT)
+
+        result = play_game(str(script_path), 'easy', 3)
+        assert result.error == ''
+        assert result.seed == 3
+        assert result.score > 0
+        assert result.ragequits == 10
+        assert result == play_game(str(script_path), 'easy', 3)
+
+    def test_stop_at_ragequits(self, tmp_path):
+        script_path = tmp_path / 'script.py'
+        script_path.write_text(_SCRIPT)
+
+        result = play_game(str(script_path), 'easy', 3, stop_at_ragequits=3)
+        assert result.ragequits == 3
+        assert result.stopped
+        assert not play_game(str(script_path), 'easy', 3).stopped
+
+    def test_script_error_is_reported(self, tmp_path):
+        script_path = tmp_path / 'script.py'
+        script_path.write_text(_FAILING_SCRIPT)
+
+        result = play_game(str(script_path), 'normal', 1)
+        assert result.error == 'RuntimeError: oops'
+
+    def test_run_headless_games(self, tmp_path):
+        script_path = tmp_path / 'script.py'
+        script_path.write_text(_SCRIPT)
+        config = difficulty_levels_map['easy'].config
+
+        assert run_headless_games(str(script_path), config, range(3)) == [
+            run_headless_game(str(script_path), config, seed) for seed in range(3)
+        ]
+
+    def test_run_tournament(self, tmp_path):
+        script_path = tmp_path / 'script.py'
+        script_path.write_text(_SCRIPT)
+
+        results = list(run_tournament([str(script_path)], ['easy', 'hard'], range(2), jobs=2))
+        assert sorted((result.difficulty, result.seed) for result in results) == [
+            ('easy', 0), ('easy', 1), ('hard', 0), ('hard', 1)]
+        assert play_game(str(script_path), 'hard', 1) in results
+
+    def test_print_statistics(self):
+        results = [
+            GameResult(score=100, uptime_ms=60000, ragequits=10,
+                       script='a.py', difficulty='easy', seed=0),
+            GameResult(score=300, uptime_ms=120000, ragequits=10,
+                       script='a.py', difficulty='easy', seed=1),
+            GameResult(error='RuntimeError: oops', script='a.py', difficulty='easy', seed=2),
+        ]
+        out_file = io.StringIO()
+        print_statistics(results, out_file)
+
+        lines = out_file.getvalue().splitlines()
+        assert lines[0].split() == [
+            'Script', 'Difficulty', 'Games', 'Errors', 'Score', 'Uptime', '(s)',
+            'Ragequits', 'Graceful']
+        assert lines[1].split() == [
+            'a.py', 'easy', '3', '1', '200', '±', '141', '90', '±', '42', '10', '±', '0',
+            '0', '±', '0']
+
+    def test_rank_scripts(self):
+        results = [
+            GameResult(score=100, script='a.py'),
+            GameResult(score=300, script='a.py'),
+            GameResult(score=150, script='b.py'),
+            GameResult(error='RuntimeError: oops', script='c.py'),
+        ]
+        assert rank_scripts(results) == [('a.py', 200), ('b.py', 150), ('c.py', 0)]
+
+    def test_run_successive_halving(self, tmp_path):
+        script_paths = []
+        for name, script in [
+                ('io.py', _IO_SCRIPT), ('cpu.py', _SCRIPT),
+                ('idle.py', _IDLE_SCRIPT), ('failing.py', _FAILING_SCRIPT)]:
+            script_path = tmp_path / name
+            script_path.write_text(script)
+            script_paths.append(str(script_path))
+
+        results = []
+        rounds = run_successive_halving(script_paths, 'easy', range(2), min_uptime_ms=30000,
+                                        jobs=2, on_result=results.append)
+        assert [halving_round.max_uptime_ms for halving_round in rounds] == [30000, 60000]
+        assert [len(halving_round.ranking) for halving_round in rounds] == [4, 2]
+        assert [script for script, _ in rounds[0].ranking[2:]] == script_paths[2:]
+        assert rounds[0].kept_scripts == [script for script, _ in rounds[1].ranking]
+        assert rounds[-1].kept_scripts == [script_paths[0]]
+        assert len(results) == 12
+        assert all(result.uptime_ms <= 60000 for result in results)
+
+        out_file = io.StringIO()
+        print_halving_rounds(rounds, out_file)
+        lines = out_file.getvalue().splitlines()
+        assert lines[0] == 'Round 1: games stopped at 0:00:30'
+        assert lines[-1] == 'Best script: io.py'
@@ -0,0 +1,122 @@
+import pytest
+
+from constants import FRAMERATE, ONE_SECOND
+from engine.clock import FixedStepClock
+from game_objects.priority_process import PriorityProcess
+import scenes.stage
+from stage_config import StageConfig
+from workload_trace import ProcessTrace, WorkloadTrace, WorkloadTraceFormatError
+
+_TRACE = WorkloadTrace((
+    ProcessTrace(0, initial_page_count=2, io_blocks=((2000, 1500),), page_growth_times=(3000,),
+                 graceful_termination_time=6000),
+    ProcessTrace(0, is_priority=True),
+    ProcessTrace(4500, initial_page_count=3),
+))
+
+class _Script:
+    """Runs every new process, processes I/O events as soon as they are available,
+    and records the events of the game with their time."""
+
+    def __init__(self, stage):
+        self._stage = stage
+        # The script gets the events of the previous frame.
+        self._previous_time = stage.current_time
+        self.events = []
+
+    def __call__(self, events):
+        actions = []
+        for event in events:
+            self.events.append((self._previous_time, event))
+            if event.etype == 'PROC_NEW':
+                actions.append({'type': 'process', 'pid': event.pid})
+            elif event.etype == 'IO_QUEUE' and event.io_count > 0:
+                actions.append({'type': 'io_queue'})
+        self._previous_time = self._stage.current_time
+        return actions
+
+    def times(self, etype, **properties):
+        return [
+            time for time, event in self.events
+            if event.etype == etype
+                and all(getattr(event, name) == value for name, value in properties.items())
+        ]
+
+def _play(trace, *, seed=0, duration_ms=10 * ONE_SECOND, config=StageConfig()):
+    stage = scenes.stage.Stage(config=config, standalone=True, seed=seed, workload_trace=trace)
+    stage.headless = True
+    stage.clock = FixedStepClock(ONE_SECOND / FRAMERATE)
+    stage.setup()
+    script = _Script(stage)
+    stage.script_callback = script
+    while stage.current_time < duration_ms and not stage.game_over:
+        stage.clock.tick()
+        stage.update(stage.current_time, [])
+    return stage, script
+
+class TestWorkloadTrace:
+    def test_json_round_trip(self):
+        assert WorkloadTrace.from_json(_TRACE.to_json()) == _TRACE
+
+    def test_save_and_load(self, tmp_path):
+        _TRACE.save(tmp_path / 'trace.json')
+        assert WorkloadTrace.load(tmp_path / 'trace.json') == _TRACE
+
+    @pytest.mark.parametrize('text', [
+        'not json',
+        '{"version": 2, "processes": []}',
+        '{"version": 1, "processes": [{"arrival_time": 0, "type": "Daemon"}]}',
+        '{"version": 1, "processes": [{"arrival_time": 0, "initial_page_count": 5}]}',
+        '{"version": 1, "processes": [{"type": "Process"}]}',
+        '{"version": 1, "processes": [{"arrival_time": 1000}, {"arrival_time": 0}]}',
+    ])
+    def test_invalid_trace(self, text):
+        with pytest.raises(WorkloadTraceFormatError):
+            WorkloadTrace.from_json(text)
+
+    def test_processes_follow_the_trace(self):
+        stage, script = _play(_TRACE)
+
+        assert script.times('PROC_NEW') == [16, 16, 4500]
+        assert isinstance(stage.process_manager.get_process(2), PriorityProcess)
+        assert not isinstance(stage.process_manager.get_process(3), PriorityProcess)
+        assert len(stage.process_manager.get_process(3).pages) == 3
+
+        # Process 1 arrives at the first frame, and checks for events every second from then.
+        assert script.times('PROC_WAIT_IO', pid=1, waiting_for_io=True) == [2016]
+        # The script processes the I/O event at the next frame.
+        assert script.times('IO_QUEUE', io_count=1) == [3516]
+        assert script.times('PROC_WAIT_IO', pid=1, waiting_for_io=False) == [3533]
+        # The time spent blocked does not count as running time.
+        assert script.times('PAGE_NEW', pid=1, idx=2) == [4016]
+        assert script.times('PROC_TERM', pid=1) == [7016]
+        assert stage.process_manager.gracefully_terminated_process_count == 1
+
+    def test_trace_does_not_depend_on_seed(self):
+        _, script = _play(_TRACE, seed=1)
+        _, other_script = _play(_TRACE, seed=2)
+        assert [
+            (time, event.as_dict()) for time, event in script.events
+        ] == [
+            (time, event.as_dict()) for time, event in other_script.events
+        ]
+
+    def test_processes_wait_for_a_free_slot(self):
+        trace = WorkloadTrace(tuple(ProcessTrace(0) for _ in range(4)))
+        stage, script = _play(trace, duration_ms=3 * ONE_SECOND, config=StageConfig(
+            num_processes_at_startup=1, max_processes=3))
+
+        assert script.times('PROC_NEW') == [16, 16, 16]
+        assert stage.process_manager.get_current_stats()['alive_process_count'] == 3
+
+    def test_io_events_are_handled_in_order(self):
+        trace = WorkloadTrace((
+            ProcessTrace(0, io_blocks=((1000, 3000),)),
+            ProcessTrace(0, io_blocks=((1000, 1000),)),
+        ))
+        _, script = _play(trace)
+
+        # The event of the second process completes first, but is only available
+        # once the event of the first process is.
+        assert script.times('IO_QUEUE', io_count=2) == [4016]
+        assert script.times('PROC_WAIT_IO', waiting_for_io=False) == [4033, 4033]
@@ -0,0 +1,358 @@
+"""
+Entry point to compare automation scripts over many games.
+
+Every combination of script, difficulty level and seed is played headless, exactly like
+`auto.py --headless --seed <seed>` would, by a pool of worker processes. Results are
+written to a CSV file as soon as each game is over, so that partial results are kept if
+the tournament is interrupted, and aggregate statistics are printed at the end.
+
+Good scripts can survive for hours, so large tournaments spend most of their time in games
+whose ranking is clear much earlier. Two options cut that time:
+
+* Games can be stopped early once the user has ragequit a given number of times, which
+  happens long before game over for a script that is losing.
+* With successive halving, all scripts first play games stopped at a short uptime. Only the
+  best scripts by mean score play the next round, whose games are stopped at a longer
+  uptime, and so on until a single script is left or games are no longer stopped.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, fields
+from functools import lru_cache, partial
+from os import path
+import argparse
+import csv
+import itertools
+import statistics
+import sys
+
+from cli import format_uptime, parse_uptime, print_table, resolve_path
+from difficulty_levels import difficulty_levels_map
+from engine.round_robin_driver import RoundRobinDriver
+from scenes.stage import Stage
+from stage_config import StageConfig
+
+
+@dataclass(frozen=True)
+class GameStats:
+    score: int = 0
+    uptime_ms: int = 0
+    ragequits: int = 0
+    graceful_terminations: int = 0
+    stopped: bool = False
+    """Whether the game was stopped before game over."""
+    error: str = ''
+
+
+@dataclass(frozen=True)
+class GameResult(GameStats):
+    script: str = ''
+    difficulty: str = ''
+    seed: int = 0
+
+
+@lru_cache
+def _compile_script(script_path):
+    with open(script_path, encoding='utf_8') as in_file:
+        return compile(in_file.read(), script_path, 'exec')
+
+
+def run_headless_game(script_path: str, config: StageConfig, seed: int, *,
+                      max_uptime_ms: int = None, stop_at_ragequits: int = None,
+                      workload_trace=None):
+    """Plays a game headless, exactly like `auto.py --headless`, and returns its stats.
+
+    Errors raised by the script are reported in the stats rather than raised, so that
+    they do not stop the other games.
+
+    Args:
+        max_uptime_ms: If provided, the game is stopped once it reaches this uptime.
+        stop_at_ragequits: If provided, the game is stopped once the user has ragequit
+            this number of times.
+        workload_trace: If provided, the `WorkloadTrace` played instead of random events.
+    """
+    return run_headless_games(script_path, config, [seed], max_uptime_ms=max_uptime_ms,
+                              stop_at_ragequits=stop_at_ragequits,
+                              workload_trace=workload_trace)[0]
+
+
+def _has_ragequits(ragequits, stage):
+    return stage.process_manager.user_terminated_process_count >= ragequits
+
+
+def run_headless_games(script_path: str, config: StageConfig, seeds, *,
+                       max_uptime_ms: int = None, stop_at_ragequits: int = None,
+                       workload_trace=None):
+    """Plays a game headless for each seed, all in this process, and returns their stats.
+
+    Games are stepped round-robin, and each of them plays exactly like it would alone.
+    See `run_headless_game` for the arguments.
+    """
+    try:
+        script = _compile_script(script_path)
+        stages = [
+            Stage(config=config, script=script, standalone=True, seed=seed,
+                  workload_trace=workload_trace)
+            for seed in seeds
+        ]
+        driver = RoundRobinDriver(
+            stages, max_time_ms=max_uptime_ms,
+            stop_condition=(
+                partial(_has_ragequits, stop_at_ragequits)
+                if stop_at_ragequits is not None else None
+            ))
+    except Exception as exc: # pylint: disable=broad-exception-caught
+        return [GameStats(error=_format_error(exc)) for _ in seeds]
+
+    driver.run()
+    return [
+        GameStats(error=_format_error(error)) if error is not None else GameStats(
+            score=stage.score_manager.score,
+            uptime_ms=stage.uptime_manager.uptime_ms,
+            ragequits=stage.process_manager.user_terminated_process_count,
+            graceful_terminations=stage.process_manager.gracefully_terminated_process_count,
+            stopped=not stage.game_over,
+        )
+        for stage, error in zip(driver.scenes, driver.errors)
+    ]
+
+
+def _format_error(exc):
+    return f'{exc.__class__.__name__}: {exc}'
+
+
+def play_game(script_path: str, difficulty: str, seed: int, *,
+              max_uptime_ms: int = None, stop_at_ragequits: int = None):
+    """Plays a game headless at the given difficulty level, and returns its result.
+
+    See `run_headless_game` for the keyword arguments.
+    """
+    stats = run_headless_game(
+        script_path, difficulty_levels_map[difficulty].config, seed,
+        max_uptime_ms=max_uptime_ms, stop_at_ragequits=stop_at_ragequits)
+    return GameResult(**asdict(stats), script=script_path, difficulty=difficulty, seed=seed)
+
+
+def _play_games(executor, script_paths, difficulties, seeds, **kwargs):
+    futures = [
+        executor.submit(play_game, script_path, difficulty, seed, **kwargs)
+        for script_path, difficulty, seed in itertools.product(
+            script_paths, difficulties, seeds)
+    ]
+    for future in as_completed(futures):
+        yield future.result()
+
+
+def run_tournament(script_paths, difficulties, seeds, *, jobs=None, stop_at_ragequits=None):
+    """Plays every combination of script, difficulty level and seed in worker processes.
+
+    Args:
+        stop_at_ragequits: If provided, games are stopped once the user has ragequit this
+            number of times.
+
+    Yields:
+        GameResult: The result of each game, as soon as it is over.
+    """
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from _play_games(executor, script_paths, difficulties, seeds,
+                               stop_at_ragequits=stop_at_ragequits)
+
+
+@dataclass(frozen=True)
+class HalvingRound:
+    max_uptime_ms: int
+    ranking: list
+    """Scripts of the round with their mean score, from best to worst."""
+    kept_scripts: list
+    """Scripts that play the next round, or the winner after the last round."""
+
+
+def rank_scripts(results):
+    """Returns the scripts of the results with their mean score, from best to worst.
+
+    Games that failed count as a score of 0.
+    """
+    scores = {}
+    for result in results:
+        scores.setdefault(result.script, []).append(result.score)
+    return sorted(
+        ((script, statistics.mean(script_scores)) for script, script_scores in scores.items()),
+        key=lambda item: item[1], reverse=True,
+    )
+
+
+def _has_games_stopped_at_uptime(results, stop_at_ragequits):
+    # Games stopped for their ragequits would be stopped the same way in longer games.
+    return any(
+        result.stopped and (stop_at_ragequits is None or result.ragequits < stop_at_ragequits)
+        for result in results
+    )
+
+
+def run_successive_halving(script_paths, difficulty, seeds, *, min_uptime_ms, eta=2,
+                           jobs=None, stop_at_ragequits=None, on_result=None):
+    """Finds the best script by successive halving, and returns the rounds played.
+
+    In each round, the remaining scripts play every seed with games stopped at the uptime
+    of the round, starting at `min_uptime_ms`. The best `1 / eta` of the scripts by mean
+    score are kept for the next round, whose uptime is `eta` times longer. Rounds go on
+    until a single script is left. When no game of a round was stopped, longer games
+    would give the same results, so the ranking of that round is final.
+
+    Args:
+        eta: Factor by which the number of scripts is divided, and the uptime multiplied,
+            at each round.
+        stop_at_ragequits: If provided, games are stopped once the user has ragequit this
+            number of times.
+        on_result: Called with each `GameResult`, as soon as the game is over.
+
+    Returns:
+        list[HalvingRound]: The rounds played. The last script kept is the winner.
+    """
+    scripts = list(script_paths)
+    max_uptime_ms = min_uptime_ms
+    rounds = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        while True:
+            results = []
+            for result in _play_games(
+                    executor, scripts, [difficulty], seeds,
+                    max_uptime_ms=max_uptime_ms, stop_at_ragequits=stop_at_ragequits):
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+            ranking = rank_scripts(results)
+            if not _has_games_stopped_at_uptime(results, stop_at_ragequits):
+                scripts = [ranking[0][0]]
+            else:
+                scripts = [script for script, _ in ranking[:max(1, len(scripts) // eta)]]
+            rounds.append(HalvingRound(max_uptime_ms, ranking, scripts))
+            if len(scripts) == 1:
+                return rounds
+            max_uptime_ms *= eta
+
+
+def _format_stats(values):
+    if not values:
+        return '-'
+    stdev = statistics.stdev(values) if len(values) > 1 else 0
+    return f'{statistics.mean(values):.0f} ± {stdev:.0f}'
+
+
+def print_statistics(results, out_file=sys.stdout):
+    """Prints the mean and standard deviation of results, per script and difficulty level."""
+    groups = {}
+    for result in results:
+        groups.setdefault((result.script, result.difficulty), []).append(result)
+
+    header = ('Script', 'Difficulty', 'Games', 'Errors', 'Score', 'Uptime (s)',
+              'Ragequits', 'Graceful')
+    rows = [header]
+    for (script, difficulty), group in groups.items():
+        games = [result for result in group if not result.error]
+        rows.append((
+            path.basename(script),
+            difficulty,
+            str(len(group)),
+            str(len(group) - len(games)),
+            _format_stats([result.score for result in games]),
+            _format_stats([result.uptime_ms / 1000 for result in games]),
+            _format_stats([result.ragequits for result in games]),
+            _format_stats([result.graceful_terminations for result in games]),
+        ))
+
+    print_table(rows, out_file)
+
+
+def print_halving_rounds(rounds, out_file=sys.stdout):
+    """Prints the ranking of each round of successive halving."""
+    for index, halving_round in enumerate(rounds):
+        print(f'Round {index + 1}: games stopped at'
+              f' {format_uptime(halving_round.max_uptime_ms)}', file=out_file)
+        rows = [('Script', 'Score', 'Kept')]
+        for script, score in halving_round.ranking:
+            rows.append((
+                path.basename(script),
+                f'{score:.0f}',
+                'yes' if script in halving_round.kept_scripts else 'no',
+            ))
+        print_table(rows, out_file)
+    print(f'Best script: {path.basename(rounds[-1].kept_scripts[0])}', file=out_file)
+
+
+_RESULT_COLUMNS = ['script', 'difficulty', 'seed'] + [field.name for field in fields(GameStats)]
+
+
+def parse_seed_range(arg):
+    """Parses `N` as the seeds 0 to N-1, or `START:STOP` as the seeds START to STOP-1."""
+    start, _, stop = arg.rpartition(':')
+    return range(int(start) if start else 0, int(stop))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                prog="tournament",
+                description="Play automated scripts over many seeds and difficulty levels")
+    parser.add_argument('scripts', nargs='+', metavar='script',
+        help="filenames of the automated scripts")
+    parser.add_argument('--seeds', type=parse_seed_range, default=range(10), metavar='[START:]STOP',
+        help="seeds of the games, from START (0 by default) to STOP excluded (default: 10)")
+    parser.add_argument('--difficulties', nargs='+', default=['normal'],
+        choices=difficulty_levels_map.keys(), metavar='DIFFICULTY',
+        help="difficulty levels of the games, among"
+            f" {', '.join(difficulty_levels_map)} (default: normal)")
+    parser.add_argument('--jobs', type=int,
+        help="number of games played in parallel (default: number of CPUs)")
+    parser.add_argument('--output', default='tournament-results.csv', metavar='RESULTS_FILE',
+        help="CSV file to write the result of each game to (default: tournament-results.csv)")
+    parser.add_argument('--stop-at-ragequits', type=int, metavar='RAGEQUITS',
+        help="stop games once the user has ragequit this number of times")
+    parser.add_argument('--halving', type=parse_uptime, metavar='MIN_UPTIME',
+        help="find the best script by successive halving, with games of the first round"
+            " stopped at this uptime, in seconds or as M:SS or H:MM:SS")
+    parser.add_argument('--eta', type=int, default=2,
+        help="with --halving, factor by which the number of scripts is divided, and the"
+            " uptime multiplied, at each round (default: 2)")
+    args = parser.parse_args()
+
+    script_paths = [path.abspath(resolve_path(script)) for script in args.scripts]
+    for script_path in script_paths:
+        if not path.isfile(script_path):
+            parser.error(f'script not found: {script_path}')
+    if args.halving is not None and len(args.difficulties) != 1:
+        parser.error('--halving takes a single difficulty level')
+    if args.eta < 2:
+        parser.error('--eta must be at least 2')
+
+    results = []
+    with open(resolve_path(args.output), 'w', encoding='utf_8', newline='') as out_file:
+        writer = csv.DictWriter(out_file, _RESULT_COLUMNS)
+        writer.writeheader()
+
+        def write_result(result):
+            results.append(result)
+            writer.writerow(asdict(result))
+            out_file.flush()
+            print(f'\r{len(results)} games', end='', file=sys.stderr)
+
+        if args.halving is not None:
+            rounds = run_successive_halving(
+                script_paths, args.difficulties[0], args.seeds, min_uptime_ms=args.halving,
+                eta=args.eta, jobs=args.jobs, stop_at_ragequits=args.stop_at_ragequits,
+                on_result=write_result)
+        else:
+            for result in run_tournament(
+                    script_paths, args.difficulties, args.seeds, jobs=args.jobs,
+                    stop_at_ragequits=args.stop_at_ragequits):
+                write_result(result)
+    print(file=sys.stderr)
+
+    if args.halving is not None:
+        print_halving_rounds(rounds)
+    else:
+        print_statistics(results)
+    return 1 if any(result.error for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
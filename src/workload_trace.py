@@ -0,0 +1,124 @@
+"""
+Workload traces, to play games with a fixed workload instead of random events.
+
+A trace lists every process of a game, in order of arrival: process `i` of the trace
+(starting at 0) gets the pid `i + 1`. For each process, it gives:
+- `arrival_time`: Time in ms since the start of the game at which the process arrives.
+  The process waits for a free slot if there are already `max_processes` processes.
+- `type`: `Process`, or `PriorityProcess` for processes starving faster.
+- `initial_page_count`: Number of pages allocated when the process first gets a CPU.
+- `io_blocks`: List of `[running_time, duration]` pairs. The process blocks for I/O once it
+  has been running for `running_time` ms, and its I/O event is ready `duration` ms later.
+  As I/O events are handled in order, it may have to wait for earlier ones, and never waits
+  for more than 5 seconds.
+- `page_growth_times`: Running times in ms at which the process allocates a new page.
+- `graceful_termination_time`: Running time in ms at which the process terminates, or null.
+
+Running times only count the time during which the process has a CPU and is not blocked,
+so that a trace describes the same workload whatever the scheduling decisions. Processes
+check for events once per second, so running times are counted in whole seconds, and events
+happen at the first check at or after their time at which the game rules allow them (e.g.
+processes do not block for I/O again before yielding their CPU).
+
+Traces are stored as JSON, in a versioned format.
+"""
+
+from dataclasses import dataclass, field
+import json
+
+from constants import MAX_PAGES_PER_PROCESS
+
+_VERSION = 1
+
+_TYPE_PROCESS = 'Process'
+_TYPE_PRIORITY_PROCESS = 'PriorityProcess'
+
+
+class WorkloadTraceFormatError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class ProcessTrace:
+    arrival_time: int
+    is_priority: bool = False
+    initial_page_count: int = 1
+    io_blocks: tuple = ()
+    page_growth_times: tuple = ()
+    graceful_termination_time: int = None
+
+    def to_dict(self):
+        return {
+            'arrival_time': self.arrival_time,
+            'type': _TYPE_PRIORITY_PROCESS if self.is_priority else _TYPE_PROCESS,
+            'initial_page_count': self.initial_page_count,
+            'io_blocks': [list(io_block) for io_block in self.io_blocks],
+            'page_growth_times': list(self.page_growth_times),
+            'graceful_termination_time': self.graceful_termination_time,
+        }
+
+    @classmethod
+    def from_dict(cls, value: dict):
+        try:
+            process_type = value.get('type', _TYPE_PROCESS)
+            if process_type not in (_TYPE_PROCESS, _TYPE_PRIORITY_PROCESS):
+                raise WorkloadTraceFormatError(f'Unknown process type: {process_type}.')
+            process_trace = cls(
+                arrival_time=int(value['arrival_time']),
+                is_priority=process_type == _TYPE_PRIORITY_PROCESS,
+                initial_page_count=int(value.get('initial_page_count', 1)),
+                io_blocks=tuple(
+                    (int(running_time), int(duration))
+                    for running_time, duration in value.get('io_blocks', ())
+                ),
+                page_growth_times=tuple(int(time) for time in value.get('page_growth_times', ())),
+                graceful_termination_time=(
+                    None if value.get('graceful_termination_time') is None
+                    else int(value['graceful_termination_time'])
+                ),
+            )
+        except (KeyError, TypeError, ValueError) as exc:
+            raise WorkloadTraceFormatError(f'Invalid process: {value!r}.') from exc
+        if not 1 <= process_trace.initial_page_count <= MAX_PAGES_PER_PROCESS:
+            raise WorkloadTraceFormatError(
+                f'Invalid initial page count: {process_trace.initial_page_count}.')
+        return process_trace
+
+
+@dataclass(frozen=True)
+class WorkloadTrace:
+    processes: tuple = field(default_factory=tuple)
+
+    def to_json(self):
+        return json.dumps({
+            'version': _VERSION,
+            'processes': [process.to_dict() for process in self.processes],
+        }, indent=1)
+
+    @classmethod
+    def from_json(cls, text: str):
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise WorkloadTraceFormatError('Not a workload trace.') from exc
+        if not isinstance(value, dict) or 'processes' not in value:
+            raise WorkloadTraceFormatError('Not a workload trace.')
+        if value.get('version') != _VERSION:
+            raise WorkloadTraceFormatError(
+                f'Unsupported workload trace version: {value.get("version")}.')
+        processes = tuple(ProcessTrace.from_dict(process) for process in value['processes'])
+        if any(
+            process.arrival_time < previous.arrival_time
+            for previous, process in zip(processes, processes[1:])
+        ):
+            raise WorkloadTraceFormatError('Processes are not in order of arrival.')
+        return cls(processes)
+
+    @classmethod
+    def load(cls, file_path):
+        with open(file_path, encoding='utf_8') as in_file:
+            return cls.from_json(in_file.read())
+
+    def save(self, file_path):
+        with open(file_path, 'w', encoding='utf_8') as out_file:
+            out_file.write(self.to_json())